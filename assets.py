@@ -0,0 +1,101 @@
+import os
+import mmap
+import time
+import struct
+import hashlib
+
+import pygame
+
+from constants import ASSET_CACHE_DIR
+
+
+# magic, width, height, bytes per pixel
+RAW_HEADER = struct.Struct("<4sIII")
+RAW_MAGIC = b"RAW1"
+RAW_FORMATS = {3: "RGB", 4: "RGBA"}
+
+
+class AssetCache:
+    """Images loaded on first use, converted once to the display format.
+
+    Decoded pixels are also written to `cache_dir` as raw files named after
+    the source's path, size and modification time. Later launches map such a
+    file into memory and hand it to pygame.image.frombuffer instead of
+    decoding the image again; convert() then copies it into a surface in the
+    display's pixel format, so blitting it never converts pixels again.
+    """
+
+    def __init__(self, cache_dir: str = ASSET_CACHE_DIR) -> None:
+        self.cache_dir = cache_dir
+        self.images = {}
+        # (path, milliseconds, whether the raw cache was used) of every load
+        self.loads = []
+
+    def image(self, path: str, alpha: bool = False) -> pygame.Surface:
+        key = (path, alpha)
+        surface = self.images.get(key)
+        if surface is None:
+            surface = self.images[key] = self._load(path, alpha)
+        return surface
+
+    def _raw_path(self, path: str) -> str:
+        stat = os.stat(path)
+        key = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        name = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(self.cache_dir, f"{name}-{digest}.raw")
+
+    def _load(self, path: str, alpha: bool) -> pygame.Surface:
+        start = time.perf_counter()
+        raw_path = self._raw_path(path) if self.cache_dir else None
+
+        surface = self._read_raw(raw_path, alpha) if raw_path else None
+        cached = surface is not None
+        if surface is None:
+            surface = self._finish(pygame.image.load(path), alpha)
+            if raw_path:
+                self._write_raw(raw_path, surface, alpha)
+
+        self.loads.append((path, 1000 * (time.perf_counter() - start), cached))
+        return surface
+
+    @staticmethod
+    def _finish(surface: pygame.Surface, alpha: bool) -> pygame.Surface:
+        if pygame.display.get_surface() is None:
+            # nothing to convert to yet, and the pixels must not borrow a buffer
+            return surface.copy()
+        return surface.convert_alpha() if alpha else surface.convert()
+
+    def _read_raw(self, raw_path: str, alpha: bool) -> pygame.Surface:
+        try:
+            with open(raw_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                magic, width, height, depth = RAW_HEADER.unpack_from(mapped)
+                if magic != RAW_MAGIC or depth != (4 if alpha else 3):
+                    return None
+                if len(mapped) != RAW_HEADER.size + width * height * depth:
+                    return None
+
+                pixels = memoryview(mapped)[RAW_HEADER.size:]
+                try:
+                    return self._finish(pygame.image.frombuffer(pixels, (width, height), RAW_FORMATS[depth]), alpha)
+                finally:
+                    pixels.release()
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def _write_raw(self, raw_path: str, surface: pygame.Surface, alpha: bool) -> None:
+        depth = 4 if alpha else 3
+        width, height = surface.get_size()
+        temporary = raw_path + ".tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temporary, "wb") as file:
+                file.write(RAW_HEADER.pack(RAW_MAGIC, width, height, depth))
+                file.write(pygame.image.tobytes(surface, RAW_FORMATS[depth]))
+            os.replace(temporary, raw_path)
+        except OSError:
+            # the cache only saves time, the game runs without it
+            pass
+
+
+assets = AssetCache()
@@ -5,47 +5,66 @@ from constants import *
 
 
 class AsteroidField(pygame.sprite.Sprite):
+    # source of randomness for spawns, a seeded random.Random when headless
+    rng = random
+    
     edges = [
         [
             pygame.Vector2(1, 0),
-            lambda y: pygame.Vector2(-ASTEROID_MAX_RADIUS, y * SCREEN_HEIGHT),
+            lambda y: pygame.Vector2(-ASTEROID_MAX_RADIUS, y * WORLD_HEIGHT),
         ],
         [
             pygame.Vector2(-1, 0),
             lambda y: pygame.Vector2(
-                SCREEN_WIDTH + ASTEROID_MAX_RADIUS, y * SCREEN_HEIGHT
+                WORLD_WIDTH + ASTEROID_MAX_RADIUS, y * WORLD_HEIGHT
             ),
         ],
         [
             pygame.Vector2(0, 1),
-            lambda x: pygame.Vector2(x * SCREEN_WIDTH, -ASTEROID_MAX_RADIUS),
+            lambda x: pygame.Vector2(x * WORLD_WIDTH, -ASTEROID_MAX_RADIUS),
         ],
         [
             pygame.Vector2(0, -1),
             lambda x: pygame.Vector2(
-                x * SCREEN_WIDTH, SCREEN_HEIGHT + ASTEROID_MAX_RADIUS
+                x * WORLD_WIDTH, WORLD_HEIGHT + ASTEROID_MAX_RADIUS
             ),
         ],
     ]
 
-    def __init__(self):
+    def __init__(self, asteroids=None):
         pygame.sprite.Sprite.__init__(self, self.containers)
         self.spawn_timer = 0.0
+        # lowered by a FrameGovernor on slow machines; counting the live
+        # asteroids for max_asteroids needs their group (or the EntityStore)
+        self.asteroids = asteroids
+        self.spawn_interval = ASTEROID_SPAWN_RATE
+        self.max_asteroids = None
 
     def spawn(self, radius, position, velocity):
-        asteroid = Asteroid(position.x, position.y, radius)
-        asteroid.velocity = velocity
+        if Asteroid.store is not None:
+            Asteroid.store.add_asteroid(position, velocity, radius)
+            return
+        
+        asteroid = Asteroid.create(position.x, position.y, radius)
+        asteroid.velocity.update(velocity)
+
+    def live_asteroids(self):
+        if Asteroid.store is not None:
+            return Asteroid.store.counts()[0]
+        return len(self.asteroids)
 
     def update(self, dt):
         self.spawn_timer += dt
-        if self.spawn_timer > ASTEROID_SPAWN_RATE:
+        if self.spawn_timer > self.spawn_interval:
             self.spawn_timer = 0
+            if self.max_asteroids is not None and self.live_asteroids() >= self.max_asteroids:
+                return
 
             # spawn a new asteroid at a random edge
-            edge = random.choice(self.edges)
-            speed = random.randint(40, 100)
+            edge = self.rng.choice(self.edges)
+            speed = self.rng.randint(40, 100)
             velocity = edge[0] * speed
-            velocity = velocity.rotate(random.randint(-30, 30))
-            position = edge[1](random.uniform(0, 1))
-            kind = random.randint(1, ASTEROID_KINDS)
+            velocity = velocity.rotate(self.rng.randint(-30, 30))
+            position = edge[1](self.rng.uniform(0, 1))
+            kind = self.rng.randint(1, ASTEROID_KINDS)
             self.spawn(ASTEROID_MIN_RADIUS * kind, position, velocity)
\ No newline at end of file
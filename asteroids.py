@@ -7,27 +7,72 @@ from constants import *
 
 class Asteroid(CircleShape):
     
+    # EntityStore holding asteroids as arrays instead of sprites, if enabled
+    store = None
+    # source of randomness for splits, a seeded random.Random when headless
+    rng = random
+    # what far away is measured from (the player) when far asteroids move
+    # less often, see FAR_UPDATE_INTERVAL; None moves everything every step
+    focus = None
+    
     def __init__(self, x, y, radius):
         super().__init__(x, y, radius)
+        self.pending_dt = 0.0
+        self.skipped = 0
+        self.track()
+    
+    def reset(self, x, y, radius):
+        super().reset(x, y, radius)
+        self.pending_dt = 0.0
+        self.skipped = 0
+        self.track()
         
     def draw(self, screen):
-        pygame.draw.circle(screen, (255, 165, 0), self.position, self.radius, 2)
+        return pygame.draw.circle(screen, (255, 165, 0), self.position, self.radius, 2)
     
     def update(self, dt):
+        self.previous_position.update(self.position)
+        if self.focus is not None:
+            dt = self._throttle(dt)
         self.position += self.velocity * dt
+        self.track()
+    
+    def _throttle(self, dt):
+        # far outside a screen around the focus only every
+        # FAR_UPDATE_INTERVAL-th step moves, by all the time since the last
+        # one; the others stand still. The focus is simulated, not the
+        # camera, so replays and headless runs throttle the same way.
+        self.pending_dt += dt
+        offset = self.position - self.focus.position
+        if abs(offset.x) > SCREEN_WIDTH / 2 + FAR_UPDATE_MARGIN or abs(offset.y) > SCREEN_HEIGHT / 2 + FAR_UPDATE_MARGIN:
+            self.skipped += 1
+            if self.skipped < FAR_UPDATE_INTERVAL:
+                return 0.0
+        
+        dt = self.pending_dt
+        self.pending_dt = 0.0
+        self.skipped = 0
+        return dt
     
     def __creating_new_asteroid(self, velocity):
         new_radius = self.radius - ASTEROID_MIN_RADIUS
-        new_asteroid = Asteroid(self.position.x, self.position.y, new_radius)
-        new_asteroid.velocity = velocity * 1.2
+        if self.store is not None:
+            self.store.add_asteroid(self.position, velocity * 1.2, new_radius)
+            return
+        
+        new_asteroid = Asteroid.create(self.position.x, self.position.y, new_radius)
+        new_asteroid.velocity.update(velocity)
+        new_asteroid.velocity *= 1.2
     
     def split(self):
+        if self.particles is not None:
+            self.particles.explode(self.position, self.radius, self.velocity)
         self.kill()
         if self.radius == ASTEROID_MIN_RADIUS:
             
             return 
         
-        angle = random.uniform(20, 50)
+        angle = self.rng.uniform(20, 50)
         velocity1 = self.velocity.rotate(angle)
         velocity2 = self.velocity.rotate(-angle)
         
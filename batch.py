@@ -0,0 +1,214 @@
+"""Runs many simulated games in parallel, for balancing the constants.
+
+Every job is one headless game: a seed, a parameter set (overrides for
+values in constants.py) and an input policy from bots.py. Jobs are spread
+over a process pool; per-game results are streamed to a JSON lines file as
+they finish and summarized per parameter set at the end. Every parameter set
+plays the same seeds, so differences between sets are not down to luck:
+
+    python batch.py --games 500 --policy aim --sweep ASTEROID_SPAWN_RATE=0.4,0.8,1.2
+    python batch.py --games 200 --params sets.json --results games.jsonl --report report.json
+
+A params file maps set names to overrides, e.g.
+{"fast": {"PLAYER_SPEED": 300}, "slow": {"PLAYER_SPEED": 150}}.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import itertools
+import multiprocessing
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+# stdout is for results only
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import constants
+from world import World
+from bots import POLICIES, make_policy
+from headless import run_headless
+from benchmark import percentile
+
+
+def apply_overrides(overrides: dict) -> dict:
+    """Replaces constants in every loaded module that imported them.
+
+    Modules use `from constants import *`, so each keeps its own binding.
+    Values computed from other constants (ASTEROID_MAX_RADIUS) and default
+    arguments bound at import time are not recomputed.
+
+    Returns:
+        dict: The previous values, for restore_overrides
+    """
+
+    previous = {name: getattr(constants, name) for name in overrides}
+    for name, value in overrides.items():
+        for module in list(sys.modules.values()):
+            namespace = getattr(module, "__dict__", None)
+            if namespace is not None and name in namespace and namespace[name] is previous[name]:
+                namespace[name] = value
+    return previous
+
+
+def restore_overrides(previous: dict) -> None:
+    apply_overrides(previous)
+
+
+def run_job(job: dict) -> dict:
+    """Plays one game with the job's seed, overrides and policy."""
+
+    previous = apply_overrides(job["overrides"])
+    try:
+        world = World(job["seed"], None, job["use_store"])
+        controls = make_policy(job["policy"], world, job["seed"])
+        result = run_headless(job["seed"], controls, job["frames"], job["dt"], job["use_store"], world)
+    finally:
+        restore_overrides(previous)
+
+    result["params"] = job["params"]
+    result["policy"] = job["policy"]
+    return result
+
+
+def make_jobs(param_sets: dict, seeds: range, policy: str, frames: int, dt: float, use_store: bool):
+    for (name, overrides), seed in itertools.product(param_sets.items(), seeds):
+        yield {
+            "params": name,
+            "overrides": overrides,
+            "seed": seed,
+            "policy": policy,
+            "frames": frames,
+            "dt": dt,
+            "use_store": use_store,
+        }
+
+
+def _stats(values: list[float]) -> dict:
+    ordered = sorted(values)
+    return {
+        "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+        "p10": percentile(ordered, 0.10),
+        "p50": percentile(ordered, 0.50),
+        "p90": percentile(ordered, 0.90),
+        "max": ordered[-1] if ordered else 0.0,
+    }
+
+
+def aggregate(results: list[dict], param_sets: dict) -> dict:
+    """Summarizes per-game results for each parameter set."""
+
+    report = {}
+    for name, overrides in param_sets.items():
+        games = [result for result in results if result["params"] == name]
+        report[name] = {
+            "overrides": overrides,
+            "games": len(games),
+            "game_over_rate": sum(game["game_over"] for game in games) / len(games) if games else 0.0,
+            "score": _stats([game["score"] for game in games]),
+            "survival_time": _stats([game["survival_time"] for game in games]),
+            "peak_entities": _stats([game["peak_entities"] for game in games]),
+            "mean_frame_ms": _stats([game["mean_frame_ms"] for game in games]),
+            "max_frame_ms": _stats([game["max_frame_ms"] for game in games]),
+        }
+    return report
+
+
+def run_batch(param_sets: dict, seeds: range, policy: str = "aim", frames: int = 36000, dt: float = 1 / 60,
+              use_store: bool = False, workers: int = None, results_file=None) -> dict:
+    """Plays every parameter set against every seed on a process pool.
+
+    Args:
+        param_sets: Set names mapped to constant overrides
+        seeds: Seeds played by each set
+        policy: Input policy, one of bots.POLICIES
+        frames: Maximum frames per game
+        dt: Simulated time per frame, in seconds
+        use_store: Whether to keep asteroids and shots in an EntityStore
+        workers: Processes to use, all cores by default
+        results_file: Open text file receiving one JSON line per finished game
+
+    Returns:
+        dict: Per-set summaries plus overall throughput
+    """
+
+    workers = workers or os.cpu_count() or 1
+    jobs = list(make_jobs(param_sets, seeds, policy, frames, dt, use_store))
+    # large chunks keep the workers busy, small ones balance the tail
+    chunksize = max(1, len(jobs) // (workers * 8))
+    results = []
+    start = time.perf_counter()
+
+    with multiprocessing.Pool(workers) as pool:
+        for result in pool.imap_unordered(run_job, jobs, chunksize):
+            results.append(result)
+            if results_file is not None:
+                results_file.write(json.dumps(result) + "\n")
+                results_file.flush()
+
+    elapsed = time.perf_counter() - start
+    frames_played = sum(result["frames"] for result in results)
+
+    return {
+        "policy": policy,
+        "workers": workers,
+        "games": len(results),
+        "frames": frames_played,
+        "wall_time": elapsed,
+        "games_per_second": len(results) / elapsed if elapsed else 0.0,
+        "frames_per_second": frames_played / elapsed if elapsed else 0.0,
+        "params": aggregate(results, param_sets),
+    }
+
+
+def parse_sweep(sweep: str) -> dict:
+    """Turns NAME=v1,v2,... into one parameter set per value."""
+
+    name, _, values = sweep.partition("=")
+    return {f"{name}={value}": {name: json.loads(value)} for value in values.split(",")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run simulated games in parallel.")
+    parser.add_argument("--games", type=int, default=100, help="games per parameter set")
+    parser.add_argument("--seed", type=int, default=0, help="first seed")
+    parser.add_argument("--frames", type=int, default=36000, help="maximum frames per game")
+    parser.add_argument("--dt", type=float, default=1 / 60)
+    parser.add_argument("--policy", choices=POLICIES, default="aim")
+    parser.add_argument("--params", help="JSON file mapping set names to constant overrides")
+    parser.add_argument("--sweep", help="one parameter set per value, as NAME=v1,v2,...")
+    parser.add_argument("--workers", type=int, help="processes to use (default: all cores)")
+    parser.add_argument("--store", action="store_true", help="use the NumPy entity store")
+    parser.add_argument("--results", help="stream per-game results to this JSON lines file")
+    parser.add_argument("--report", help="also write the report to this file")
+    args = parser.parse_args()
+
+    param_sets = {}
+    if args.params:
+        with open(args.params) as file:
+            param_sets.update(json.load(file))
+    if args.sweep:
+        param_sets.update(parse_sweep(args.sweep))
+    if not param_sets:
+        param_sets["default"] = {}
+
+    unknown = {name for overrides in param_sets.values() for name in overrides} - set(vars(constants))
+    if unknown:
+        parser.error(f"not in constants.py: {', '.join(sorted(unknown))}")
+
+    seeds = range(args.seed, args.seed + args.games)
+    results_file = open(args.results, "w") if args.results else None
+    try:
+        report = run_batch(param_sets, seeds, args.policy, args.frames, args.dt, args.store, args.workers, results_file)
+    finally:
+        if results_file is not None:
+            results_file.close()
+
+    if args.report:
+        with open(args.report, "w") as file:
+            json.dump(report, file, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
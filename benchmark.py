@@ -0,0 +1,274 @@
+"""Stress benchmark for the update, collision and draw stages.
+
+Builds a world with a configurable number of asteroids of each size and of
+shots in flight, then times updating_group("updatable", ...),
+asteroid_collisions and updating_group("drawable", ...) separately while
+drawing to a plain off-screen Surface. Counts are topped up between frames,
+outside the timed sections, so every frame measures the same population.
+The game's lifetime limits (ASTEROID_MAX_COUNT, SHOT_MAX_COUNT, SHOT_MAX_AGE)
+are lifted, so they never trim the population inside the timed update; the
+population actually alive is reported next to the one asked for. The ship
+waits far outside the field during the collision pass, so it is never hit
+and every frame checks all asteroids against all shots; the hits that did
+happen are reported as player_hits.
+
+    python benchmark.py --asteroids 200 200 200 --shots 300 --output bench.json
+    python benchmark.py --store --compare bench.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+# stdout is for results only
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from shot import Shot
+from world import World
+from lifetime import Lifetime
+from spriteatlas import SpriteAtlas
+from constants import *
+from asteroids import Asteroid
+from main import updating_group, asteroid_collisions
+
+
+STAGES = ("update", "collisions", "draw")
+
+# where the ship waits during the collision pass, out of reach of every asteroid
+PARKING = (-10 * WORLD_WIDTH, -10 * WORLD_HEIGHT)
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+
+    if not samples:
+        return 0.0
+    rank = min(len(samples) - 1, max(0, round(fraction * (len(samples) - 1))))
+    return samples[rank]
+
+
+def summarize(samples: list[float]) -> dict:
+    """Converts a list of durations in seconds to millisecond statistics."""
+
+    ordered = sorted(samples)
+    count = len(ordered)
+    return {
+        "mean_ms": 1000 * sum(ordered) / count if count else 0.0,
+        "p50_ms": 1000 * percentile(ordered, 0.50),
+        "p90_ms": 1000 * percentile(ordered, 0.90),
+        "p99_ms": 1000 * percentile(ordered, 0.99),
+        "max_ms": 1000 * ordered[-1] if count else 0.0,
+    }
+
+
+def _on_screen(position) -> bool:
+    return 0 <= position[0] <= SCREEN_WIDTH and 0 <= position[1] <= SCREEN_HEIGHT
+
+
+def populate(world: World, asteroid_counts: list[int], shot_count: int, rng: random.Random) -> None:
+    """Tops the world up to the requested population, all of it on screen.
+
+    Entities that left the screen are removed first, then new asteroids of
+    each size (index 0 is the smallest) and shots are added at random
+    positions with random headings.
+
+    Args:
+        world: World to fill
+        asteroid_counts: Wanted number of asteroids for each of the ASTEROID_KINDS sizes
+        shot_count: Wanted number of shots in flight
+        rng: Random generator for positions and velocities
+    """
+
+    world.enter()
+    store = Asteroid.store
+    if store is not None:
+        asteroids = store.asteroids()
+        shots = store.shots()
+    else:
+        asteroids = world.asteroids.sprites()
+        shots = world.shots.sprites()
+
+    have = [0] * ASTEROID_KINDS
+    for asteroid in asteroids:
+        if _on_screen(asteroid.position):
+            have[round(asteroid.radius / ASTEROID_MIN_RADIUS) - 1] += 1
+        else:
+            asteroid.kill()
+
+    live_shots = 0
+    for shot in shots:
+        if _on_screen(shot.position):
+            live_shots += 1
+        else:
+            shot.kill()
+
+    def random_position() -> pygame.Vector2:
+        return pygame.Vector2(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT))
+
+    for kind, wanted in enumerate(asteroid_counts, start=1):
+        for _ in range(wanted - have[kind - 1]):
+            velocity = pygame.Vector2(0, rng.randint(40, 100)).rotate(rng.uniform(0, 360))
+            world.field.spawn(ASTEROID_MIN_RADIUS * kind, random_position(), velocity)
+
+    for _ in range(shot_count - live_shots):
+        position = random_position()
+        velocity = pygame.Vector2(0, PLAYER_SHOOT_SPEED).rotate(rng.uniform(0, 360))
+        if store is not None:
+            store.add_shot(position, velocity)
+        else:
+            shot = Shot.create(position.x, position.y)
+            shot.velocity.update(velocity)
+
+
+def run_benchmark(asteroid_counts: list[int], shot_count: int, frames: int = 300, warmup: int = 30,
+                  dt: float = 1 / 60, seed: int = 0, use_store: bool = False, use_atlas: bool = False) -> dict:
+    """Times each stage of a frame over a fixed population.
+
+    Args:
+        asteroid_counts: Number of asteroids for each size, smallest first
+        shot_count: Number of shots in flight
+        frames: Number of measured frames
+        warmup: Frames run before measuring
+        dt: Simulated time per frame
+        seed: Seed for the world and the population
+        use_store: Whether to benchmark the NumPy entity store path
+        use_atlas: Whether to draw through a SpriteAtlas with batched blits
+
+    Returns:
+        dict: Configuration and per-stage statistics in milliseconds
+    """
+
+    rng = random.Random(seed)
+    # nothing but leaving the field removes an entity
+    world = World(
+        seed, use_store=use_store,
+        asteroid_lifetime=Lifetime(None, LIFETIME_MARGIN, None),
+        shot_lifetime=Lifetime(None, LIFETIME_MARGIN, None),
+    )
+    player = world.player
+    lives = player.lives
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    atlas = SpriteAtlas() if use_atlas else None
+
+    samples = {stage: [] for stage in STAGES}
+    frame_samples = []
+    live = {"asteroids": [], "shots": []}
+    clock = time.perf_counter
+
+    for frame in range(warmup + frames):
+        populate(world, asteroid_counts, shot_count, rng)
+        surface.fill("#000000")
+        if frame >= warmup:
+            asteroids, shots = world.entity_counts()
+            live["asteroids"].append(asteroids)
+            live["shots"].append(shots)
+
+        t0 = clock()
+        updating_group("updatable", world.updatable, dt)
+        t1 = clock()
+
+        # a hit would reset the ship and end the pass at that asteroid
+        position = player.position.copy()
+        previous = player.previous_position.copy()
+        player.position.update(PARKING)
+        player.previous_position.update(PARKING)
+        t2 = clock()
+        asteroid_collisions(world.asteroids, world.shots, player)
+        t3 = clock()
+        player.position.update(position)
+        player.previous_position.update(previous)
+
+        t4 = clock()
+        if atlas is None:
+            updating_group("drawable", world.drawable, surface)
+        else:
+            atlas.draw(world.drawable, surface)
+        t5 = clock()
+
+        if frame >= warmup:
+            samples["update"].append(t1 - t0)
+            samples["collisions"].append(t3 - t2)
+            samples["draw"].append(t5 - t4)
+            frame_samples.append((t1 - t0) + (t3 - t2) + (t5 - t4))
+
+    return {
+        "config": {
+            "asteroids": list(asteroid_counts),
+            "shots": shot_count,
+            "frames": frames,
+            "warmup": warmup,
+            "dt": dt,
+            "seed": seed,
+            "store": use_store,
+            "atlas": use_atlas,
+        },
+        # what the measured frames started with, fewer than asked for only if something trimmed it
+        "population": {
+            name: {"mean": sum(counts) / len(counts) if counts else 0.0, "min": min(counts, default=0)}
+            for name, counts in live.items()
+        },
+        # anything but 0 means some frames did not time the whole collision pass
+        "player_hits": lives - player.lives,
+        "environment": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "machine": platform.machine(),
+        },
+        "stages": {stage: summarize(samples[stage]) for stage in STAGES},
+        "frame": summarize(frame_samples),
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Lists the stages whose mean or p99 got slower than the baseline allows."""
+
+    regressions = []
+    for stage in STAGES + ("frame",):
+        new = result["frame"] if stage == "frame" else result["stages"][stage]
+        old = baseline["frame"] if stage == "frame" else baseline["stages"][stage]
+        for metric in ("mean_ms", "p99_ms"):
+            if old[metric] > 0 and new[metric] > old[metric] * (1 + tolerance):
+                regressions.append(f"{stage} {metric}: {old[metric]:.3f} -> {new[metric]:.3f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark update, collision and draw stages.")
+    parser.add_argument("--asteroids", type=int, nargs=ASTEROID_KINDS, default=[50] * ASTEROID_KINDS,
+                        metavar="N", help="asteroids of each size, smallest first")
+    parser.add_argument("--shots", type=int, default=100)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--store", action="store_true", help="benchmark the NumPy entity store")
+    parser.add_argument("--atlas", action="store_true", help="draw through the pre-rendered sprite atlas")
+    parser.add_argument("--output", help="write the JSON result here instead of stdout")
+    parser.add_argument("--compare", help="baseline JSON result to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown, 0.10 is 10%%")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.asteroids, args.shots, args.frames, args.warmup, seed=args.seed, use_store=args.store, use_atlas=args.atlas)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(result, file, indent=2)
+    else:
+        print(json.dumps(result, indent=2))
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(result, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"regression: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
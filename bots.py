@@ -0,0 +1,71 @@
+import pygame
+
+from constants import *
+from controls import *
+from asteroids import Asteroid
+
+
+class AimBot:
+    """Input source that turns towards the nearest asteroid and fires.
+
+    It backs away from asteroids closer than `flee_distance` (plus their
+    radius) and never pauses. Cheap enough to drive thousands of simulated
+    games, and good enough to survive for a while.
+
+    Args:
+        world: The World whose player is steered
+        tolerance: Degrees off target the ship still counts as aimed
+        flee_distance: Gap to an asteroid at which the ship starts retreating
+    """
+
+    def __init__(self, world, tolerance: float = 5.0, flee_distance: float = PLAYER_RADIUS * 4) -> None:
+        self.world = world
+        self.tolerance = tolerance
+        self.flee_distance = flee_distance
+
+    def __call__(self) -> int:
+        player = self.world.player
+        position = player.position
+
+        store = Asteroid.store
+        asteroids = store.asteroids() if store is not None else self.world.asteroids
+        nearest = min(asteroids, key=lambda a: position.distance_squared_to(a.position), default=None)
+        if nearest is None:
+            return 0
+
+        mask = SHOOT
+        offset = nearest.position - position
+        # forward is (0, 1) rotated by the player's rotation
+        error = (pygame.Vector2(0, 1).angle_to(offset) - player.rotation + 180) % 360 - 180
+        if error > self.tolerance:
+            mask |= RIGHT
+        elif error < -self.tolerance:
+            mask |= LEFT
+
+        if offset.length() < self.flee_distance + nearest.radius:
+            mask |= BACKWARD
+        return mask
+
+
+def make_policy(name: str, world, seed: int):
+    """Builds the input source called `name` for one game.
+
+    Args:
+        name: One of POLICIES
+        world: The World the input will steer
+        seed: Seed for policies with randomness of their own
+
+    Raises:
+        ValueError: If there is no policy with that name
+    """
+
+    if name == "idle":
+        return idle
+    if name == "random":
+        return RandomInput(seed)
+    if name == "aim":
+        return AimBot(world)
+    raise ValueError(f"Unknown input policy {name!r}, expected one of {', '.join(POLICIES)}")
+
+
+POLICIES = ("idle", "random", "aim")
@@ -0,0 +1,103 @@
+import pygame
+
+from constants import *
+
+
+class Camera:
+    """Screen-sized view onto a playfield that may be larger than the screen.
+
+    follow() centers the view on a position, kept inside the world, and
+    sprites are drawn `offset` pixels up and left of their world position.
+
+    The camera also keeps a spatial index of the asteroids and shots: a grid
+    of `cell_size` cells, each holding the sprites whose center is in it.
+    Sprites file themselves with track() when they are created and after
+    every move, which only touches the index when they cross into another
+    cell, and kill() takes them out. visible() then only reads the cells
+    around the view, so drawing costs grow with what is on screen rather
+    than with everything in the world. Whatever is not indexed (the player,
+    an EntityStore, which culls itself) goes in `untracked` and is always
+    returned.
+
+    Args:
+        width: Width of the view, the screen's by default
+        height: Height of the view
+        world_width: Width of the playfield
+        world_height: Height of the playfield
+        cell_size: Side of the index's cells
+    """
+
+    def __init__(self, width: int = SCREEN_WIDTH, height: int = SCREEN_HEIGHT,
+                 world_width: int = WORLD_WIDTH, world_height: int = WORLD_HEIGHT,
+                 cell_size: float = ASTEROID_MAX_RADIUS * 4) -> None:
+        self.width = width
+        self.height = height
+        self.world_width = world_width
+        self.world_height = world_height
+        self.cell_size = cell_size
+        self.offset = pygame.Vector2(0, 0)
+        self.cells = {}
+        self.untracked = []
+        # sprites indexed, and returned by the last visible() call
+        self.tracked = 0
+        self.drawn = 0
+
+    @property
+    def rect(self) -> pygame.Rect:
+        """The part of the world on screen, in world coordinates."""
+
+        return pygame.Rect(round(self.offset.x), round(self.offset.y), self.width, self.height)
+
+    def follow(self, position) -> None:
+        x = position[0] - self.width / 2
+        y = position[1] - self.height / 2
+        self.offset.update(
+            max(0, min(x, self.world_width - self.width)),
+            max(0, min(y, self.world_height - self.height)),
+        )
+
+    def track(self, spr) -> None:
+        size = self.cell_size
+        x, y = spr.position
+        cell = (int(x // size), int(y // size))
+        if cell == spr.cell:
+            return
+
+        if spr.cell is None:
+            self.tracked += 1
+        else:
+            del self.cells[spr.cell][spr]
+        bucket = self.cells.get(cell)
+        if bucket is None:
+            self.cells[cell] = {spr: None}
+        else:
+            bucket[spr] = None
+        spr.cell = cell
+
+    def forget(self, spr) -> None:
+        del self.cells[spr.cell][spr]
+        spr.cell = None
+        self.tracked -= 1
+
+    def visible(self) -> list:
+        """The sprites that may show on screen, untracked ones first."""
+
+        size = self.cell_size
+        # an asteroid's center can be its radius off screen, and a sprite is
+        # drawn up to one step behind where it was filed
+        margin = ASTEROID_MAX_RADIUS * 2
+        left = self.offset.x - margin
+        top = self.offset.y - margin
+        right = self.offset.x + self.width + margin
+        bottom = self.offset.y + self.height + margin
+
+        found = list(self.untracked)
+        cells = self.cells
+        for cx in range(int(left // size), int(right // size) + 1):
+            for cy in range(int(top // size), int(bottom // size) + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.extend(bucket)
+
+        self.drawn = len(found)
+        return found
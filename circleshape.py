@@ -1,8 +1,30 @@
+import itertools
+
 import pygame
 
 
 # Base class for game objects
 class CircleShape(pygame.sprite.Sprite):
+    # SpritePool recycling dead instances of the class, if any
+    pool = None
+    # Camera of a large world indexing where sprites are, if any
+    camera = None
+    # cell of the camera's index the sprite is filed under
+    cell = None
+    # ParticleSystem explosions and exhaust are emitted into, if any
+    particles = None
+    # source of serial numbers, a new one for every life of a sprite so a
+    # recycled one reads as a new entity to whoever tracks them (server.py)
+    serials = itertools.count(1)
+    
+    @classmethod
+    def create(cls, *args):
+        """Returns a new sprite, recycled from the class pool when possible."""
+        
+        if cls.pool is None:
+            return cls(*args)
+        return cls.pool.acquire(*args)
+    
     def __init__(self, x, y, radius):
         # we will be using this later
         if hasattr(self, "containers"):
@@ -11,11 +33,51 @@ class CircleShape(pygame.sprite.Sprite):
             super().__init__()
 
         self.position = pygame.Vector2(x, y)
+        # where the previous simulation step started, for interpolation
+        self.previous_position = pygame.Vector2(x, y)
         self.velocity = pygame.Vector2(0, 0)
         self.radius = radius
+        # seconds alive, kept up to date by the LifetimeManager
+        self.age = 0.0
+        self.serial = next(self.serials)
 
+    def reset(self, x, y, radius):
+        # bringing a pooled sprite back to life, reusing its vectors
+        if hasattr(self, "containers"):
+            self.add(self.containers)
+        
+        self.position.update(x, y)
+        self.previous_position.update(x, y)
+        self.velocity.update(0, 0)
+        self.radius = radius
+        self.age = 0.0
+        self.serial = next(self.serials)
+    
+    def kill(self):
+        if self.pool is not None and self.alive():
+            self.pool.release(self)
+        if self.cell is not None:
+            self.camera.forget(self)
+        super().kill()
+    
+    def track(self):
+        # files the sprite under its new cell when it moved to another one
+        if self.camera is not None:
+            self.camera.track(self)
+    
+    def begin_interpolation(self, alpha, offset=None):
+        # drawing between the previous and the current simulation step,
+        # shifted by the camera's offset if there is one
+        self.simulated_position = self.position
+        self.position = self.previous_position.lerp(self.position, alpha)
+        if offset is not None:
+            self.position -= offset
+    
+    def end_interpolation(self):
+        self.position = self.simulated_position
+    
     def draw(self, screen):
-        # sub-classes must override
+        # sub-classes must override, returning the rect they drew on
         pass
 
     def update(self, dt):
@@ -24,3 +86,19 @@ class CircleShape(pygame.sprite.Sprite):
     
     def collision(self, other):
         return pygame.Vector2.distance_squared_to(self.position, other.position) <= (self.radius + other.radius)**2
+    
+    def swept_collision(self, other):
+        """Whether the two circles touched at any time during the last step.
+        
+        Both are taken to move in a straight line from previous_position to
+        position; the test finds their closest approach over that interval,
+        so a fast shot cannot pass through an asteroid between two steps.
+        Objects that did not move give the same answer as collision().
+        """
+        
+        start = self.previous_position - other.previous_position
+        motion = self.position - self.previous_position - other.position + other.previous_position
+        length = motion.length_squared()
+        if length:
+            start += motion * max(0.0, min(1.0, -start.dot(motion) / length))
+        return start.length_squared() <= (self.radius + other.radius)**2
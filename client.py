@@ -0,0 +1,366 @@
+"""Client of a game hosted by server.py.
+
+Plays in a window, steering with the usual keys:
+
+    python client.py --host 192.168.1.20
+
+The local ship does not wait for the server: every input is applied to it
+at once with the game's own Player code (client-side prediction), and when
+a snapshot says which input the server got to, the ship is put where the
+server has it and the inputs the server has not seen yet are applied
+again. Asteroids and shots fly in straight lines and are drawn where their
+last snapshot's velocity has taken them since; other ships are drawn
+between their last two snapshots.
+
+Without a display, a server and a number of bot clients run in this
+process over localhost, optionally through lossy, late links, and a JSON
+report of bandwidth, latency and prediction corrections is printed:
+
+    python client.py --loopback 4 --seconds 20 --latency 0.05 --jitter 0.02 --loss 0.05
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+from collections import deque
+
+# stdout is for the loopback report only
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+import netcode
+from constants import *
+from controls import PAUSE, RandomInput, keyboard
+from player import Player, ship_triangle
+from camera import Camera
+from snapshot import Snapshot
+from pipeline import LatchedInput
+
+
+class PredictedShip(Player):
+    """The local player's ship, run ahead of the server.
+
+    It is in no group, and its shots only start the cooldown: the real ones
+    come from the server.
+    """
+
+    containers = ()
+
+    def shoot(self):
+        self.timer = PLAYER_SHOOT_COOLDOWN
+
+
+class GameClient:
+    """One player's connection to a GameServer.
+
+    step() is called SIMULATION_RATE times a second: it samples `controls`,
+    predicts the local ship, sends the input and reads the snapshots that
+    arrived. view() gives what to draw at that moment.
+
+    Args:
+        address: The server's (host, port)
+        controls: Input source, see controls.py
+        latency: Seconds added to every packet sent, see SimulatedLink
+        jitter: Random extra seconds added to every packet sent
+        loss: Fraction of the packets sent that are dropped
+        seed: Seed of the simulated link
+    """
+
+    def __init__(self, address, controls=keyboard, latency: float = 0.0, jitter: float = 0.0,
+                 loss: float = 0.0, seed: int = None) -> None:
+        self.address = address
+        self.controls = controls
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind(("", 0))
+        self.link = netcode.SimulatedLink(sock, latency, jitter, loss, seed)
+        self.dt = 1 / SIMULATION_RATE
+        self.snapshot_interval = max(1, SIMULATION_RATE // NET_SNAPSHOT_RATE) / SIMULATION_RATE
+
+        self.player_id = None
+        self.ship = PredictedShip(WORLD_WIDTH / 2, WORLD_HEIGHT / 2)
+        self.ship.controls = self.input = LatchedInput()
+        self.sequence = 0
+        # inputs the server has not applied yet, as (number, mask), and when they were sent
+        self.pending = deque(maxlen=SIMULATION_RATE * 2)
+        self.sent_at = {}
+        # decoded tables of the latest snapshots, by tick
+        self.tables = {}
+        self.tick = 0
+        self.table = {}
+        self.received_at = 0.0
+        self.players = {}
+        self.previous_players = {}
+        self.lives = PLAYER_NUM_LIVES
+        self.score = 0
+        self.camera = Camera() if WORLD_WIDTH > SCREEN_WIDTH or WORLD_HEIGHT > SCREEN_HEIGHT else None
+
+        self.snapshots = 0
+        self.undecodable = 0
+        self.bytes_received = 0
+        self.latencies = []
+        self.corrections = []
+
+    @property
+    def game_over(self) -> bool:
+        return self.lives <= 0
+
+    def connect(self, timeout: float = NET_TIMEOUT) -> bool:
+        """Asks the server for a ship until it answers, False on timeout."""
+
+        deadline = time.perf_counter() + timeout
+        hello = bytes((netcode.HELLO,))
+        while time.perf_counter() < deadline:
+            self.link.sendto(hello, self.address)
+            self.link.flush()
+            retry = time.perf_counter() + 0.2
+            while time.perf_counter() < retry:
+                for data, address in self.link.receive():
+                    if data and data[0] == netcode.WELCOME:
+                        _, self.player_id, _ = netcode.WELCOME_PACKET.unpack_from(data)
+                        return True
+                time.sleep(0.005)
+                self.link.flush()
+        return False
+
+    def step(self) -> None:
+        mask = self.controls() & ~PAUSE
+        self.sequence += 1
+        self.pending.append((self.sequence, mask))
+        now = time.perf_counter()
+        self.sent_at[self.sequence] = now
+
+        if not self.game_over:
+            self.input.mask = mask
+            self.ship.update(self.dt)
+
+        recent = [m for _, m in list(self.pending)[-NET_INPUT_REDUNDANCY:]]
+        self.link.sendto(netcode.encode_input(self.tick, self.sequence, recent), self.address)
+
+        for data, address in self.link.receive():
+            if data and data[0] == netcode.SNAPSHOT:
+                self._receive_snapshot(data, now)
+        self.link.flush()
+
+    def _receive_snapshot(self, data: bytes, now: float) -> None:
+        self.bytes_received += len(data)
+        try:
+            tick, sequence, player_id, players, table = netcode.decode_snapshot(data, self.tables)
+        except (KeyError, ValueError):
+            # its baseline is gone; the server falls back to our last ack
+            self.undecodable += 1
+            return
+        if tick <= self.tick:
+            # arrived out of order
+            return
+
+        self.snapshots += 1
+        self.tick = tick
+        self.table = table
+        self.tables[tick] = table
+        for old in [t for t in self.tables if t <= tick - 32 * self.snapshot_interval * SIMULATION_RATE]:
+            del self.tables[old]
+        self.received_at = now
+        self.previous_players = self.players
+        self.players = {record[0]: record for record in players}
+
+        sent = self.sent_at.pop(sequence, None)
+        if sent is not None:
+            self.latencies.append(now - sent)
+        for number in [n for n in self.sent_at if n < sequence]:
+            del self.sent_at[number]
+
+        own = self.players.get(self.player_id)
+        if own is not None:
+            self._reconcile(own, sequence)
+
+    def _reconcile(self, record: tuple, sequence: int) -> None:
+        _, x, y, rotation, timer, lives, score = record
+        self.lives = lives
+        self.score = score
+
+        ship = self.ship
+        predicted = pygame.Vector2(ship.position)
+        ship.position.update(x, y)
+        ship.previous_position.update(x, y)
+        ship.rotation = rotation
+        ship.timer = timer
+
+        while self.pending and self.pending[0][0] <= sequence:
+            self.pending.popleft()
+        if not self.game_over:
+            for _, mask in self.pending:
+                self.input.mask = mask
+                ship.update(self.dt)
+        self.corrections.append(predicted.distance_to(ship.position))
+
+    def view(self, now: float = None) -> tuple:
+        """What to draw now, in screen coordinates.
+
+        Returns:
+            tuple: A Snapshot with the asteroids, shots and the local ship,
+            and the (x, y, rotation) of the other ships
+        """
+
+        if now is None:
+            now = time.perf_counter()
+        elapsed = now - self.received_at
+        offset = (0, 0)
+        if self.camera is not None:
+            self.camera.follow(self.ship.position)
+            offset = self.camera.offset
+
+        asteroids = []
+        shots = []
+        for kind, x, y, vx, vy in self.table.values():
+            x = x / netcode.POSITION_SCALE + vx / netcode.VELOCITY_SCALE * elapsed - offset[0]
+            y = y / netcode.POSITION_SCALE + vy / netcode.VELOCITY_SCALE * elapsed - offset[1]
+            if kind:
+                asteroids.append((x, y, kind * ASTEROID_MIN_RADIUS))
+            else:
+                shots.append((x, y))
+
+        alpha = min(1.0, elapsed / self.snapshot_interval)
+        others = []
+        for player_id, (_, x, y, rotation, _, lives, _) in self.players.items():
+            if player_id == self.player_id or lives <= 0:
+                continue
+            before = self.previous_players.get(player_id)
+            if before is not None and abs(before[1] - x) < SCREEN_WIDTH / 2 and abs(before[2] - y) < SCREEN_HEIGHT / 2:
+                x = before[1] + (x - before[1]) * alpha
+                y = before[2] + (y - before[2]) * alpha
+            others.append((x - offset[0], y - offset[1], rotation))
+
+        ship = self.ship
+        own = (ship.position.x - offset[0], ship.position.y - offset[1], ship.rotation)
+        return Snapshot(tuple(asteroids), tuple(shots), own, self.score, self.lives), others
+
+    def close(self) -> None:
+        self.link.sendto(bytes((netcode.BYE,)), self.address)
+        self.link.flush()
+        self.link.close()
+
+    def stats(self) -> dict:
+        latencies = sorted(self.latencies)
+        seconds = self.sequence * self.dt
+        return {
+            "player": self.player_id,
+            "snapshots": self.snapshots,
+            "undecodable": self.undecodable,
+            "bytes_received_per_second": self.bytes_received / seconds if seconds else 0.0,
+            "bytes_sent_per_second": self.link.bytes_sent / seconds if seconds else 0.0,
+            "mean_latency_ms": 1000 * sum(latencies) / len(latencies) if latencies else None,
+            "p95_latency_ms": 1000 * latencies[int(0.95 * (len(latencies) - 1))] if latencies else None,
+            "mean_correction_px": sum(self.corrections) / len(self.corrections) if self.corrections else 0.0,
+            "max_correction_px": max(self.corrections, default=0.0),
+            "score": self.score,
+            "lives": self.lives,
+        }
+
+
+def play(address, latency: float = 0.0, jitter: float = 0.0, loss: float = 0.0) -> None:
+    """Plays on a server in a window, until it is closed or the ship is lost."""
+
+    # the HUD helper lives with the single player loop
+    from main import draw_hud
+    from textcache import text_cache
+
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    fps = pygame.time.Clock()
+    font = text_cache.font(None, 32)
+
+    client = GameClient(address, keyboard, latency, jitter, loss)
+    if not client.connect():
+        print(f"No answer from {address[0]}:{address[1]}", file=sys.stderr)
+        pygame.quit()
+        return
+
+    try:
+        while not client.game_over:
+            fps.tick(SIMULATION_RATE)
+            if any(event.type == pygame.QUIT for event in pygame.event.get()):
+                return
+            client.step()
+
+            snapshot, others = client.view()
+            screen.fill("black")
+            snapshot.draw(screen)
+            for x, y, rotation in others:
+                pygame.draw.polygon(screen, (120, 200, 255), ship_triangle(pygame.Vector2(x, y), rotation, PLAYER_RADIUS), 2)
+            draw_hud(font, screen, snapshot)
+            pygame.display.flip()
+        print(f"Game Over! Score: {client.score}")
+    finally:
+        client.close()
+        pygame.quit()
+
+
+def run_loopback(players: int = 4, seconds: float = 10.0, latency: float = 0.0, jitter: float = 0.0,
+                 loss: float = 0.0, seed: int = 0) -> dict:
+    """Runs a server and bot clients (RandomInput) over localhost.
+
+    Both directions get the same simulated latency, jitter and loss.
+
+    Returns:
+        dict: The server's stats and every client's
+    """
+
+    # imported here: the server module keeps SDL away from the display
+    from server import GameServer
+
+    server = GameServer(("127.0.0.1", 0), seed, latency, jitter, loss)
+    thread = threading.Thread(target=server.serve, name="server", daemon=True)
+    thread.start()
+
+    clients = [
+        GameClient(server.address, RandomInput(seed + i), latency, jitter, loss, seed + i)
+        for i in range(players)
+    ]
+    try:
+        for client in clients:
+            if not client.connect():
+                raise ConnectionError("the loopback server did not answer")
+
+        start = next_tick = time.perf_counter()
+        while next_tick - start < seconds:
+            for client in clients:
+                client.step()
+            next_tick += 1 / SIMULATION_RATE
+            time.sleep(max(0.0, next_tick - time.perf_counter()))
+        report = {"server": server.stats()}
+    finally:
+        for client in clients:
+            client.close()
+        server.stop()
+        thread.join()
+
+    report["clients"] = [client.stats() for client in clients]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play on a server.py game, or test one locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=NET_PORT)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every packet sent")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra seconds per packet")
+    parser.add_argument("--loss", type=float, default=0.0, help="fraction of packets dropped")
+    parser.add_argument("--loopback", type=int, metavar="PLAYERS", help="run a local server and this many bots")
+    parser.add_argument("--seconds", type=float, default=10.0, help="length of a loopback run")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.loopback:
+        report = run_loopback(args.loopback, args.seconds, args.latency, args.jitter, args.loss, args.seed)
+        print(json.dumps(report))
+    else:
+        play((args.host, args.port), args.latency, args.jitter, args.loss)
+
+
+if __name__ == "__main__":
+    main()
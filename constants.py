@@ -13,4 +13,129 @@ PLAYER_SPEED = 200
 PLAYER_SHOOT_SPEED = 500
 PLAYER_SHOOT_COOLDOWN = 0.3
 
-SHOT_RADIUS = 5
\ No newline at end of file
+SHOT_RADIUS = 5
+
+# entities further off-screen than this (plus their radius) are removed,
+# as are those past their maximum age (seconds) or above the maximum count
+LIFETIME_MARGIN = ASTEROID_MAX_RADIUS
+ASTEROID_MAX_AGE = None
+ASTEROID_MAX_COUNT = 512
+SHOT_MAX_AGE = 4.0
+SHOT_MAX_COUNT = 256
+
+# dead sprites kept for reuse, 0 disables pooling
+ASTEROID_POOL_SIZE = 512
+SHOT_POOL_SIZE = 256
+
+# simulate at a fixed rate, rendering as fast as allowed (0 is uncapped)
+# and running at most MAX_CATCHUP_STEPS simulation steps per frame
+FIXED_TIMESTEP = False
+SIMULATION_RATE = 60
+RENDER_RATE = 0
+MAX_CATCHUP_STEPS = 5
+VSYNC = False
+
+# keep asteroids and shots in NumPy arrays instead of one sprite each
+USE_ENTITY_STORE = False
+
+# frames kept by the profiler, where to dump them on exit (.csv or .json), and every
+# how many frames the numbers on its overlay are rendered again
+PROFILER_FRAMES = 600
+PROFILER_OUTPUT = None
+PROFILER_OVERLAY_INTERVAL = 30
+
+# rendered text surfaces kept by the shared text cache
+TEXT_CACHE_SIZE = 256
+
+# redraw only changed regions, with a full flip above this fraction of the screen
+DIRTY_RECT_RENDERING = False
+DIRTY_RECT_MAX_FRACTION = 0.5
+
+# blit sprites from surfaces pre-rendered at startup, ship headings in 3 degree steps
+USE_SPRITE_ATLAS = False
+PLAYER_ROTATION_STEPS = 120
+
+# record the inputs of every game to this directory (None disables), see recording.py
+RECORDING_DIR = None
+RECORDING_BUFFER_SIZE = 4096
+
+# finished games are appended to this log, the best SCORE_TOP_K kept in an index
+SCORE_LOG_PATH = "scores.log"
+SCORE_TOP_K = 100
+SCOREBOARD_PAGE_SIZE = 10
+
+# decoded images are cached here as raw pixels (None disables), and the time
+# from launch to the first menu frame is printed when STARTUP_REPORT is set
+ASSET_CACHE_DIR = ".cache"
+STARTUP_REPORT = False
+
+# menus sleep until an event arrives (at most this many ms) instead of redrawing every frame
+MENU_IDLE = True
+MENU_IDLE_TIMEOUT = 500
+
+# test collisions over each step's motion, not just where objects ended up
+SWEPT_COLLISIONS = True
+
+# simulate each frame on a worker thread while the previous one is drawn
+PIPELINED_SIMULATION = False
+
+# rewinding: memory kept for recent snapshots, and simulation steps between two
+REWIND_BUFFER_BYTES = 4 * 1024 * 1024
+REWIND_INTERVAL = 4
+
+# where the pause menu saves a game, for the main menu to load it again
+SAVE_PATH = "savegame.astsav"
+
+# size of the playfield; when larger than the screen a camera follows the player
+WORLD_WIDTH = SCREEN_WIDTH
+WORLD_HEIGHT = SCREEN_HEIGHT
+
+# in a larger world, asteroids further than FAR_UPDATE_MARGIN outside a screen
+# around the player only move every FAR_UPDATE_INTERVAL steps (1 moves all every step)
+FAR_UPDATE_MARGIN = 400
+FAR_UPDATE_INTERVAL = 1
+
+# when frames keep the CPU busy for more than GOVERNOR_DEGRADE of 1/GOVERNOR_TARGET_FPS
+# (averaged over GOVERNOR_WINDOW frames), quality steps down through
+# FrameGovernor.LEVELS, and back up after GOVERNOR_RECOVERY_FRAMES in a row under GOVERNOR_RECOVER.
+# Off by default: the lower levels also spawn fewer asteroids, making the game easier on slow machines
+FRAME_GOVERNOR = False
+GOVERNOR_TARGET_FPS = 60
+GOVERNOR_DEGRADE = 0.9
+GOVERNOR_RECOVER = 0.5
+GOVERNOR_WINDOW = 30
+GOVERNOR_RECOVERY_FRAMES = 300
+
+# multiplayer (server.py, client.py): UDP port, players per server, state snapshots sent
+# per second, past inputs repeated in every input packet against loss, and seconds of
+# silence before a client is dropped
+NET_PORT = 7777
+NET_MAX_PLAYERS = 8
+NET_SNAPSHOT_RATE = 20
+NET_INPUT_REDUNDANCY = 8
+NET_TIMEOUT = 5.0
+
+# explosion debris and thruster exhaust drawn straight into the screen's pixels (a
+# capacity of 0 disables them): particles per asteroid size and per step of thrust,
+# seconds debris lasts, and the fraction of their speed particles keep after a second
+PARTICLE_CAPACITY = 32768
+PARTICLES_PER_EXPLOSION = 12
+PARTICLES_PER_THRUST = 2
+PARTICLE_LIFETIME = 1.0
+PARTICLE_DRAG = 0.3
+
+# with GC_CONTROL the cyclic garbage collector is off while playing (what exists when a
+# game starts is frozen out of it) and runs in frames leaving part of the frame budget
+# unused: a frame plus a collection stay within GC_SPARE_FRACTION of it, until
+# GC_FORCE_THRESHOLD times the usual allocations force one. Menus and pause collect freely.
+# Off by default; what was collected is printed with ALLOCATION_DIAGNOSTICS or PROFILER_OUTPUT
+GC_CONTROL = False
+GC_SPARE_FRACTION = 0.5
+GC_FORCE_THRESHOLD = 20
+
+# with ALLOCATION_DIAGNOSTICS every ALLOCATION_SAMPLE_INTERVAL-th frame is traced with
+# tracemalloc, and allocations per stage with the ALLOCATION_TOP_SITES busiest lines are
+# printed on exit (frame times suffer meanwhile)
+ALLOCATION_DIAGNOSTICS = False
+ALLOCATION_SAMPLE_INTERVAL = 30
+ALLOCATION_TOP_SITES = 5
@@ -0,0 +1,87 @@
+import random
+
+import pygame
+
+
+# bits of the input mask read by Player.update
+LEFT = 1
+RIGHT = 2
+FORWARD = 4
+BACKWARD = 8
+SHOOT = 16
+PAUSE = 32
+
+
+def idle() -> int:
+    """Input source for a ship nobody is steering."""
+
+    return 0
+
+
+def keyboard() -> int:
+    """Reads the keyboard and packs the keys the player uses into a bitmask."""
+
+    keys = pygame.key.get_pressed()
+    mask = 0
+
+    if keys[pygame.K_a] or keys[pygame.K_LEFT]:
+        mask |= LEFT
+    if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
+        mask |= RIGHT
+    if keys[pygame.K_w] or keys[pygame.K_UP]:
+        mask |= FORWARD
+    if keys[pygame.K_s] or keys[pygame.K_DOWN]:
+        mask |= BACKWARD
+    if keys[pygame.K_SPACE]:
+        mask |= SHOOT
+    if keys[pygame.K_ESCAPE]:
+        mask |= PAUSE
+
+    return mask
+
+
+class ScriptedInput:
+    """Input source replaying a fixed sequence of bitmasks, one per call.
+
+    Once the script runs out it keeps returning `default` (no keys pressed),
+    or starts over when `loop` is set.
+    """
+
+    def __init__(self, masks, loop: bool = False, default: int = 0) -> None:
+        self.masks = list(masks)
+        self.loop = loop
+        self.default = default
+        self.position = 0
+
+    def __call__(self) -> int:
+        if self.position >= len(self.masks):
+            if not self.loop or not self.masks:
+                return self.default
+            self.position = 0
+
+        mask = self.masks[self.position]
+        self.position += 1
+        return mask
+
+
+class RandomInput:
+    """Input source pressing random keys, each combination held for a while.
+
+    Masks combine the movement and shooting bits (never PAUSE) and are kept
+    for a random number of calls within `hold`. The generator is private, so
+    a seed always gives the same inputs.
+    """
+
+    def __init__(self, seed: int = None, hold: tuple[int, int] = (5, 30)) -> None:
+        self.rng = random.Random(seed)
+        self.hold = hold
+        self.mask = 0
+        self.remaining = 0
+
+    def __call__(self) -> int:
+        if self.remaining <= 0:
+            self.mask = self.rng.randrange(SHOOT * 2)
+            self.remaining = self.rng.randint(*self.hold)
+
+        self.remaining -= 1
+        return self.mask
@@ -0,0 +1,370 @@
+import numpy as np
+import pygame
+
+from shot import Shot, draw_shot
+from constants import *
+from asteroids import Asteroid
+from gamestates import GameState
+
+
+ASTEROID = 0
+SHOT = 1
+
+
+def _closest_approach(start: np.ndarray, motion: np.ndarray) -> np.ndarray:
+    """Smallest squared distance between pairs of points moving in straight lines.
+
+    Args:
+        start: Offsets between the points when the step began, (..., 2)
+        motion: How much each offset changed over the step, (..., 2)
+    """
+
+    length = np.einsum("...k,...k->...", motion, motion)
+    along = -np.einsum("...k,...k->...", start, motion)
+    t = np.clip(np.divide(along, length, out=np.zeros_like(length), where=length > 0), 0.0, 1.0)
+    closest = start + motion * t[..., None]
+    return np.einsum("...k,...k->...", closest, closest)
+
+
+class EntityStore(pygame.sprite.Sprite):
+    """Structure-of-arrays storage for asteroids and shots.
+
+    Positions, velocities, radii, kinds and alive flags live in contiguous
+    NumPy arrays, so integration, out-of-bounds culling and circle-circle
+    collision each run as one vectorized operation instead of one Python call
+    per sprite. Slots are appended in creation order and compacted in place,
+    which keeps the iteration order of a pygame Group.
+
+    The store itself is a sprite: placed in the updatable and drawable groups
+    it is updated and drawn once per frame like any other object. Entities
+    are only removed by collisions and by reclaim(), which the
+    LifetimeManager calls every frame.
+    """
+
+    ASTEROID = ASTEROID
+    SHOT = SHOT
+
+    def __init__(self, capacity: int = 1024) -> None:
+        if hasattr(self, "containers"):
+            super().__init__(self.containers)
+        else:
+            super().__init__()
+
+        self.capacity = capacity
+        self.size = 0
+        self.position = np.zeros((capacity, 2))
+        self.previous = np.zeros((capacity, 2))
+        self.velocity = np.zeros((capacity, 2))
+        self.radius = np.zeros(capacity)
+        self.age = np.zeros(capacity)
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.alive[:self.size]))
+
+    def count(self, kind: int) -> int:
+        return len(self.indices(kind))
+
+    def counts(self) -> tuple[int, int]:
+        """Number of live asteroids and shots."""
+
+        n = self.size
+        live = self.kind[:n][self.alive[:n]]
+        shots = int(np.count_nonzero(live))
+        return len(live) - shots, shots
+
+    def indices(self, kind: int) -> np.ndarray:
+        """Returns the slots of every live entity of a kind, in creation order."""
+
+        n = self.size
+        return np.flatnonzero(self.alive[:n] & (self.kind[:n] == kind))
+
+    def _grow(self) -> None:
+        capacity = self.capacity * 2
+        for name in ("position", "previous", "velocity", "radius", "age", "kind", "alive"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.capacity] = old
+            setattr(self, name, new)
+        self.capacity = capacity
+
+    def compact(self) -> None:
+        """Moves live entities to the front, keeping their relative order.
+
+        Slot indices change, so views taken before compacting become invalid.
+        """
+
+        n = self.size
+        keep = np.flatnonzero(self.alive[:n])
+        m = len(keep)
+        for array in (self.position, self.previous, self.velocity, self.radius, self.age, self.kind):
+            array[:m] = array[keep]
+        self.alive[:m] = True
+        self.alive[m:n] = False
+        self.size = m
+
+    def append(self, kind: int, position, velocity, radius: float) -> int:
+        if self.size == self.capacity:
+            self._grow()
+
+        index = self.size
+        self.position[index] = (position[0], position[1])
+        self.previous[index] = self.position[index]
+        self.velocity[index] = (velocity[0], velocity[1])
+        self.radius[index] = radius
+        self.age[index] = 0.0
+        self.kind[index] = kind
+        self.alive[index] = True
+        self.size += 1
+        return index
+
+    def add_asteroid(self, position, velocity, radius: float) -> int:
+        return self.append(ASTEROID, position, velocity, radius)
+
+    def add_shot(self, position, velocity) -> int:
+        return self.append(SHOT, position, velocity, SHOT_RADIUS)
+
+    def kill_slot(self, index: int) -> None:
+        self.alive[index] = False
+
+    def view(self, index: int):
+        """Returns an Asteroid or Shot sprite backed by the given slot."""
+
+        if self.kind[index] == ASTEROID:
+            return AsteroidView(self, index)
+        return ShotView(self, index)
+
+    def asteroids(self) -> list:
+        return [AsteroidView(self, i) for i in self.indices(ASTEROID).tolist()]
+
+    def shots(self) -> list:
+        return [ShotView(self, i) for i in self.indices(SHOT).tolist()]
+
+    def update(self, dt: float) -> None:
+        n = self.size
+        if n > 64 and np.count_nonzero(self.alive[:n]) < n // 2:
+            self.compact()
+            n = self.size
+
+        position = self.position[:n]
+        self.previous[:n] = position
+        position += self.velocity[:n] * dt
+        self.age[:n] += dt
+
+    def reclaim(self, kind: int, max_age: float = None, margin: float = LIFETIME_MARGIN, max_count: int = None) -> int:
+        """Kills every entity of a kind that is too old, too far outside the playfield
+        or beyond the allowed count (oldest first), in one vectorized pass.
+
+        Returns:
+            int: Number of entities removed
+        """
+
+        n = self.size
+        live = self.alive[:n] & (self.kind[:n] == kind)
+        # sprites are swept before they move, so the store tests where its
+        # entities started the step; a shot leaving the playfield while passing
+        # an asteroid still gets its swept collision test, as with sprites
+        position = self.previous[:n]
+        reach = self.radius[:n] + margin
+        x = position[:, 0]
+        y = position[:, 1]
+        expired = live & ((x < -reach) | (x > WORLD_WIDTH + reach) | (y < -reach) | (y > WORLD_HEIGHT + reach))
+
+        if max_age is not None:
+            expired |= live & (self.age[:n] > max_age)
+
+        if max_count is not None:
+            survivors = np.flatnonzero(live & ~expired)
+            excess = len(survivors) - max_count
+            if excess > 0:
+                expired[survivors[:excess]] = True
+
+        self.alive[:n] &= ~expired
+        return int(np.count_nonzero(expired))
+
+    def begin_interpolation(self, alpha: float, offset=None) -> None:
+        """Swaps in positions between the previous and the current step,
+        shifted by a camera offset if one is given."""
+
+        self.simulated_position = self.position
+        self.position = self.previous + (self.position - self.previous) * alpha
+        if offset is not None:
+            self.position -= (offset[0], offset[1])
+
+    def end_interpolation(self) -> None:
+        self.position = self.simulated_position
+
+    def _on_screen(self) -> np.ndarray:
+        # slots of the live entities overlapping the screen; the store culls
+        # itself, a Camera only indexes sprites
+        n = self.size
+        reach = self.radius[:n]
+        x = self.position[:n, 0]
+        y = self.position[:n, 1]
+        return np.flatnonzero(
+            self.alive[:n] & (x > -reach) & (x < SCREEN_WIDTH + reach) & (y > -reach) & (y < SCREEN_HEIGHT + reach)
+        )
+
+    def draw(self, screen: pygame.Surface) -> list[pygame.Rect]:
+        circle = pygame.draw.circle
+        rects = []
+        add = rects.append
+        live = self._on_screen()
+        positions = self.position[live].tolist()
+        radii = self.radius[live].tolist()
+        kinds = self.kind[live].tolist()
+
+        for position, radius, kind in zip(positions, radii, kinds):
+            if kind == ASTEROID:
+                add(circle(screen, (255, 165, 0), position, radius, 2))
+            else:
+                add(draw_shot(screen, position))
+
+        return rects
+
+    def blit_sources(self, atlas) -> list:
+        """(surface, top-left) pairs of every live entity on screen for a SpriteAtlas."""
+
+        live = self._on_screen()
+        radius = self.radius[live]
+        corners = np.rint(self.position[live] - radius[:, None]).astype(int).tolist()
+        asteroid_surfaces = atlas.asteroids
+        shot_surface = atlas.shot
+        # corners are a radius off the center, the shot frame may be smaller
+        shift = round(SHOT_RADIUS - atlas.shot_offset.x)
+
+        return [
+            (shot_surface, (corner[0] + shift, corner[1] + shift)) if kind == SHOT
+            else (asteroid_surfaces[r], corner)
+            for corner, r, kind in zip(corners, radius.tolist(), self.kind[live].tolist())
+        ]
+
+    def collide(self, player) -> GameState:
+        """Vectorized equivalent of main.asteroid_collisions.
+
+        Overlapping pairs are found with array broadcasting, in chunks to bound
+        memory, then resolved in asteroid-then-shot order through sprite views
+        so the split-then-score rules are exactly those of the sprite classes.
+        With SWEPT_COLLISIONS pairs are tested over the whole step, like
+        CircleShape.swept_collision.
+
+        Args:
+            player: The player's ship object
+
+        Returns:
+            GameState: END_GAME if no lives left, PLAYING otherwise
+        """
+
+        asteroids = self.indices(ASTEROID)
+        shots = self.indices(SHOT)
+        asteroid_position = self.position[asteroids]
+        asteroid_radius = self.radius[asteroids]
+
+        if SWEPT_COLLISIONS:
+            # closest approach over the step, as CircleShape.swept_collision
+            asteroid_start = self.previous[asteroids]
+            asteroid_motion = asteroid_position - asteroid_start
+            player_start = np.array((player.previous_position.x, player.previous_position.y))
+            player_motion = np.array((player.position.x, player.position.y)) - player_start
+            player_distance = _closest_approach(asteroid_start - player_start, asteroid_motion - player_motion)
+        else:
+            offset = asteroid_position - (player.position.x, player.position.y)
+            player_distance = np.einsum("ij,ij->i", offset, offset)
+        player_hit = player_distance <= (asteroid_radius + player.radius) ** 2
+
+        # asteroids after the first one touching the player are never checked
+        stop = int(np.argmax(player_hit)) if player_hit.any() else len(asteroids)
+
+        if len(shots) and stop:
+            shot_position = self.position[shots]
+            shot_radius = self.radius[shots]
+            if SWEPT_COLLISIONS:
+                shot_start = self.previous[shots]
+                shot_motion = shot_position - shot_start
+            rows_per_chunk = max(1, (1 << 20) // len(shots))
+
+            for start in range(0, stop, rows_per_chunk):
+                end = min(start + rows_per_chunk, stop)
+                if SWEPT_COLLISIONS:
+                    distance = _closest_approach(
+                        asteroid_start[start:end, None, :] - shot_start[None, :, :],
+                        asteroid_motion[start:end, None, :] - shot_motion[None, :, :],
+                    )
+                else:
+                    diff = asteroid_position[start:end, None, :] - shot_position[None, :, :]
+                    distance = np.einsum("ijk,ijk->ij", diff, diff)
+                reach = (asteroid_radius[start:end, None] + shot_radius[None, :]) ** 2
+                rows, cols = np.nonzero(distance <= reach)
+
+                for row, col in zip(rows.tolist(), cols.tolist()):
+                    bullet = shots[col]
+                    if not self.alive[bullet]:
+                        continue
+                    self.kill_slot(bullet)
+                    self.view(asteroids[start + row]).split()
+                    player.score += 100
+
+        if stop < len(asteroids):
+            player.lives -= 1
+            if player.lives <= 0:
+                return GameState.END_GAME
+
+            player.reset_position()
+
+        return GameState.PLAYING
+
+
+class StoreView:
+    """Mixin turning a sprite class into a thin view over one store slot.
+
+    Views belong to no group; reading or assigning position, velocity and
+    radius goes straight to the arrays, and kill() clears the alive flag.
+    """
+
+    def __init__(self, store: EntityStore, index: int) -> None:
+        pygame.sprite.Sprite.__init__(self)
+        self.store = store
+        self.index = index
+
+    @property
+    def position(self) -> pygame.Vector2:
+        return pygame.Vector2(*self.store.position[self.index])
+
+    @position.setter
+    def position(self, value) -> None:
+        self.store.position[self.index] = (value[0], value[1])
+
+    @property
+    def velocity(self) -> pygame.Vector2:
+        return pygame.Vector2(*self.store.velocity[self.index])
+
+    @velocity.setter
+    def velocity(self, value) -> None:
+        self.store.velocity[self.index] = (value[0], value[1])
+
+    @property
+    def radius(self) -> float:
+        return float(self.store.radius[self.index])
+
+    @radius.setter
+    def radius(self, value: float) -> None:
+        self.store.radius[self.index] = value
+
+    def update(self, dt: float) -> None:
+        # integration is done for every slot at once by EntityStore.update
+        pass
+
+    def kill(self) -> None:
+        self.store.kill_slot(self.index)
+
+    def alive(self) -> bool:
+        return bool(self.store.alive[self.index])
+
+
+class AsteroidView(StoreView, Asteroid):
+    pass
+
+
+class ShotView(StoreView, Shot):
+    pass
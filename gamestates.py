@@ -1,6 +1,17 @@
+import os
+import time
+
 import pygame
 
 from enum import Enum
+from constants import SCOREBOARD_PAGE_SIZE, MENU_IDLE, MENU_IDLE_TIMEOUT, SAVE_PATH
+from assets import assets
+from startup import startup_timer
+from textcache import text_cache
+
+
+# window events after which a menu has to be drawn again
+EXPOSE_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWSHOWN, pygame.WINDOWRESTORED, pygame.WINDOWSIZECHANGED)
 
 
 class GameState(Enum):
@@ -10,46 +21,83 @@ class GameState(Enum):
     SCOREBOARD = 3
     PAUSED = 4
     END_GAME = 5
+    SAVE_GAME = 6
+    LOAD_GAME = 7
  
    
 class GameScreens:
-    def __init__(self, screen: pygame.Surface) -> None:
+    def __init__(self, screen: pygame.Surface, scores=None) -> None:
         self.screen = screen
-        self.background = pygame.image.load("./background.jpeg")
+        # ScoreStore shown on the scoreboard
+        self.scores = scores
         self.selected_option = 0
         self.menu_options = ["Start Game", "Score Board", "Exit"]
-        self.game_font = pygame.font.Font(None, 32)
+        self.game_font = text_cache.font(None, 32)
+        # translucent button backgrounds, one per button width
+        self.button_surfaces = {}
+        # translucent background of the scoreboard rows
+        self.score_panel = None
+        
+    @property
+    def background(self) -> pygame.Surface:
+        # decoded and converted on first use, see assets.py
+        return assets.image("./background.jpeg")
         
     def _draw_menu_screen(self, title: str, options: list, fps, rate) -> GameState:
         self.selected_option = 0
+        redraw = True
         
         while True:
-            dt = fps.tick(rate)/1000
+            if redraw or not MENU_IDLE:
+                self.screen.blit(self.background, (0, 0))
+                self._draw_options(title, options)
+                pygame.display.flip()
+                startup_timer.finish("first menu frame")
+                redraw = False
             
-            for event in pygame.event.get():
+            for event in self._next_events(fps, rate):
                 if event.type == pygame.QUIT:
                     return None
                 
+                elif event.type in EXPOSE_EVENTS:
+                    redraw = True
+                
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_UP:
-                        self.selected_option = (self.selected_option - 1) % len(self.menu_options)
+                        self.selected_option = (self.selected_option - 1) % len(options)
+                        redraw = True
                         #print(f"Selected: {self.menu_options[self.selected_option]}")  # Debug print
                     elif event.key == pygame.K_DOWN:
-                        self.selected_option = (self.selected_option + 1) % len(self.menu_options)
+                        self.selected_option = (self.selected_option + 1) % len(options)
+                        redraw = True
                         #print(f"Selected: {self.menu_options[self.selected_option]}")  # Debug print
                     elif event.key == pygame.K_RETURN:
                         return self._handle_menu_selection(options)
                     
                     elif event.key == pygame.K_ESCAPE and title == "PAUSED":
                         return GameState.PLAYING
-                    
-            self.screen.blit(self.background, (0, 0))
-            self._draw_options(title, options)
-            pygame.display.flip()
+    
+    @staticmethod
+    def _next_events(fps, rate) -> list:
+        """Events for a menu screen to handle before it draws again.
+        
+        With MENU_IDLE this sleeps until an event arrives (or for at most
+        MENU_IDLE_TIMEOUT milliseconds) instead of waking `rate` times a
+        second, so a menu nobody touches costs next to nothing.
+        """
+        
+        if not MENU_IDLE:
+            fps.tick(rate)
+            return pygame.event.get()
+        
+        event = pygame.event.wait(MENU_IDLE_TIMEOUT)
+        # restarts the clock, the game's next frame must not span the wait
+        fps.tick()
+        return [event] + pygame.event.get()
    
     def _draw_title(self, title: str):
         # Title setup
-        title_font = pygame.font.Font(None, 128)  # Bigger font for title
+        title_font = text_cache.font(None, 128)  # Bigger font for title
         title_text = title.upper()
         title_color = (255, 165, 0)  # Orange color
         title_y = 150  # Position from top
@@ -70,7 +118,7 @@ class GameScreens:
         
         self._draw_title(title)
         
-        font = pygame.font.Font(None, 64)  # None uses default font, 64 is text size
+        font = text_cache.font(None, 64)  # None uses default font, 64 is text size
         menu_y = 300  # Starting y position for first option
         spacing = 80  # Vertical space between options
 
@@ -83,11 +131,14 @@ class GameScreens:
         button_height = 60
         button_alpha = 128  # Transparency (0 is fully transparent, 255 is solid)
     
-        for i, option in enumerate(options):
-            
+        button_surface = self.button_surfaces.get(button_width)
+        if button_surface is None:
             button_surface = pygame.Surface((button_width, button_height))
             button_surface.fill((0, 0, 0))  # Fill with black
             button_surface.set_alpha(button_alpha)  # Set transparency
+            self.button_surfaces[button_width] = button_surface
+    
+        for i, option in enumerate(options):
             
             # Position for the button
             button_rect = button_surface.get_rect(
@@ -106,29 +157,127 @@ class GameScreens:
             self.screen.blit(text, text_rect)
    
     def _handle_menu_selection(self, options: list) -> GameState:
-        
-        if "Continue" in options: #Pause Menu
-            if self.selected_option == 0:
-                return GameState.PLAYING
-            elif self.selected_option == 1:
-                return GameState.MENU
-            elif self.selected_option == 2:
-                return None
-            
-        else: 
-            if self.selected_option == 0:
-                return GameState.PLAYING
-            elif self.selected_option == 1:
-                return GameState.SCOREBOARD
-            elif self.selected_option == 2:
-                return None
+        # where each option of the main and the pause menu leads
+        return {
+            "Start Game": GameState.PLAYING,
+            "Load Game": GameState.LOAD_GAME,
+            "Score Board": GameState.SCOREBOARD,
+            "Continue": GameState.PLAYING,
+            "Save Game": GameState.SAVE_GAME,
+            "Return to Menu": GameState.MENU,
+            "Exit": None,
+        }[options[self.selected_option]]
    
     def draw_menu(self, fps, rate):
+        # a game saved from the pause menu can be picked up again
+        if os.path.exists(SAVE_PATH):
+            return self._draw_menu_screen("ASTEROIDS", ["Start Game", "Load Game", "Score Board", "Exit"], fps, rate)
         return self._draw_menu_screen("ASTEROIDS", ["Start Game", "Score Board", "Exit"], fps, rate)
 
-    def draw_scoreboard(self):
-        # Implementation for scoreboard screen
-        pass
+    def draw_scoreboard(self, fps, rate):
+        """Shows the recorded games a page at a time.
+        
+        The best scores come from the store's index, the most recent games
+        are read from the end of its log; only the page on screen is loaded.
+        LEFT/RIGHT turn pages, TAB switches between the two lists, ESCAPE or
+        RETURN goes back to the menu.
+        """
+        
+        views = ["BEST", "RECENT"]
+        view = 0
+        page = 0
+        rows = None
+        redraw = True
+        
+        while True:
+            if self.scores is None:
+                total = 0
+            elif views[view] == "BEST":
+                total = len(self.scores.best)
+            else:
+                total = len(self.scores)
+            pages = max(1, -(-total // SCOREBOARD_PAGE_SIZE))
+            
+            if rows is None:
+                rows = self._scoreboard_page(views[view], page)
+                redraw = True
+            
+            if redraw or not MENU_IDLE:
+                self.screen.blit(self.background, (0, 0))
+                self._draw_title("SCORES")
+                self._draw_score_rows(views[view], page, rows)
+                
+                hint = self.game_font.render(
+                    f"{views[view]}  page {page + 1}/{pages}    LEFT/RIGHT: page    TAB: best/recent    ESC: back",
+                    True, (128, 128, 128))
+                self.screen.blit(hint, hint.get_rect(center=(self.screen.get_width() // 2, self.screen.get_height() - 40)))
+                pygame.display.flip()
+                redraw = False
+            
+            for event in self._next_events(fps, rate):
+                if event.type == pygame.QUIT:
+                    return None
+                
+                elif event.type in EXPOSE_EVENTS:
+                    redraw = True
+                
+                elif event.type == pygame.KEYDOWN:
+                    if event.key in (pygame.K_ESCAPE, pygame.K_RETURN, pygame.K_BACKSPACE):
+                        return GameState.MENU
+                    elif event.key in (pygame.K_LEFT, pygame.K_UP) and page > 0:
+                        page -= 1
+                        rows = None
+                    elif event.key in (pygame.K_RIGHT, pygame.K_DOWN) and page < pages - 1:
+                        page += 1
+                        rows = None
+                    elif event.key == pygame.K_TAB:
+                        view = (view + 1) % len(views)
+                        page = 0
+                        rows = None
+    
+    def _scoreboard_page(self, view: str, page: int) -> list:
+        if self.scores is None:
+            return []
+        if view == "BEST":
+            return self.scores.top(page * SCOREBOARD_PAGE_SIZE, SCOREBOARD_PAGE_SIZE)
+        try:
+            return self.scores.recent(page * SCOREBOARD_PAGE_SIZE, SCOREBOARD_PAGE_SIZE)
+        except OSError:
+            # a log gone unreadable shows no recent games
+            return []
+    
+    def _draw_score_rows(self, view: str, page: int, rows: list):
+        font = text_cache.font(None, 40)
+        width = self.screen.get_width()
+        top = 240
+        spacing = 38
+        
+        if not rows:
+            text = font.render("No games recorded yet", True, (128, 128, 128))
+            self.screen.blit(text, text.get_rect(center=(width // 2, top + spacing)))
+            return
+        
+        if self.score_panel is None:
+            self.score_panel = pygame.Surface((760, SCOREBOARD_PAGE_SIZE * spacing + 20))
+            self.score_panel.fill((0, 0, 0))
+            self.score_panel.set_alpha(128)
+        self.screen.blit(self.score_panel, self.score_panel.get_rect(midtop=(width // 2, top - spacing // 2 - 10)))
+        
+        for i, entry in enumerate(rows):
+            y = top + i * spacing
+            minutes, seconds = divmod(int(entry.duration), 60)
+            number = page * SCOREBOARD_PAGE_SIZE + i + 1
+            columns = [
+                # right aligned, right aligned, left aligned, right aligned
+                (f"{number}." if view == "BEST" else "", "midright", width // 2 - 300),
+                (str(entry.score), "midright", width // 2 - 80),
+                (time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.time)), "midleft", width // 2 - 20),
+                (f"{minutes}:{seconds:02}", "midright", width // 2 + 320),
+            ]
+            for text, anchor, x in columns:
+                if text:
+                    surface = font.render(text, True, (255, 255, 255))
+                    self.screen.blit(surface, surface.get_rect(**{anchor: (x, y)}))
     
     def draw_pause_menu(self, fps, rate):
         overlay = pygame.Surface((self.screen.get_width(), self.screen.get_height()))
@@ -136,5 +285,5 @@ class GameScreens:
         overlay.set_alpha(128)
         self.screen.blit(overlay, (0,0))
         
-        return self._draw_menu_screen("PAUSED", ["Continue", "Return to Menu", "Exit"], fps, rate)
+        return self._draw_menu_screen("PAUSED", ["Continue", "Save Game", "Return to Menu", "Exit"], fps, rate)
         
\ No newline at end of file
@@ -0,0 +1,117 @@
+import gc
+import time
+
+from constants import *
+
+
+class GCController:
+    """Keeps Python's cyclic garbage collector out of busy frames.
+
+    Left alone, the collector runs whenever enough container objects were
+    allocated, in the middle of whatever frame that happens to be, and a
+    collection of the older generations can take longer than a frame.
+    While a game is played the automatic collector is off instead:
+
+    - start() is called once a game is set up. Everything alive then (the
+      modules, the screens, caches, the new game's first sprites) is
+      collected once and frozen with gc.freeze(), so no later collection
+      looks at it again.
+    - frame() is given how long each frame kept the CPU busy. When a
+      generation is due (by the collector's own thresholds) it is collected
+      then, but only if the frame left enough of the budget unused for what
+      that generation took the last time. After `force_threshold` times the
+      usual allocations without a spare frame it collects regardless.
+    - idle() is called whenever the game loop returns (pause, menus, game
+      over): automatic collection is back on, and everything due is
+      collected at once while nothing moves. resume() turns it off again.
+
+    With `report`, idle() prints a summary of the collections made during play.
+
+    Args:
+        target_fps: Frame rate the budget is derived from, the same the
+            FrameGovernor holds frames to
+        spare: Fraction of the budget a frame plus a collection may use
+        force_threshold: Multiple of the first generation's threshold after
+            which a collection no longer waits for a spare frame
+        report: Whether idle() prints what was collected during play
+    """
+
+    def __init__(self, target_fps: float = GOVERNOR_TARGET_FPS, spare: float = GC_SPARE_FRACTION,
+                 force_threshold: float = GC_FORCE_THRESHOLD, report: bool = False) -> None:
+        self.budget = 1 / target_fps
+        self.spare = spare
+        self.force_threshold = force_threshold
+        self.report = report
+        # seconds the last collection of each generation took
+        self.cost = [0.0, 0.0, 0.0]
+        self.collections = [0, 0, 0]
+        self.forced = 0
+        self.total = 0.0
+        self.worst = 0.0
+        self.playing = False
+
+    def start(self) -> None:
+        """Collects and freezes everything alive, at the start of a game."""
+
+        # the last game's objects were frozen with it
+        gc.unfreeze()
+        gc.collect()
+        gc.freeze()
+        self.resume()
+
+    def resume(self) -> None:
+        gc.disable()
+        self.playing = True
+
+    def idle(self) -> None:
+        """Hands collection back to Python, while nothing is being played."""
+
+        gc.enable()
+        gc.collect()
+        if self.playing and sum(self.collections):
+            if self.report:
+                print(
+                    f"GC: {sum(self.collections)} collections in play "
+                    f"(by generation {self.collections[0]}/{self.collections[1]}/{self.collections[2]}), "
+                    f"{self.forced} forced, {1000 * self.total:.1f} ms, worst {1000 * self.worst:.2f} ms"
+                )
+            self.collections = [0, 0, 0]
+            self.forced = 0
+            self.total = 0.0
+            self.worst = 0.0
+        self.playing = False
+
+    def _due(self) -> int | None:
+        # the oldest generation the automatic collector would collect, None if none
+        count = gc.get_count()
+        threshold = gc.get_threshold()
+        if not threshold[0] or count[0] <= threshold[0]:
+            return None
+        generation = 0
+        for older in (1, 2):
+            if count[older] < threshold[older]:
+                break
+            generation = older
+        return generation
+
+    def frame(self, busy: float) -> bool:
+        """Takes the busy seconds of one frame, True when it collected."""
+
+        generation = self._due()
+        if generation is None:
+            return False
+
+        forced = gc.get_count()[0] > gc.get_threshold()[0] * self.force_threshold
+        if not forced and busy + self.cost[generation] > self.spare * self.budget:
+            return False
+
+        start = time.perf_counter()
+        gc.collect(generation)
+        took = time.perf_counter() - start
+
+        self.cost[generation] = took
+        self.collections[generation] += 1
+        self.forced += forced
+        self.total += took
+        self.worst = max(self.worst, took)
+        return True
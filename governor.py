@@ -0,0 +1,144 @@
+from collections import deque
+
+from shot import Shot
+from circleshape import CircleShape
+from constants import *
+
+
+class QualityLevel:
+    """One step down the FrameGovernor's ladder.
+
+    Args:
+        name: Shown when the governor changes level
+        max_asteroids: Live asteroids above which the field stops spawning,
+            None for no limit
+        spawn_scale: Multiplier of the field's spawn interval
+        shot_outlines: Draw shots as outlined circles rather than filled squares
+        particles: Emit explosion and exhaust particles
+    """
+
+    def __init__(self, name: str, max_asteroids: int = None, spawn_scale: float = 1.0,
+                 shot_outlines: bool = True, particles: bool = True) -> None:
+        self.name = name
+        self.max_asteroids = max_asteroids
+        self.spawn_scale = spawn_scale
+        self.shot_outlines = shot_outlines
+        self.particles = particles
+
+
+class FrameGovernor:
+    """Trades detail for frame rate when frames run over budget.
+
+    observe() is given how long each frame kept the CPU busy, sleeping in
+    Clock.tick left out. When the mean of the last `window` frames goes
+    above `degrade` of the budget (1/GOVERNOR_TARGET_FPS) the governor steps
+    one level down LEVELS; once frames have stayed under `recover` of it for
+    `recovery_frames` frames in a row it steps one level back up. The gap
+    between the two thresholds and the wait keep it from going back and
+    forth, and after every change the window starts over so the new level
+    is judged on its own frames. Every change is printed.
+
+    govern() hands it a game's AsteroidField, which the level's spawn limits
+    apply to. Drawing is set through Shot.outlines and the game's
+    ParticleSystem, if any. With `simulation` off (a game being recorded,
+    whose replay must spawn the same asteroids) only drawing is degraded.
+
+    Args:
+        target_fps: Frame rate the budget is derived from
+        degrade: Fraction of the budget above which quality goes down
+        recover: Fraction of the budget below which quality comes back up
+        window: Frames averaged before going down
+        recovery_frames: Frames in a row under `recover` before going up
+    """
+
+    LEVELS = (
+        QualityLevel("full"),
+        QualityLevel("fewer spawns", max_asteroids=96, spawn_scale=1.5),
+        QualityLevel("simple shots", max_asteroids=64, spawn_scale=2.0, shot_outlines=False),
+        QualityLevel("minimal", max_asteroids=32, spawn_scale=3.0, shot_outlines=False, particles=False),
+    )
+
+    def __init__(self, target_fps: float = GOVERNOR_TARGET_FPS, degrade: float = GOVERNOR_DEGRADE,
+                 recover: float = GOVERNOR_RECOVER, window: int = GOVERNOR_WINDOW,
+                 recovery_frames: int = GOVERNOR_RECOVERY_FRAMES) -> None:
+        self.budget = 1 / target_fps
+        self.degrade = degrade
+        self.recover = recover
+        self.window = window
+        self.recovery_frames = recovery_frames
+        self.level = 0
+        self.changes = 0
+        self.field = None
+        self.simulation = True
+        self.frames = deque(maxlen=window)
+        self.total = 0.0
+        self.under = 0
+
+    @property
+    def quality(self) -> QualityLevel:
+        return self.LEVELS[self.level]
+
+    def govern(self, field, simulation: bool = True) -> None:
+        """Applies the current level to a new game's asteroid field."""
+
+        self.field = field
+        self.simulation = simulation
+        self._reset()
+        self._apply()
+
+    def observe(self, busy: float) -> bool:
+        """Takes the busy seconds of one frame, True when the level changed."""
+
+        frames = self.frames
+        if len(frames) == self.window:
+            self.total -= frames[0]
+        frames.append(busy)
+        self.total += busy
+
+        if busy < self.recover * self.budget:
+            self.under += 1
+        else:
+            self.under = 0
+
+        if len(frames) == self.window and self.total / self.window > self.degrade * self.budget:
+            return self._change(self.level + 1)
+        if self.under >= self.recovery_frames:
+            return self._change(self.level - 1)
+        return False
+
+    def _change(self, level: int) -> bool:
+        if not 0 <= level < len(self.LEVELS):
+            self._reset()
+            return False
+
+        mean = self.total / max(1, len(self.frames))
+        self.level = level
+        self.changes += 1
+        print(
+            f"Quality level {level} ({self.quality.name}): "
+            f"{1000 * mean:.1f} ms frames for a {1000 * self.budget:.1f} ms budget"
+        )
+        self._reset()
+        self._apply()
+        return True
+
+    def _reset(self) -> None:
+        self.frames.clear()
+        self.total = 0.0
+        self.under = 0
+
+    def _apply(self) -> None:
+        quality = self.quality
+        Shot.outlines = quality.shot_outlines
+        if CircleShape.particles is not None:
+            CircleShape.particles.enabled = quality.particles
+
+        field = self.field
+        if field is None:
+            return
+        if self.simulation:
+            field.max_asteroids = quality.max_asteroids
+            field.spawn_interval = ASTEROID_SPAWN_RATE * quality.spawn_scale
+        else:
+            field.max_asteroids = None
+            field.spawn_interval = ASTEROID_SPAWN_RATE
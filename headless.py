@@ -0,0 +1,124 @@
+"""Headless, deterministic simulation of the game.
+
+Runs the same update and collision code as main.game_loop without opening a
+window and without limiting the frame rate. With the same seed and the same
+input script the final state is always identical, which makes it usable for
+soak tests and batch jobs:
+
+    python headless.py --seed 42 --frames 100000 --inputs inputs.txt
+
+A run can start from a mid-game snapshot instead of the first frame, and
+leave one behind for the next run (see savestate.py):
+
+    python headless.py --frames 600 --save warm.astsav
+    python headless.py --frames 100000 --resume warm.astsav
+"""
+import os
+import json
+import time
+import argparse
+
+# no window is ever opened, but keep SDL away from any real display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+# stdout is for results only
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import savestate
+from world import World
+from controls import ScriptedInput
+from gamestates import GameState
+
+
+def run_headless(seed: int, inputs=(), frames: int = 3600, dt: float = 1 / 60, use_store: bool = False, world: World = None) -> dict:
+    """Simulates one game as fast as the CPU allows.
+
+    Args:
+        seed: Seed for the world's random generator
+        inputs: Input bitmasks, one per frame (see controls.py), or any
+            callable returning the mask of the next frame
+        frames: Maximum number of frames to simulate
+        dt: Fixed simulated time per frame, in seconds
+        use_store: Whether to keep asteroids and shots in an EntityStore
+        world: Already built world to continue, instead of a new one
+
+    Returns:
+        dict: Final score, lives, frame count, game over flag, simulated and
+        wall time, entity counts, frame costs and a digest of the final state
+    """
+
+    controls = inputs if callable(inputs) else ScriptedInput(inputs)
+    if world is None:
+        world = World(seed, controls, use_store)
+    else:
+        world.player.controls = controls
+
+    game_over = False
+    peak_entities = world.entity_count()
+    slowest = 0.0
+    start = time.perf_counter()
+
+    for _ in range(frames):
+        frame_start = time.perf_counter()
+        # there is no pause menu without a display, the frame simply ends
+        state = world.step(dt)
+        frame_time = time.perf_counter() - frame_start
+
+        if frame_time > slowest:
+            slowest = frame_time
+        entities = world.entity_count()
+        if entities > peak_entities:
+            peak_entities = entities
+
+        if state == GameState.END_GAME:
+            game_over = True
+            break
+
+    elapsed = time.perf_counter() - start
+
+    return {
+        "seed": seed,
+        "frames": world.frame,
+        "score": world.player.score,
+        "lives": world.player.lives,
+        "game_over": game_over,
+        "survival_time": world.time,
+        "entities": world.entity_count(),
+        "peak_entities": peak_entities,
+        "wall_time": elapsed,
+        "mean_frame_ms": 1000 * elapsed / world.frame if world.frame else 0.0,
+        "max_frame_ms": 1000 * slowest,
+        "digest": world.digest(),
+    }
+
+
+def read_inputs(path: str) -> list[int]:
+    """Reads an input script: whitespace separated bitmasks, one per frame."""
+
+    with open(path) as file:
+        return [int(token, 0) for token in file.read().split()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the game without a display.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--frames", type=int, default=3600)
+    parser.add_argument("--dt", type=float, default=1 / 60)
+    parser.add_argument("--inputs", help="file with one input bitmask per frame")
+    parser.add_argument("--store", action="store_true", help="use the NumPy entity store")
+    parser.add_argument("--resume", help="start from this snapshot instead of a new game")
+    parser.add_argument("--save", help="write a snapshot of the final state here")
+    args = parser.parse_args()
+
+    inputs = read_inputs(args.inputs) if args.inputs else ()
+    world = World(args.seed, use_store=args.store)
+    if args.resume:
+        world.load(savestate.load(args.resume))
+
+    result = run_headless(args.seed, inputs, args.frames, args.dt, args.store, world)
+    if args.save:
+        savestate.save(args.save, world.save())
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import pygame
+
+from constants import *
+from asteroids import Asteroid
+
+
+class Lifetime:
+    """Limits for one type of entity.
+
+    Args:
+        max_age: Seconds an entity may live, None for no limit
+        margin: How far beyond the playfield edge (plus its own radius) an
+            entity may go before it is removed
+        max_count: Most entities alive at once, oldest removed first
+    """
+
+    def __init__(self, max_age: float = None, margin: float = LIFETIME_MARGIN, max_count: int = None) -> None:
+        self.max_age = max_age
+        self.margin = margin
+        self.max_count = max_count
+
+
+class LifetimeManager(pygame.sprite.Sprite):
+    """Removes expired, lost and excess asteroids and shots every frame.
+
+    Shots and asteroids that leave the playfield never come back, but stay in
+    every group they joined unless something kills them. Placed in the
+    updatable group, the manager sweeps the asteroids and shots groups once
+    per frame, ages their sprites, and kills everything beyond its Lifetime
+    in one pass, so memory and frame time stay flat over long sessions.
+    With an EntityStore the same limits are applied to its arrays instead.
+    """
+
+    def __init__(self, asteroids: pygame.sprite.Group, shots: pygame.sprite.Group,
+                 asteroid_lifetime: Lifetime = None, shot_lifetime: Lifetime = None) -> None:
+        if hasattr(self, "containers"):
+            super().__init__(self.containers)
+        else:
+            super().__init__()
+
+        self.groups = {"asteroids": asteroids, "shots": shots}
+        self.lifetimes = {
+            "asteroids": asteroid_lifetime or Lifetime(ASTEROID_MAX_AGE, LIFETIME_MARGIN, ASTEROID_MAX_COUNT),
+            "shots": shot_lifetime or Lifetime(SHOT_MAX_AGE, LIFETIME_MARGIN, SHOT_MAX_COUNT),
+        }
+        self.reclaimed = {"asteroids": 0, "shots": 0}
+
+    def update(self, dt: float) -> None:
+        store = Asteroid.store
+        for name, lifetime in self.lifetimes.items():
+            if store is not None:
+                kind = store.ASTEROID if name == "asteroids" else store.SHOT
+                self.reclaimed[name] += store.reclaim(kind, lifetime.max_age, lifetime.margin, lifetime.max_count)
+            else:
+                self.reclaimed[name] += self._sweep(self.groups[name], lifetime, dt)
+
+    def _sweep(self, group: pygame.sprite.Group, lifetime: Lifetime, dt: float) -> int:
+        max_age = lifetime.max_age if lifetime.max_age is not None else float("inf")
+        margin = lifetime.margin
+        expired = []
+        survivors = []
+
+        for spr in group:
+            spr.age += dt
+            position = spr.position
+            reach = spr.radius + margin
+            if (
+                spr.age > max_age
+                or position.x < -reach or position.x > WORLD_WIDTH + reach
+                or position.y < -reach or position.y > WORLD_HEIGHT + reach
+            ):
+                expired.append(spr)
+            else:
+                survivors.append(spr)
+
+        # group order is creation order, so the oldest go first
+        if lifetime.max_count is not None and len(survivors) > lifetime.max_count:
+            expired.extend(survivors[:len(survivors) - lifetime.max_count])
+
+        for spr in expired:
+            spr.kill()
+        return len(expired)
+
+    def counts(self) -> dict[str, int]:
+        """Number of live asteroids and shots."""
+
+        store = Asteroid.store
+        if store is not None:
+            asteroids, shots = store.counts()
+            return {"asteroids": asteroids, "shots": shots}
+        return {name: len(group) for name, group in self.groups.items()}
@@ -1,26 +1,61 @@
+# first, so the startup report covers every other import
+from startup import startup_timer
+
+import os
+import time
 import pygame
+import random
 
 from shot import Shot
 from constants import *
 from player import Player
+from circleshape import CircleShape
+from profiler import FrameProfiler, AllocationTracker, OVERLAY_KEY
 from asteroids import Asteroid
 from pygame.sprite import Group
+from textcache import text_cache
+from spriteatlas import SpriteAtlas
+from renderer import Renderer, DirtyRectRenderer
+from pool import SpritePool
+from timestep import FixedTimestep, VariableTimestep
+from recording import InputRecorder
+import savestate
+from savestate import RewindBuffer, REWIND_KEY
+from snapshot import Snapshot
+from pipeline import SimulationPipeline, LatchedInput
+from scores import ScoreStore
+from spatialhash import SpatialHash
+from camera import Camera
+from governor import FrameGovernor
+from gccontrol import GCController
+from lifetime import LifetimeManager
 from asteroidfield import AsteroidField
 from gamestates import GameScreens, GameState
 
 
-def check_quit_event() -> bool:
+# broadphase shared by every asteroid_collisions call, rebuilt once per frame
+collision_grid = SpatialHash(ASTEROID_MAX_RADIUS * 2)
+
+
+def check_quit_event(profiler: FrameProfiler = None) -> bool:
     """Checks if the quit event (X button) has been triggered.
     
+    Also toggles the profiler overlay when its key is pressed.
+    
+    Args:
+        profiler: Profiler whose overlay the OVERLAY_KEY toggles
+    
     Returns:
         bool: True if game should quit, False if game should continue
     """
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             return True
+        if event.type == pygame.KEYDOWN and event.key == OVERLAY_KEY and profiler is not None:
+            profiler.toggle_overlay()
     return False
 
-def grouping() -> tuple[Group, Group, Group, Group]:
+def grouping(use_store: bool = False, rng: random.Random = None) -> tuple[Group, Group, Group, Group]:
     """Creates and configures sprite groups for game objects.
     
     Creates separate groups for:
@@ -34,6 +69,21 @@ def grouping() -> tuple[Group, Group, Group, Group]:
         - Asteroid: Updates, draws, and asteroid-specific handling
         - AsteroidField: Updates only
         - Shot: Updates, draws, and shot-specific handling
+        - LifetimeManager: Updates only
+        - SpritePool: Updates only, ahead of everything else
+    
+    With use_store, asteroids and shots are kept in a NumPy EntityStore that
+    is updated and drawn as a single object; the asteroids and shots groups
+    then stay empty.
+    
+    All of this is class attributes, shared by every game in the process:
+    grouping() takes them over for a new game. A GameContext keeps one
+    game's set, for several to take turns.
+    
+    Args:
+        use_store: Whether asteroids and shots live in an EntityStore
+        rng: Random generator for spawns and splits, the global random module
+            if not given
     
     Returns:
         tuple: Contains the following sprite groups in order:
@@ -54,10 +104,65 @@ def grouping() -> tuple[Group, Group, Group, Group]:
     Player.containers = (updatable, drawable)
     Asteroid.containers = (asteroids, updatable, drawable)
     AsteroidField.containers = (updatable)
+    LifetimeManager.containers = (updatable)
     Shot.containers = (shots, updatable, drawable)
+    SpritePool.containers = (updatable)
+    
+    # the pools are created first so they recycle before anything spawns
+    Asteroid.pool = SpritePool(Asteroid, ASTEROID_POOL_SIZE) if ASTEROID_POOL_SIZE else None
+    Shot.pool = SpritePool(Shot, SHOT_POOL_SIZE) if SHOT_POOL_SIZE else None
+    
+    Asteroid.rng = AsteroidField.rng = rng if rng is not None else random
+    
+    Asteroid.store = None
+    Shot.store = None
+    CircleShape.camera = None
+    CircleShape.particles = None
+    Asteroid.focus = None
+    if use_store:
+        # numpy is only needed when the store is enabled
+        from entitystore import EntityStore
+        
+        EntityStore.containers = (updatable, drawable)
+        Asteroid.store = Shot.store = EntityStore()
     
     return updatable, drawable, asteroids, shots
 
+class GameContext:
+    """The class attributes grouping() set up, as they are when created.
+    
+    Sprites find their groups, pools, random generator, EntityStore, camera
+    and particles through class attributes, so two games set up in one
+    process would add to and draw from each other's. Each game captures
+    its context once set up and calls enter() before running, which puts
+    its own attributes back.
+    """
+    
+    ATTRIBUTES = (
+        (Player, "containers"),
+        (Asteroid, "containers"),
+        (AsteroidField, "containers"),
+        (LifetimeManager, "containers"),
+        (Shot, "containers"),
+        (SpritePool, "containers"),
+        (Asteroid, "pool"),
+        (Shot, "pool"),
+        (Asteroid, "rng"),
+        (AsteroidField, "rng"),
+        (Asteroid, "store"),
+        (Shot, "store"),
+        (CircleShape, "camera"),
+        (CircleShape, "particles"),
+        (Asteroid, "focus"),
+    )
+    
+    def __init__(self) -> None:
+        self.values = tuple(getattr(cls, name) for cls, name in self.ATTRIBUTES)
+    
+    def enter(self) -> None:
+        for (cls, name), value in zip(self.ATTRIBUTES, self.values):
+            setattr(cls, name, value)
+
 def updating_group(group_name: str, group: Group, *args) -> None:
     """Updates or draws all sprites in a sprite group.
     
@@ -99,23 +204,54 @@ def updating_group(group_name: str, group: Group, *args) -> None:
         else:
             raise ValueError(f"{group_name} groups is not supported.")
             
-def asteroid_collisions(asteroid_group: Group, shots_group: Group, player: Player) -> GameState:
+def asteroid_collisions(asteroid_group: Group, shots_group: Group, player: Player, grid: SpatialHash = None) -> GameState:
     """
     Checks for:
         - Player collision with any asteroid (game over)
         - Shot collisions with asteroids (destroys both, splits asteroid)
     
+    Shots and the player are indexed in a spatial hash first, so each asteroid
+    only runs the narrow-phase check against objects sharing one of its cells.
+    With SWEPT_COLLISIONS the check covers the whole of the last step (see
+    CircleShape.swept_collision), so nothing passes through an asteroid
+    between two steps however large dt is.
+    Candidates come back in group order, keeping the split-then-score sequence
+    identical to checking every asteroid against every shot.
+    
     Args:
         asteroid_group: Group containing all asteroid objects
         shots_group: Group containing all projectiles
         player: The player's ship object
+        grid: Broadphase to rebuild, defaults to the module wide collision_grid
+    
+    When an EntityStore is enabled the check is delegated to its vectorized
+    EntityStore.collide.
     
     Returns:
         GameState: END_GAME if no lives left, PLAYING otherwise
     """
     
+    if Asteroid.store is not None:
+        return Asteroid.store.collide(player)
+    
+    if grid is None:
+        grid = collision_grid
+    
+    if SWEPT_COLLISIONS:
+        collide = CircleShape.swept_collision
+    else:
+        collide = CircleShape.collision
+    
+    grid.rebuild(shots_group, SWEPT_COLLISIONS)
+    grid.insert(player, SWEPT_COLLISIONS)
+    
     for asteroid in asteroid_group:
-        if asteroid.collision(player):
+        if SWEPT_COLLISIONS:
+            candidates = grid.query(asteroid.position, asteroid.radius, asteroid.previous_position)
+        else:
+            candidates = grid.query(asteroid.position, asteroid.radius)
+        
+        if player in candidates and collide(asteroid, player):
             player.lives -= 1
             if player.lives <= 0:
                 return GameState.END_GAME
@@ -124,24 +260,52 @@ def asteroid_collisions(asteroid_group: Group, shots_group: Group, player: Playe
             
             return GameState.PLAYING
         
-        for bullet in shots_group:
-            if asteroid.collision(bullet):
+        for bullet in candidates:
+            # skipping the player and shots already destroyed this frame
+            if bullet is player or bullet not in shots_group:
+                continue
+            
+            if collide(asteroid, bullet):
                 bullet.kill()
                 asteroid.split()
                 player.score += 100
         
     return GameState.PLAYING
 
+def entity_counts(asteroid_group: Group, shots_group: Group) -> tuple[int, int]:
+    """Returns how many asteroids and shots are alive."""
+    
+    if Asteroid.store is not None:
+        return Asteroid.store.counts()
+    return len(asteroid_group), len(shots_group)
+
 def draw_hud(game_font, screen, player):
     """
     Draws the heads-up display (score and lives)
+    
+    With a CachedFont the labels are only rendered again after the score or
+    the lives changed.
+    
+    Returns:
+        list: Rects covered by the two labels
     """
          
     score_text = game_font.render(f"Score: {player.score}", True, (255, 255, 255))
     lives_text = game_font.render(f"Lives: {player.lives}", True, (255, 255, 255))
     
-    screen.blit(score_text, (10, 10))
-    screen.blit(lives_text, (10, 50))
+    return [screen.blit(score_text, (10, 10)), screen.blit(lives_text, (10, 50))]
+
+def player_view(player: Player, alpha: float = None) -> pygame.Vector2:
+    """Where the player is drawn, `alpha` of the way from its previous step."""
+    
+    if alpha is None:
+        return player.position
+    return player.previous_position.lerp(player.position, alpha)
+
+def busy_time(profiler: FrameProfiler) -> float:
+    """Seconds of work in the profiler's last frame; waiting for vsync in the flip is not work."""
+    
+    return profiler.busy_time(("flip",) if VSYNC else ())
 
 def game_loop(
     screen: pygame.Surface, 
@@ -151,7 +315,14 @@ def game_loop(
     shots: Group, 
     player: Player, 
     dt: float, 
-    fps: pygame.time.Clock
+    fps: pygame.time.Clock,
+    profiler: FrameProfiler = None,
+    atlas: SpriteAtlas = None,
+    recorder: InputRecorder = None,
+    rewind: RewindBuffer = None,
+    camera: Camera = None,
+    governor: FrameGovernor = None,
+    gc_control: GCController = None
     ) -> int:
     
     """Runs the main game loop.
@@ -163,6 +334,20 @@ def game_loop(
         - Screen drawing/rendering
         - FPS limiting
     
+    With FIXED_TIMESTEP the simulation advances in steps of 1/SIMULATION_RATE
+    seconds, as many as the elapsed time calls for (at most
+    MAX_CATCHUP_STEPS per frame), while rendering runs at RENDER_RATE and
+    draws sprites interpolated between the last two steps.
+    
+    With a RewindBuffer the game is captured as it goes, and holding
+    REWIND_KEY runs it backwards instead of forwards. With a Camera (a world
+    larger than the screen) the view follows the player and only what it
+    sees is drawn. Particles (CircleShape.particles) move once per rendered
+    frame, not per simulation step, and are drawn over the sprites. A
+    FrameGovernor is shown how long every frame took, to lower the game's
+    quality when they take too long, and a GCController to collect garbage
+    in the frames that leave time for it.
+    
     Args:
         screen: Game display surface
         updatable: Group of objects requiring updates
@@ -172,6 +357,13 @@ def game_loop(
         player: Player ship instance
         dt: Delta time for frame rate independence (it converts milliseconds to seconds)
         fps: Clock for controlling frame rate
+        profiler: Records the time spent in each stage of every frame
+        atlas: Pre-rendered sprites to blit instead of drawing primitives
+        recorder: Receives the player's input and dt of every simulation step
+        rewind: Snapshots of the last moments of the game, to go back to
+        camera: View of a world larger than the screen
+        governor: Adapts spawning and drawing to the frame times
+        gc_control: Runs garbage collections in frames with time to spare
         
     Returns:
         int: Game end status
@@ -179,35 +371,278 @@ def game_loop(
             1: Game over (player crashed into asteroid)
     """
         
+    if profiler is None:
+        profiler = FrameProfiler()
+    
+    hud_font = text_cache.font(None, 32)
+    particles = CircleShape.particles
+    
+    # a new renderer repaints the whole screen first, covering any menu
+    if DIRTY_RECT_RENDERING:
+        renderer = DirtyRectRenderer(screen, atlas=atlas, camera=camera)
+    else:
+        renderer = Renderer(screen, atlas=atlas, camera=camera)
+    
+    if FIXED_TIMESTEP:
+        timestep = FixedTimestep()
+    else:
+        timestep = VariableTimestep(60)
+    
     # while playing the game
     while True:
         
-        #limiting the fps to 60
-        dt = fps.tick(60)/1000
+        #limiting the fps (to 60 unless the timestep is fixed)
+        frame_time = fps.tick(timestep.frame_rate)/1000
+        profiler.begin_frame()
         
-        if check_quit_event():
+        if check_quit_event(profiler):
             return 0
-            
-        #for all objects on the updatable group, update it
-        game_state = updating_group("updatable", updatable, dt)
-        if game_state == GameState.PAUSED:
-            return GameState.PAUSED
+        profiler.lap("events")
         
-        #checking for collisions with asteroids
-        if asteroid_collisions(asteroids, shots, player) == GameState.END_GAME:
-            return GameState.END_GAME
+        steps = timestep.advance(frame_time)
+        if rewind is not None and pygame.key.get_pressed()[REWIND_KEY]:
+            rewind.step_back()
+            steps = 0
+            profiler.lap("update")
+        
+        for _ in range(steps):
+            dt = timestep.dt
+            
+            #for all objects on the updatable group, update it
+            game_state = updating_group("updatable", updatable, dt)
+            if recorder is not None:
+                recorder.record(player.last_input, dt)
+            if game_state == GameState.PAUSED:
+                return GameState.PAUSED
+            profiler.lap("update")
+            
+            #checking for collisions with asteroids
+            if asteroid_collisions(asteroids, shots, player) == GameState.END_GAME:
+                return GameState.END_GAME
+            if rewind is not None:
+                rewind.record()
+            profiler.lap("collisions")
                
-        # filling the screen with a back color  
-        screen.fill("#000000")
+        if camera is not None:
+            camera.follow(player_view(player, timestep.alpha))
+        
+        # filling the screen (or last frame's sprites) with a back color  
+        renderer.clear()
         
         #for all object to be draw, do it
-        updating_group("drawable", drawable, screen)
+        renderer.draw(drawable, timestep.alpha)
+        if particles is not None:
+            particles.update(frame_time)
+            renderer.add(particles.draw(screen, None if camera is None else camera.offset))
+        profiler.lap("draw")
         
-        draw_hud(pygame.font.Font(None, 32), screen, player)
+        renderer.add(draw_hud(hud_font, screen, player))
+        renderer.add(profiler.draw(screen))
+        profiler.lap("hud")
     
         # making sure to refresh the screen
-        pygame.display.flip()
+        renderer.present()
+        profiler.lap("flip")
+        profiler.end_frame(*entity_counts(asteroids, shots))
+        if governor is not None:
+            governor.observe(busy_time(profiler))
+        if gc_control is not None:
+            gc_control.frame(busy_time(profiler))
+        
+def pipelined_game_loop(
+    screen: pygame.Surface, 
+    updatable: Group, 
+    drawable: Group, 
+    asteroids: Group, 
+    shots: Group, 
+    player: Player, 
+    dt: float, 
+    fps: pygame.time.Clock,
+    profiler: FrameProfiler = None,
+    atlas: SpriteAtlas = None,
+    recorder: InputRecorder = None,
+    rewind: RewindBuffer = None,
+    camera: Camera = None,
+    governor: FrameGovernor = None,
+    gc_control: GCController = None
+    ) -> int:
+    
+    """Runs the game loop with simulation and rendering on separate threads.
+    
+    Takes the same arguments and returns the same values as game_loop. Every
+    frame the simulation steps are handed to a SimulationPipeline worker,
+    which ends them by capturing an immutable Snapshot; meanwhile this thread
+    draws the snapshot of the frame before. The two only meet in collect(),
+    so the screen shows the game one frame late. The keyboard is read once
+    per frame on this thread and latched for the worker, since SDL must stay
+    on the main thread.
+    
+    The profiler's "update" stage is the time spent waiting for the
+    simulation after drawing (a render stall); "collisions" stays empty.
+    Stall counts are printed when the loop ends.
+    
+    Only one of the two stages runs Python code at a time (the GIL), so the
+    overlap comes from the SDL blits and display updates, which release it.
+    """
+    
+    if profiler is None:
+        profiler = FrameProfiler()
+    
+    hud_font = text_cache.font(None, 32)
+    particles = CircleShape.particles
+    
+    if DIRTY_RECT_RENDERING:
+        renderer = DirtyRectRenderer(screen, atlas=atlas)
+    else:
+        renderer = Renderer(screen, atlas=atlas)
+    
+    if FIXED_TIMESTEP:
+        timestep = FixedTimestep()
+    else:
+        timestep = VariableTimestep(60)
+    
+    def simulate(steps: int, dt: float, alpha: float, rewinding: bool) -> tuple:
+        # runs on the worker thread, the only one touching the sprites;
+        # particles emitted here are only queued, see ParticleSystem.queue
+        if rewinding:
+            rewind.step_back()
+            steps = 0
+        
+        for _ in range(steps):
+            game_state = updating_group("updatable", updatable, dt)
+            if recorder is not None:
+                recorder.record(player.last_input, dt)
+            if game_state == GameState.PAUSED:
+                return game_state, None
+            
+            if asteroid_collisions(asteroids, shots, player) == GameState.END_GAME:
+                return GameState.END_GAME, None
+            if rewind is not None:
+                rewind.record()
         
+        if camera is not None:
+            camera.follow(player_view(player, alpha))
+        queued = particles.take_queue() if particles is not None else ()
+        return GameState.PLAYING, Snapshot.capture(asteroids, shots, player, alpha, camera, queued)
+    
+    source = player.controls
+    player.controls = latch = LatchedInput()
+    if particles is not None:
+        particles.queue = []
+    pipeline = SimulationPipeline(simulate)
+    if camera is not None:
+        camera.follow(player.position)
+    snapshot = Snapshot.capture(asteroids, shots, player, camera=camera)
+    
+    try:
+        while True:
+            frame_time = fps.tick(timestep.frame_rate)/1000
+            profiler.begin_frame()
+            
+            if check_quit_event(profiler):
+                return 0
+            profiler.lap("events")
+            
+            latch.mask = source()
+            rewinding = rewind is not None and pygame.key.get_pressed()[REWIND_KEY]
+            pipeline.submit(timestep.advance(frame_time), timestep.dt, timestep.alpha, rewinding)
+            
+            # drawing the previous frame while the next one is simulated
+            renderer.clear()
+            renderer.draw_snapshot(snapshot)
+            if particles is not None:
+                # the particle arrays are this thread's alone
+                particles.replay(snapshot.particles)
+                particles.update(frame_time)
+                renderer.add(particles.draw(screen, snapshot.offset))
+            profiler.lap("draw")
+            
+            renderer.add(draw_hud(hud_font, screen, snapshot))
+            renderer.add(profiler.draw(screen))
+            profiler.lap("hud")
+            
+            renderer.present()
+            profiler.lap("flip")
+            
+            game_state, next_snapshot = pipeline.collect()
+            profiler.lap("update")
+            if game_state != GameState.PLAYING:
+                return game_state
+            
+            snapshot = next_snapshot
+            profiler.end_frame(*snapshot.counts())
+            # the worker is idle until the next submit, so the field can change
+            if governor is not None:
+                governor.observe(busy_time(profiler))
+            if gc_control is not None:
+                gc_control.frame(busy_time(profiler))
+    
+    finally:
+        pipeline.close()
+        player.controls = source
+        if particles is not None:
+            # what the worker queued after the last snapshot is not shown
+            particles.queue = None
+        stats = pipeline.stats()
+        print(
+            f"Pipeline: {stats['frames']} frames, "
+            f"{stats['render_stalls']} render stalls ({stats['render_stall_ms']:.1f} ms), "
+            f"{stats['simulation_stalls']} simulation stalls ({stats['simulation_stall_ms']:.1f} ms)"
+        )
+
+def start_recording(seed: int) -> InputRecorder:
+    """Starts recording a new game to RECORDING_DIR, if it is set.
+    
+    Args:
+        seed: Seed of the game's random generator
+    
+    Returns:
+        InputRecorder: The recorder, or None when recording is disabled
+    """
+    
+    if not RECORDING_DIR:
+        return None
+    
+    os.makedirs(RECORDING_DIR, exist_ok=True)
+    path = os.path.join(RECORDING_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{seed:x}.astrec")
+    fixed_step = 1 / SIMULATION_RATE if FIXED_TIMESTEP else 0.0
+    return InputRecorder(path, seed, fixed_step, USE_ENTITY_STORE)
+
+
+def stop_recording(recorder: InputRecorder) -> None:
+    """Writes out and closes a game's recording, if there is one."""
+    
+    if recorder is not None:
+        recorder.close()
+        print(f"Recorded {recorder.ticks} steps to {recorder.path}")
+    return None
+
+
+def save_game(player: Player, field: AsteroidField, asteroids: Group, shots: Group, seconds: float) -> None:
+    """Saves the game to SAVE_PATH, for the main menu to load it again."""
+    
+    try:
+        savestate.save(SAVE_PATH, savestate.capture(player, field, asteroids, shots, seconds=seconds))
+        print(f"Game saved to {SAVE_PATH}")
+    except OSError as e:
+        print(f"Could not save the game: {e}")
+
+
+def load_game(player: Player, field: AsteroidField, asteroids: Group, shots: Group) -> float:
+    """Puts a freshly set up game in the state saved at SAVE_PATH.
+    
+    Returns:
+        float: Seconds the saved game had been played, 0 if it could not be loaded
+    """
+    
+    try:
+        _, seconds = savestate.restore(savestate.load(SAVE_PATH), player, field, asteroids, shots)
+        return seconds
+    except (OSError, ValueError) as e:
+        print(f"Could not load the saved game: {e}")
+        return 0.0
+
+
 def main():
     """Initializes and starts the game.
     
@@ -226,22 +661,65 @@ def main():
         SystemError: If screen cannot be created
     """
 
+    profiler = None
+    recorder = None
+    rewind = None
+    camera = None
+    particles = None
+    
     try:
-        # initiating the game
-        pygame.init()
+        startup_timer.mark("imports")
+        
+        # initiating only what the game uses (no audio, joysticks, ...)
+        pygame.display.init()
+        pygame.font.init()
         if pygame.get_error():
             raise SystemError("Pygame failed to initialize properly")
+        startup_timer.mark("pygame init")
         
         # creating the screen 
-        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        if VSYNC:
+            # pygame only honours vsync on scaled or OpenGL displays
+            screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SCALED, vsync=1)
+        else:
+            screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         if not screen:
             raise SystemError("Could not create game screen")
+        startup_timer.mark("window")
         
         # setting the variables to limit the fps
         fps = pygame.time.Clock()
         dt = 0
         
-        game_screens = GameScreens(screen)
+        # frame timings are recorded in every game, see profiler.py
+        profiler = FrameProfiler()
+        
+        # quality levels carry over from one game to the next
+        governor = FrameGovernor() if FRAME_GOVERNOR else None
+        
+        # with GC_CONTROL garbage is collected between frames while playing, see gccontrol.py
+        if GC_CONTROL:
+            gc_control = GCController(report=ALLOCATION_DIAGNOSTICS or PROFILER_OUTPUT is not None)
+        else:
+            gc_control = None
+        if ALLOCATION_DIAGNOSTICS:
+            profiler.allocations = AllocationTracker()
+        
+        # pre-rendering needs the display to exist to convert the surfaces
+        atlas = SpriteAtlas() if USE_SPRITE_ATLAS else None
+        startup_timer.mark("sprite atlas")
+        
+        # every finished game is kept, see scores.py
+        try:
+            scores = ScoreStore()
+        except OSError as e:
+            # the game is still playable, just not scored
+            print(f"Could not open the score log, scores will not be kept: {e}")
+            scores = None
+        startup_timer.mark("score store")
+        
+        # the menu finishes the startup report once its first frame is shown
+        game_screens = GameScreens(screen, scores)
         current_state = GameState.MENU
         
         updatable, drawable, asteroids, shots, player = None, None, None, None, None
@@ -250,33 +728,103 @@ def main():
             if current_state == GameState.MENU:
                 current_state = game_screens.draw_menu(fps, 60)
                 
-                if current_state == GameState.PLAYING:
-                    updatable, drawable, asteroids, shots = grouping()
+                if current_state in (GameState.PLAYING, GameState.LOAD_GAME):
+                    # a seeded generator lets the game be replayed from its inputs
+                    seed = random.randrange(2**63)
+                    updatable, drawable, asteroids, shots = grouping(USE_ENTITY_STORE, random.Random(seed))
+                    game_started = time.time()
                     
                     # instantiating the player:
-                    player = Player(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
+                    player = Player(WORLD_WIDTH / 2, WORLD_HEIGHT / 2)
+                    if FAR_UPDATE_INTERVAL > 1:
+                        Asteroid.focus = player
                     
                     # initialization from asteroid field
-                    asteroid_field = AsteroidField()
+                    asteroid_field = AsteroidField(asteroids)
+                    
+                    # removing shots and asteroids that are gone for good
+                    lifetimes = LifetimeManager(asteroids, shots)
+                    
+                    # a world larger than the screen is seen through a camera
+                    camera = None
+                    if WORLD_WIDTH > SCREEN_WIDTH or WORLD_HEIGHT > SCREEN_HEIGHT:
+                        camera = CircleShape.camera = Camera()
+                        # drawn whatever the camera's index says
+                        camera.untracked.append(player)
+                        if Asteroid.store is not None:
+                            camera.untracked.append(Asteroid.store)
+                    
+                    # effects are kept from one game to the next, cleared
+                    if PARTICLE_CAPACITY:
+                        if particles is None:
+                            # numpy is only needed when particles are enabled
+                            from particles import ParticleSystem
+                            particles = ParticleSystem()
+                        particles.clear()
+                        CircleShape.particles = particles
+                    
+                    if current_state == GameState.LOAD_GAME:
+                        # a loaded game does not start from its seed, so it is not recorded
+                        game_started -= load_game(player, asteroid_field, asteroids, shots)
+                        current_state = GameState.PLAYING
+                    else:
+                        recorder = start_recording(seed)
+                    
+                    # rewinding would break an input recording
+                    rewind = None
+                    if REWIND_BUFFER_BYTES and recorder is None:
+                        rewind = RewindBuffer(player, asteroid_field, asteroids, shots)
+                    
+                    # spawning stays as recorded, for the replay to match
+                    if governor is not None:
+                        governor.govern(asteroid_field, simulation=recorder is None)
+                    
+                    # whatever the game set up lives until it ends
+                    if gc_control is not None:
+                        gc_control.start()
             
             elif current_state == GameState.PLAYING:
-                game_state = game_loop(screen, updatable, drawable, asteroids, shots, player, dt, fps)
+                loop = pipelined_game_loop if PIPELINED_SIMULATION else game_loop
+                if gc_control is not None:
+                    gc_control.resume()
+                try:
+                    game_state = loop(
+                        screen, updatable, drawable, asteroids, shots, player, dt, fps,
+                        profiler, atlas, recorder, rewind, camera, governor, gc_control
+                    )
+                finally:
+                    # pause, menus and game over have time to collect
+                    if gc_control is not None:
+                        gc_control.idle()
                 
                 if game_state == GameState.PAUSED:
                     current_state = game_state
                 elif game_state == GameState.END_GAME:
                     print("Game Over!")
+                    if scores is not None:
+                        try:
+                            rank = scores.add(player.score, time.time() - game_started)
+                            if rank is not None:
+                                print(f"New high score, #{rank + 1}: {player.score}")
+                        except OSError as e:
+                            print(f"Could not record the score: {e}")
+                    recorder = stop_recording(recorder)
                     current_state = GameState.MENU
                 elif game_state == 0:
                     current_state = None
             
             elif current_state == GameState.SCOREBOARD:
-                current_state = game_screens.draw_scoreboard()
+                current_state = game_screens.draw_scoreboard(fps, 60)
                 
             elif current_state == GameState.PAUSED: 
                 current_state = game_screens.draw_pause_menu(fps, 60)
+                if current_state == GameState.SAVE_GAME:
+                    save_game(player, asteroid_field, asteroids, shots, time.time() - game_started)
+                    current_state = GameState.PAUSED
                 if current_state == GameState.PLAYING:
                     continue
+                if current_state != GameState.PAUSED:
+                    recorder = stop_recording(recorder)
                 
             elif current_state == GameState.END_GAME:
                 current_state = GameState.MENU
@@ -286,6 +834,12 @@ def main():
         print(f"Failed to start game: {e}")
 
     finally:
+        stop_recording(recorder)
+        if PROFILER_OUTPUT and profiler is not None:
+            profiler.dump(PROFILER_OUTPUT)
+        if profiler is not None and profiler.allocations is not None:
+            print(profiler.allocations.report())
+            profiler.allocations.close()
         pygame.quit()
     
         
@@ -0,0 +1,277 @@
+"""Wire format and simulated network conditions of multiplayer games.
+
+Clients send input packets: their newest input bitmasks (see controls.py),
+each numbered, the last NET_INPUT_REDUNDANCY of them repeated in every
+packet so a lost one costs nothing, plus the tick of the newest snapshot
+they decoded (the ack).
+
+The server sends snapshots: every player in full, and the asteroids and
+shots as a delta against the snapshot the client last acked. Entity state
+is quantized to integers (POSITION_SCALE and VELOCITY_SCALE steps per
+pixel), and since asteroids and shots fly in straight lines both ends
+extrapolate the baseline the same way, in integer arithmetic: only entities
+that are new or strayed more than POSITION_TOLERANCE from where the
+baseline says they should be are sent, plus the ids of those gone. In
+steady flight that is hardly anything. A client that has acked nothing yet
+gets the whole field.
+
+A table is a dict of entity id to (kind, x, y, vx, vy) in quantized units,
+kind 0 for a shot and the asteroid's size (radius / ASTEROID_MIN_RADIUS)
+otherwise.
+"""
+import heapq
+import random
+import struct
+import time
+
+from constants import *
+
+# packet types, the first byte of every packet
+HELLO = 1
+WELCOME = 2
+INPUT = 3
+SNAPSHOT = 4
+BYE = 5
+
+# type, player id, server tick
+WELCOME_PACKET = struct.Struct("<BBI")
+# type, acked snapshot tick, number of the newest input, inputs that follow (one byte each, oldest first)
+INPUT_PACKET = struct.Struct("<BIIB")
+# type, tick, baseline tick (0 for none), newest input applied for the receiver,
+# receiver's player id, players, removed ids and entities that follow
+SNAPSHOT_PACKET = struct.Struct("<BIIIBBHH")
+# id, position, rotation in [0, 360), shot cooldown, lives, score
+PLAYER_RECORD = struct.Struct("<Bffffbi")
+# id, kind, quantized position and velocity
+ENTITY_RECORD = struct.Struct("<IBiihh")
+REMOVED_RECORD = struct.Struct("<I")
+
+# quantization steps per pixel and per pixel/second
+POSITION_SCALE = 8
+VELOCITY_SCALE = 8
+# extrapolation error (in position steps) below which an entity is not sent
+POSITION_TOLERANCE = 2
+
+
+def quantize(spr, kind: int) -> tuple:
+    return (
+        kind,
+        round(spr.position.x * POSITION_SCALE),
+        round(spr.position.y * POSITION_SCALE),
+        round(spr.velocity.x * VELOCITY_SCALE),
+        round(spr.velocity.y * VELOCITY_SCALE),
+    )
+
+
+def extrapolate(entity: tuple, ticks: int) -> tuple:
+    """Where an entity should be `ticks` simulation steps later, in quantized units."""
+
+    kind, x, y, vx, vy = entity
+    # round half up in integers, so both ends agree to the step
+    steps = VELOCITY_SCALE * SIMULATION_RATE
+    scale = POSITION_SCALE * ticks
+    return (
+        kind,
+        x + (2 * vx * scale + steps) // (2 * steps),
+        y + (2 * vy * scale + steps) // (2 * steps),
+        vx,
+        vy,
+    )
+
+
+def encode_input(acked: int, sequence: int, masks) -> bytes:
+    """Input packet carrying `masks`, the last one numbered `sequence`."""
+
+    return INPUT_PACKET.pack(INPUT, acked, sequence, len(masks)) + bytes(masks)
+
+
+def decode_input(data: bytes) -> tuple[int, int, bytes]:
+    """Returns the acked tick, the newest input's number and the inputs.
+
+    Raises:
+        ValueError: If the packet is malformed
+    """
+
+    try:
+        _, acked, sequence, count = INPUT_PACKET.unpack_from(data)
+    except struct.error as e:
+        raise ValueError(e) from None
+    masks = data[INPUT_PACKET.size:]
+    if len(masks) != count:
+        raise ValueError("truncated input packet")
+    return acked, sequence, masks
+
+
+def encode_snapshot(tick: int, sequence: int, player_id: int, players, table: dict,
+                    baseline_tick: int = 0, baseline: dict = None) -> tuple[bytes, dict]:
+    """Snapshot packet of `table` as a delta against `baseline`.
+
+    Args:
+        tick: Server tick the table was taken at
+        sequence: Newest input of the receiver the server applied
+        player_id: The receiver's player
+        players: (id, Player) pairs of everyone in the game
+        table: Current quantized entities
+        baseline_tick: Tick of the snapshot the receiver acked, 0 for none
+        baseline: What the receiver decoded from that snapshot
+
+    Returns:
+        tuple: The packet, and the table the receiver will decode from it,
+        which is the baseline for later deltas
+    """
+
+    decoded = {}
+    records = []
+    removed = []
+
+    if baseline is None:
+        baseline_tick = 0
+        baseline = {}
+    ticks = tick - baseline_tick
+
+    for entity_id in baseline:
+        if entity_id not in table:
+            removed.append(REMOVED_RECORD.pack(entity_id))
+
+    for entity_id, entity in table.items():
+        old = baseline.get(entity_id)
+        if old is not None:
+            guess = extrapolate(old, ticks)
+            if (
+                guess[0] == entity[0] and guess[3] == entity[3] and guess[4] == entity[4]
+                and abs(guess[1] - entity[1]) <= POSITION_TOLERANCE
+                and abs(guess[2] - entity[2]) <= POSITION_TOLERANCE
+            ):
+                decoded[entity_id] = guess
+                continue
+        decoded[entity_id] = entity
+        records.append(ENTITY_RECORD.pack(entity_id, *entity))
+
+    header = SNAPSHOT_PACKET.pack(
+        SNAPSHOT, tick, baseline_tick, sequence, player_id, len(players), len(removed), len(records)
+    )
+    ships = [
+        PLAYER_RECORD.pack(
+            pid, player.position.x, player.position.y, player.rotation % 360, player.timer,
+            player.lives, player.score,
+        )
+        for pid, player in players
+    ]
+    return b"".join((header, *ships, *removed, *records)), decoded
+
+
+def decode_snapshot(data: bytes, baselines: dict) -> tuple:
+    """Reads a snapshot packet against the tables decoded before.
+
+    Args:
+        data: The packet
+        baselines: Tick to table of earlier snapshots
+
+    Returns:
+        tuple: tick, newest applied input, the receiver's player id, a list
+        of player records (id, x, y, rotation, timer, lives, score) and the
+        entity table
+
+    Raises:
+        KeyError: If the baseline snapshot is no longer (or not yet) known
+        ValueError: If the packet is malformed
+    """
+
+    try:
+        _, tick, baseline_tick, sequence, player_id, player_count, removed_count, record_count = (
+            SNAPSHOT_PACKET.unpack_from(data)
+        )
+        offset = SNAPSHOT_PACKET.size
+        players = [PLAYER_RECORD.unpack_from(data, offset + i * PLAYER_RECORD.size) for i in range(player_count)]
+        offset += player_count * PLAYER_RECORD.size
+        removed = {REMOVED_RECORD.unpack_from(data, offset + i * REMOVED_RECORD.size)[0] for i in range(removed_count)}
+        offset += removed_count * REMOVED_RECORD.size
+        records = [ENTITY_RECORD.unpack_from(data, offset + i * ENTITY_RECORD.size) for i in range(record_count)]
+    except struct.error as e:
+        raise ValueError(e) from None
+
+    table = {}
+    if baseline_tick:
+        ticks = tick - baseline_tick
+        for entity_id, old in baselines[baseline_tick].items():
+            if entity_id not in removed:
+                table[entity_id] = extrapolate(old, ticks)
+    for entity_id, *entity in records:
+        table[entity_id] = tuple(entity)
+
+    return tick, sequence, player_id, players, table
+
+
+class SimulatedLink:
+    """Non-blocking UDP socket delaying and dropping what it sends.
+
+    sendto() drops each packet with probability `loss` and otherwise holds
+    it for `latency` seconds plus up to `jitter` more (so packets can
+    arrive out of order); flush(), called every tick, sends those that are
+    due. Both ends of a connection wrap their own socket, so each direction
+    gets its share. With everything at 0 packets go straight out.
+
+    Args:
+        sock: Bound UDP socket
+        latency: One-way delay added, in seconds
+        jitter: Extra random delay, in seconds
+        loss: Fraction of packets dropped
+        seed: Seed of the generator deciding drops and delays
+    """
+
+    def __init__(self, sock, latency: float = 0.0, jitter: float = 0.0, loss: float = 0.0, seed: int = None) -> None:
+        sock.setblocking(False)
+        self.sock = sock
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.queue = []
+        self.order = 0
+        self.sent = 0
+        self.dropped = 0
+        self.bytes_sent = 0
+
+    def sendto(self, data: bytes, address) -> None:
+        self.sent += 1
+        self.bytes_sent += len(data)
+        if self.loss and self.rng.random() < self.loss:
+            self.dropped += 1
+            return
+        if not self.latency and not self.jitter:
+            self._send(data, address)
+            return
+
+        due = time.perf_counter() + self.latency + self.rng.uniform(0, self.jitter)
+        self.order += 1
+        heapq.heappush(self.queue, (due, self.order, data, address))
+
+    def flush(self) -> None:
+        now = time.perf_counter()
+        queue = self.queue
+        while queue and queue[0][0] <= now:
+            _, _, data, address = heapq.heappop(queue)
+            self._send(data, address)
+
+    def _send(self, data: bytes, address) -> None:
+        try:
+            self.sock.sendto(data, address)
+        except OSError:
+            # a full buffer or an unreachable peer is just another lost packet
+            self.dropped += 1
+
+    def receive(self) -> list:
+        """Every (data, address) waiting on the socket."""
+
+        packets = []
+        while True:
+            try:
+                packets.append(self.sock.recvfrom(65536))
+            except BlockingIOError:
+                return packets
+            except ConnectionResetError:
+                # Windows reports an earlier send to a closed port here
+                continue
+
+    def close(self) -> None:
+        self.sock.close()
@@ -0,0 +1,240 @@
+import numpy as np
+import pygame
+
+from constants import *
+
+
+class ParticleSystem:
+    """Explosion debris and thruster exhaust, kept in fixed-size NumPy arrays.
+
+    Particles are not sprites: every one is a slot in preallocated arrays of
+    coordinates, velocities and remaining lives, one array per field so each
+    is contiguous. Emitting writes into the
+    slots after the last ones used, wrapping around, so a slot is recycled
+    in place once it comes round again (the oldest particles make way when
+    more than `capacity` are alive). update() moves, slows and ages every
+    slot with a handful of array operations, and draw() writes all live
+    particles into the screen's pixels at once, as 2x2 dots fading from
+    their kind's first colour to its last as their life runs out.
+
+    Particles are only seen, never simulated: they are updated once per
+    rendered frame by the game loop, use a generator of their own and leave
+    the game's state (and replays) untouched.
+
+    The arrays belong to the thread that draws them. When the simulation
+    runs on another one, it sets `queue` to a list: explode() and thrust()
+    then only append what they would emit, and the drawing thread hands
+    the list to replay() (the pipelined loop carries it in each Snapshot).
+
+    Args:
+        capacity: Most particles alive at once
+        seed: Seed of the particles' random generator
+    """
+
+    DEBRIS = 0
+    EXHAUST = 1
+    # first and last colour of each kind, and the shades drawn in between
+    PALETTES = (
+        ((255, 210, 120), (60, 25, 0)),
+        ((170, 210, 255), (10, 10, 50)),
+    )
+    SHADES = 16
+
+    def __init__(self, capacity: int = PARTICLE_CAPACITY, seed: int = None) -> None:
+        self.capacity = capacity
+        self.x = np.zeros(capacity, np.float32)
+        self.y = np.zeros(capacity, np.float32)
+        self.vx = np.zeros(capacity, np.float32)
+        self.vy = np.zeros(capacity, np.float32)
+        self.step = np.zeros(capacity, np.float32)
+        # seconds left (a slot at 0 or below is free) out of the total
+        self.life = np.zeros(capacity, np.float32)
+        self.lifetime = np.ones(capacity, np.float32)
+        self.kind = np.zeros(capacity, np.uint8)
+        self.rng = np.random.default_rng(seed)
+        self.cursor = 0
+        # longest life left of any particle, so an empty system costs nothing
+        self.remaining = 0.0
+        self.emitted = 0
+        # the FrameGovernor turns emitting off on slow machines
+        self.enabled = True
+        # emissions waiting for replay(), None to emit at once
+        self.queue = None
+        self._colors = None
+        self._format = None
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.life > 0))
+
+    def clear(self) -> None:
+        self.life[:] = 0
+        self.remaining = 0.0
+
+    def _emit(self, kind: int, x, y, vx, vy, life) -> None:
+        count = min(len(life), self.capacity)
+        slots = (self.cursor + np.arange(count)) % self.capacity
+        self.cursor = (self.cursor + count) % self.capacity
+        self.x[slots] = x[:count]
+        self.y[slots] = y[:count]
+        self.vx[slots] = vx[:count]
+        self.vy[slots] = vy[:count]
+        self.life[slots] = life[:count]
+        self.lifetime[slots] = life[:count]
+        self.kind[slots] = kind
+        self.remaining = max(self.remaining, float(life.max()))
+        self.emitted += count
+
+    def take_queue(self) -> tuple:
+        """Emissions queued since the last call, for replay()."""
+
+        queued = tuple(self.queue or ())
+        if self.queue is not None:
+            self.queue.clear()
+        return queued
+
+    def replay(self, queued) -> None:
+        for emit, args in queued:
+            emit(*args)
+
+    def explode(self, position, radius: float, velocity) -> None:
+        """Debris flying out of an asteroid, more for bigger ones."""
+
+        if not self.enabled:
+            return
+        if self.queue is not None:
+            # vectors are copied, the sprite goes on moving
+            self.queue.append((self._explode, (tuple(position), radius, tuple(velocity))))
+            return
+        self._explode(position, radius, velocity)
+
+    def _explode(self, position, radius: float, velocity) -> None:
+        rng = self.rng
+        count = PARTICLES_PER_EXPLOSION * max(1, round(radius / ASTEROID_MIN_RADIUS))
+        angle = rng.uniform(0, 2 * np.pi, count)
+        dx = np.cos(angle)
+        dy = np.sin(angle)
+        start = rng.uniform(0, radius, count)
+        speed = rng.uniform(30, 160, count)
+        self._emit(
+            self.DEBRIS,
+            position[0] + dx * start,
+            position[1] + dy * start,
+            velocity[0] * 0.5 + dx * speed,
+            velocity[1] * 0.5 + dy * speed,
+            rng.uniform(0.4, 1.0, count) * PARTICLE_LIFETIME,
+        )
+
+    def thrust(self, position, rotation: float, direction: float = 1.0) -> None:
+        """Exhaust out of a ship's back (its front when `direction` is -1)."""
+
+        if not self.enabled:
+            return
+        if self.queue is not None:
+            self.queue.append((self._thrust, (tuple(position), rotation, direction)))
+            return
+        self._thrust(position, rotation, direction)
+
+    def _thrust(self, position, rotation: float, direction: float) -> None:
+        rng = self.rng
+        count = PARTICLES_PER_THRUST
+        # forward is (0, 1) rotated by the rotation, see Player.move
+        angle = np.radians(rotation + 90 + 180 * (direction > 0) + rng.uniform(-15, 15, count))
+        dx = np.cos(angle)
+        dy = np.sin(angle)
+        speed = rng.uniform(60, 160, count)
+        self._emit(
+            self.EXHAUST,
+            position[0] + dx * PLAYER_RADIUS,
+            position[1] + dy * PLAYER_RADIUS,
+            dx * speed,
+            dy * speed,
+            rng.uniform(0.15, 0.35, count),
+        )
+
+    def update(self, dt: float) -> None:
+        if self.remaining <= 0:
+            return
+        self.remaining -= dt
+
+        step = self.step
+        np.multiply(self.vx, dt, out=step)
+        self.x += step
+        np.multiply(self.vy, dt, out=step)
+        self.y += step
+        drag = PARTICLE_DRAG ** dt
+        self.vx *= drag
+        self.vy *= drag
+        self.life -= dt
+
+    def _palette(self, screen: pygame.Surface) -> np.ndarray:
+        # every kind's shades as pixel values of the screen's format, dimmest first
+        surface_format = (screen.get_bitsize(), screen.get_masks())
+        if surface_format != self._format:
+            shades = np.linspace(0, 1, self.SHADES)
+            self._colors = np.array([
+                screen.map_rgb(pygame.Color(first).lerp(last, 1 - t))
+                for first, last in self.PALETTES for t in shades
+            ], np.uint32)
+            self._format = surface_format
+        return self._colors
+
+    def draw(self, screen: pygame.Surface, offset=None) -> list[pygame.Rect]:
+        """Draws every live particle, shifted up and left by `offset`.
+
+        Returns:
+            list: The rect around all that was drawn, empty if nothing was
+        """
+
+        if self.remaining <= 0:
+            return []
+
+        # take() is several times faster than fancy indexing here
+        live = np.flatnonzero(self.life > 0)
+        x = self.x.take(live)
+        y = self.y.take(live)
+        if offset is not None:
+            x -= offset[0]
+            y -= offset[1]
+        x = x.astype(np.intp)
+        y = y.astype(np.intp)
+        width, height = screen.get_size()
+        inside = (x >= 0) & (x < width - 1) & (y >= 0) & (y < height - 1)
+        if not inside.any():
+            return []
+        live = live[inside]
+        x = x[inside]
+        y = y[inside]
+
+        life = self.life.take(live)
+        shade = (life / self.lifetime.take(live) * (self.SHADES - 1)).astype(np.intp)
+        shade += self.kind.take(live) * self.SHADES
+        color = self._palette(screen).take(shade)
+
+        try:
+            pixels = pygame.surfarray.pixels2d(screen)
+        except ValueError:
+            # 24 bit surfaces have no 2d pixel view
+            for px, py, value in zip(x.tolist(), y.tolist(), color.tolist()):
+                screen.fill(screen.unmap_rgb(value), (px, py, 2, 2))
+        else:
+            rows = pixels.T
+            if rows.flags.c_contiguous:
+                # one flat index per dot, offset for its other three pixels
+                flat = rows.reshape(-1)
+                index = y * width + x
+                flat[index] = color
+                flat[index + 1] = color
+                index += width
+                flat[index] = color
+                flat[index + 1] = color
+            else:
+                pixels[x, y] = color
+                pixels[x + 1, y] = color
+                pixels[x, y + 1] = color
+                pixels[x + 1, y + 1] = color
+            # the screen stays locked while a pixel view exists
+            del pixels, rows
+
+        left = int(x.min())
+        top = int(y.min())
+        return [pygame.Rect(left, top, int(x.max()) - left + 2, int(y.max()) - top + 2)]
@@ -0,0 +1,121 @@
+import time
+import threading
+
+
+class LatchedInput:
+    """Input source returning whatever mask was last stored in it.
+
+    The render thread samples the real input once per frame and latches it
+    here, so the simulation thread never touches SDL.
+    """
+
+    def __init__(self, mask: int = 0) -> None:
+        self.mask = mask
+
+    def __call__(self) -> int:
+        return self.mask
+
+
+class SimulationPipeline:
+    """Runs each frame's simulation on a worker thread while the last frame renders.
+
+    submit() hands the worker the work for the next frame and returns at
+    once; collect() waits for it to finish and returns what the work
+    function returned (typically a game state and an immutable Snapshot).
+    Between the two calls the caller draws the previous result, so the two
+    stages overlap and each frame is shown one frame after it was simulated.
+    Only two results exist at a time: the one being drawn and the one being
+    produced.
+
+    Stall metrics: time collect() spent waiting for the simulation (the
+    renderer was starved), and time a finished result sat waiting for
+    collect() (the simulation was held up by the renderer).
+
+    Args:
+        work: Called on the worker thread with the arguments given to submit()
+        stall_threshold: Waits shorter than this many seconds are not
+            counted as stalls
+    """
+
+    def __init__(self, work, stall_threshold: float = 0.0005) -> None:
+        self.work = work
+        self.stall_threshold = stall_threshold
+        self.frames = 0
+        self.render_stalls = 0
+        self.render_stall_time = 0.0
+        self.simulation_stalls = 0
+        self.simulation_stall_time = 0.0
+
+        self._job = None
+        self._result = None
+        self._finished_at = 0.0
+        self._error = None
+        self._running = True
+        self._submitted = threading.Event()
+        self._finished = threading.Event()
+        self._finished.set()
+        self._thread = threading.Thread(target=self._run, name="simulation", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._submitted.wait()
+            self._submitted.clear()
+            if not self._running:
+                return
+
+            try:
+                self._result = self.work(*self._job)
+            except BaseException as e:
+                self._error = e
+            self._finished_at = time.perf_counter()
+            self._finished.set()
+
+    def submit(self, *args) -> None:
+        """Starts simulating the next frame on the worker thread."""
+
+        self._finished.wait()
+        self._finished.clear()
+        self._job = args
+        self._submitted.set()
+
+    def collect(self):
+        """Waits for the submitted frame and returns the work function's result.
+
+        Raises:
+            Exception: Whatever the work function raised on the worker thread
+        """
+
+        start = time.perf_counter()
+        self._finished.wait()
+        now = time.perf_counter()
+
+        self.frames += 1
+        if now - start > self.stall_threshold:
+            self.render_stalls += 1
+            self.render_stall_time += now - start
+        elif now - self._finished_at > self.stall_threshold:
+            self.simulation_stalls += 1
+            self.simulation_stall_time += now - self._finished_at
+
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+        return self._result
+
+    def close(self) -> None:
+        """Lets the current frame finish and stops the worker thread."""
+
+        self._finished.wait()
+        self._running = False
+        self._submitted.set()
+        self._thread.join()
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "render_stalls": self.render_stalls,
+            "render_stall_ms": 1000 * self.render_stall_time,
+            "simulation_stalls": self.simulation_stalls,
+            "simulation_stall_ms": 1000 * self.simulation_stall_time,
+        }
@@ -2,34 +2,56 @@ import pygame
 
 from shot import Shot
 from constants import *
+from controls import *
 from circleshape import CircleShape
 from gamestates import GameState, GameScreens
 
 
+def ship_triangle(position: pygame.Vector2, rotation: float, radius: float) -> list:
+    """Corners of the ship's triangle for a given center, heading and size."""
+    
+    forward = pygame.Vector2(0, 1).rotate(rotation)
+    right = pygame.Vector2(0, 1).rotate(rotation + 90) * radius / 1.5
+    a = position + forward * radius
+    b = position - forward * radius - right
+    c = position - forward * radius + right
+    return [a, b, c]
+
+
 class Player(CircleShape):
     
     def __init__(self, x: float, y: float) -> None:
         super().__init__(x, y, PLAYER_RADIUS)
         self.rotation = 0
+        self.previous_rotation = 0
         self.timer = 0
         self.score = 0
         self.lives = PLAYER_NUM_LIVES
+        # callable returning the input bitmask for this frame
+        self.controls = keyboard
+        # what controls() returned in the last update, for input recording
+        self.last_input = 0
         
     # in the player class
     def triangle(self) -> list:
-        forward = pygame.Vector2(0, 1).rotate(self.rotation)
-        right = pygame.Vector2(0, 1).rotate(self.rotation + 90) * self.radius / 1.5
-        a = self.position + forward * self.radius
-        b = self.position - forward * self.radius - right
-        c = self.position - forward * self.radius + right
-        return [a, b, c] 
+        return ship_triangle(self.position, self.rotation, self.radius)
     
     def reset_position(self):
-        super().__init__(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, PLAYER_RADIUS)
+        super().__init__(WORLD_WIDTH // 2, WORLD_HEIGHT // 2, PLAYER_RADIUS)
         self.rotation = 0
+        self.previous_rotation = 0
+    
+    def begin_interpolation(self, alpha, offset=None):
+        super().begin_interpolation(alpha, offset)
+        self.simulated_rotation = self.rotation
+        self.rotation = self.previous_rotation + (self.rotation - self.previous_rotation) * alpha
+    
+    def end_interpolation(self):
+        super().end_interpolation()
+        self.rotation = self.simulated_rotation
         
     def draw(self, screen: object):
-        pygame.draw.polygon(screen, "white", self.triangle(), 2)
+        return pygame.draw.polygon(screen, "white", self.triangle(), 2)
         
     def rotate(self, dt: float) -> None:
         self.rotation += PLAYER_ROTATION_SPEED * dt
@@ -39,46 +61,64 @@ class Player(CircleShape):
         self.position += forward * PLAYER_SPEED * dt
         
     def update(self, dt):
-        keys = pygame.key.get_pressed()
+        keys = self.last_input = self.controls()
+        self.previous_position.update(self.position)
+        self.previous_rotation = self.rotation
         
         if self.timer > 0:
             self.timer -= dt
         
-        if keys[pygame.K_a] or keys[pygame.K_LEFT]:
+        if keys & LEFT:
             self.rotate(-dt)
             
-        if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
+        if keys & RIGHT:
             self.rotate(dt)
             
-        if keys[pygame.K_w] or keys[pygame.K_UP]:
+        if keys & FORWARD:
             self.move(dt)
         
-        if keys[pygame.K_s] or keys[pygame.K_DOWN]:
+        if keys & BACKWARD:
             self.move(-dt)
+        
+        if keys & (FORWARD | BACKWARD) and self.particles is not None:
+            self.particles.thrust(self.position, self.rotation, 1 if keys & FORWARD else -1)
             
-        if keys[pygame.K_SPACE]:
+        if keys & SHOOT:
             if self.timer <= 0:
                 self.shoot()
                 
-        if keys[pygame.K_ESCAPE]:
+        if keys & PAUSE:
             return GameState.PAUSED
                 
         self.wrap_position()
     
     def wrap_position(self):
-        if self.position.x > SCREEN_WIDTH:
+        x, y = self.position
+        
+        if self.position.x > WORLD_WIDTH:
             self.position.x = 0
         elif self.position.x < 0:
-            self.position.x = SCREEN_WIDTH
-        if self.position.y > SCREEN_HEIGHT:
+            self.position.x = WORLD_WIDTH
+        if self.position.y > WORLD_HEIGHT:
             self.position.y = 0
         elif self.position.y < 0:
-            self.position.y = SCREEN_HEIGHT    
+            self.position.y = WORLD_HEIGHT
+            
+        # jumping to the other side, not travelling across the screen
+        if self.position.x != x or self.position.y != y:
+            self.previous_position.update(self.position)    
             
     def shoot(self):
-        bullet = Shot(self.position.x, self.position.y)
-        bullet.velocity = pygame.Vector2(0, 1).rotate(self.rotation) * PLAYER_SHOOT_SPEED
+        velocity = pygame.Vector2(0, 1).rotate(self.rotation) * PLAYER_SHOOT_SPEED
         self.timer = PLAYER_SHOOT_COOLDOWN
+        
+        if Shot.store is not None:
+            Shot.store.add_shot(self.position, velocity)
+            return
+        
+        bullet = Shot.create(self.position.x, self.position.y)
+        bullet.velocity.update(velocity)
+        bullet.owner = self
 
         
         
@@ -0,0 +1,72 @@
+import pygame
+
+
+class SpritePool(pygame.sprite.Sprite):
+    """Recycles dead sprites of one class instead of allocating new ones.
+
+    kill() hands pooled sprites back through release(). They are only reused
+    from the next frame on: code still holding a sprite it just killed (a
+    split asteroid, a shot in the collision loop) keeps seeing it unchanged
+    until then. The pool is placed first in the updatable group so update()
+    makes the previous frame's sprites available before anything spawns.
+
+    acquire() resets a recycled sprite in place, keeping its Vector2s, and
+    adds it back to its class containers.
+    """
+
+    def __init__(self, cls: type, capacity: int) -> None:
+        if hasattr(self, "containers"):
+            super().__init__(self.containers)
+        else:
+            super().__init__()
+
+        self.cls = cls
+        self.capacity = capacity
+        self.free = []
+        self.pending = []
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+        self.in_use = 0
+        self.high_water = 0
+        self.free_high_water = 0
+
+    def acquire(self, *args):
+        if self.free:
+            spr = self.free.pop()
+            spr.reset(*args)
+            self.hits += 1
+        else:
+            spr = self.cls(*args)
+            self.misses += 1
+
+        self.in_use += 1
+        if self.in_use > self.high_water:
+            self.high_water = self.in_use
+        return spr
+
+    def release(self, spr) -> None:
+        self.in_use = max(0, self.in_use - 1)
+        self.pending.append(spr)
+
+    def update(self, dt: float) -> None:
+        room = self.capacity - len(self.free)
+        if len(self.pending) > room:
+            self.discarded += len(self.pending) - max(room, 0)
+            del self.pending[max(room, 0):]
+
+        self.free.extend(self.pending)
+        self.pending.clear()
+        if len(self.free) > self.free_high_water:
+            self.free_high_water = len(self.free)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "discarded": self.discarded,
+            "in_use": self.in_use,
+            "high_water": self.high_water,
+            "free": len(self.free),
+            "free_high_water": self.free_high_water,
+        }
@@ -0,0 +1,315 @@
+import csv
+import json
+import time
+import tracemalloc
+from array import array
+
+import pygame
+
+from constants import *
+from textcache import text_cache
+
+
+# key toggling the profiler overlay during a game
+OVERLAY_KEY = pygame.K_F3
+
+
+class FrameProfiler:
+    """Per-frame stage timings kept in a fixed-size ring buffer.
+
+    game_loop calls begin_frame(), then lap() after each stage and finally
+    end_frame() with the entity counts. Only the last `capacity` frames are
+    kept, in preallocated arrays, so recording costs a few clock reads per
+    frame and memory never grows.
+
+    An AllocationTracker set as `allocations` is handed every frame and lap
+    too; the time it spends is left out of the stages.
+
+    The overlay's text is rendered again only every `overlay_interval`
+    frames, so it adds next to nothing to the frames it measures.
+    """
+
+    STAGES = ("events", "update", "collisions", "draw", "hud", "flip")
+
+    def __init__(self, capacity: int = PROFILER_FRAMES, overlay_interval: int = PROFILER_OVERLAY_INTERVAL) -> None:
+        self.capacity = capacity
+        self.starts = array("d", bytes(8 * capacity))
+        self.durations = {stage: array("d", bytes(8 * capacity)) for stage in self.STAGES}
+        self.asteroids = array("l", bytes(array("l").itemsize * capacity))
+        self.shots = array("l", bytes(array("l").itemsize * capacity))
+        self.count = 0
+        self.overlay = False
+        self.overlay_interval = overlay_interval
+        self.font = None
+        # rendered overlay lines, and the frame count they were rendered at
+        self.lines = []
+        self._rendered = 0
+        self.allocations = None
+        self._index = 0
+        self._last = 0.0
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def begin_frame(self) -> None:
+        index = self._index = self.count % self.capacity
+        for durations in self.durations.values():
+            durations[index] = 0.0
+        if self.allocations is not None:
+            self.allocations.begin_frame()
+        self._last = time.perf_counter()
+        self.starts[index] = self._last
+
+    def lap(self, stage: str) -> None:
+        """Adds the time since the previous lap to the given stage.
+
+        Stages repeated within a frame (several simulation steps) add up.
+        """
+
+        now = time.perf_counter()
+        self.durations[stage][self._index] += now - self._last
+        if self.allocations is not None:
+            self.allocations.lap(stage)
+            now = time.perf_counter()
+        self._last = now
+
+    def end_frame(self, asteroids: int, shots: int) -> None:
+        self.asteroids[self._index] = asteroids
+        self.shots[self._index] = shots
+        self.count += 1
+
+    def toggle_overlay(self) -> None:
+        self.overlay = not self.overlay
+        self.lines = []
+
+    def _recent(self, window: int) -> list[int]:
+        """Buffer slots of the last `window` recorded frames, oldest first."""
+
+        window = min(window, len(self))
+        return [(self.count - window + i) % self.capacity for i in range(window)]
+
+    def frame_time(self, slot: int) -> float:
+        return sum(self.durations[stage][slot] for stage in self.STAGES)
+
+    def busy_time(self, skip: tuple = ()) -> float:
+        """Seconds the last recorded frame spent in its stages, except those skipped."""
+
+        if not self.count:
+            return 0.0
+        slot = (self.count - 1) % self.capacity
+        return sum(self.durations[stage][slot] for stage in self.STAGES if stage not in skip)
+
+    def averages(self, window: int = 120) -> dict[str, float]:
+        """Mean milliseconds spent in each stage over the last frames."""
+
+        slots = self._recent(window)
+        if not slots:
+            return {stage: 0.0 for stage in self.STAGES}
+        return {
+            stage: 1000 * sum(self.durations[stage][slot] for slot in slots) / len(slots)
+            for stage in self.STAGES
+        }
+
+    def worst(self, n: int = 3) -> list[tuple[int, float]]:
+        """The n slowest frames still in the buffer as (frame number, ms)."""
+
+        slots = self._recent(self.capacity)
+        first = self.count - len(slots)
+        frames = [(first + i, 1000 * self.frame_time(slot)) for i, slot in enumerate(slots)]
+        return sorted(frames, key=lambda frame: frame[1], reverse=True)[:n]
+
+    def draw(self, screen: pygame.Surface) -> list[pygame.Rect]:
+        """Draws rolling averages, worst frames and entity counts.
+
+        Returns:
+            list: Rects covered by the overlay, empty when it is hidden
+        """
+
+        if not self.overlay or not len(self):
+            return []
+
+        if not self.lines or self.count - self._rendered >= self.overlay_interval:
+            self._render_lines()
+
+        x = screen.get_width() - 230
+        return [screen.blit(text, (x, 10 + i * 20)) for i, text in enumerate(self.lines)]
+
+    def _render_lines(self) -> None:
+        if self.font is None:
+            self.font = text_cache.font(None, 24)
+
+        averages = self.averages()
+        last = (self.count - 1) % self.capacity
+        lines = [f"frame {sum(averages.values()):6.2f} ms"]
+        lines += [f"{stage:<10} {ms:6.2f} ms" for stage, ms in averages.items()]
+        lines += [f"worst #{frame} {ms:6.2f} ms" for frame, ms in self.worst()]
+        lines.append(f"asteroids {self.asteroids[last]}  shots {self.shots[last]}")
+
+        self.lines = [self.font.render(line, True, (0, 255, 0)) for line in lines]
+        self._rendered = self.count
+
+    def records(self) -> list[dict]:
+        """Every frame still in the buffer, oldest first."""
+
+        slots = self._recent(self.capacity)
+        first = self.count - len(slots)
+        return [
+            {
+                "frame": first + i,
+                "start": self.starts[slot],
+                **{stage: self.durations[stage][slot] for stage in self.STAGES},
+                "asteroids": self.asteroids[slot],
+                "shots": self.shots[slot],
+            }
+            for i, slot in enumerate(slots)
+        ]
+
+    def dump(self, path: str) -> None:
+        """Writes the buffer as Chrome trace-event JSON (.json) or CSV."""
+
+        if path.endswith(".json"):
+            self.dump_trace(path)
+        else:
+            self.dump_csv(path)
+
+    def dump_csv(self, path: str) -> None:
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame", *(f"{stage}_ms" for stage in self.STAGES), "asteroids", "shots"])
+            for record in self.records():
+                writer.writerow([
+                    record["frame"],
+                    *(f"{1000 * record[stage]:.4f}" for stage in self.STAGES),
+                    record["asteroids"],
+                    record["shots"],
+                ])
+
+    def dump_trace(self, path: str) -> None:
+        """Writes complete ("X") events per stage, loadable in chrome://tracing."""
+
+        records = self.records()
+        origin = records[0]["start"] if records else 0.0
+        events = []
+
+        for record in records:
+            start = record["start"] - origin
+            events.append({
+                "name": "frame", "ph": "X", "pid": 0, "tid": 0,
+                "ts": start * 1e6, "dur": sum(record[stage] for stage in self.STAGES) * 1e6,
+                "args": {"frame": record["frame"]},
+            })
+            for stage in self.STAGES:
+                events.append({
+                    "name": stage, "ph": "X", "pid": 0, "tid": 0,
+                    "ts": start * 1e6, "dur": record[stage] * 1e6,
+                })
+                start += record[stage]
+            events.append({
+                "name": "entities", "ph": "C", "pid": 0, "tid": 0,
+                "ts": (record["start"] - origin) * 1e6,
+                "args": {"asteroids": record["asteroids"], "shots": record["shots"]},
+            })
+
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+
+class AllocationTracker:
+    """Memory allocated in each stage of a game's frames, traced by tracemalloc.
+
+    Set as a FrameProfiler's `allocations`, it follows the profiler's
+    stages. Every `interval`-th frame is sampled: the traced blocks are
+    snapshotted when the frame begins and after each stage, and two
+    snapshots compared by source line give what the stage allocated and
+    still held when it ended (the objects a garbage collection has to look
+    at). Temporaries freed within the stage only show in its peak, the most
+    memory traced at once above where the stage started. Tracing slows
+    every allocation down, so frame times are not to be trusted meanwhile.
+
+    With PIPELINED_SIMULATION the simulation allocates on the worker thread
+    while the main one draws, so its allocations mostly land in "draw".
+
+    Args:
+        interval: Frames between two sampled frames
+        top: Allocation sites listed per stage in report()
+    """
+
+    def __init__(self, interval: int = ALLOCATION_SAMPLE_INTERVAL, top: int = ALLOCATION_TOP_SITES) -> None:
+        self.interval = interval
+        self.top = top
+        self.frames = 0
+        self.samples = 0
+        self.blocks = {stage: 0 for stage in FrameProfiler.STAGES}
+        self.bytes = {stage: 0 for stage in FrameProfiler.STAGES}
+        self.peak = {stage: 0 for stage in FrameProfiler.STAGES}
+        # stage to {(file, line): [blocks, bytes]}
+        self.sites = {stage: {} for stage in FrameProfiler.STAGES}
+        # the tracer's and this module's own bookkeeping are not the game's
+        self._filters = (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        )
+        self._snapshot = None
+        self._current = 0
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        # filtering compiles its patterns once, which is not a stage's doing either
+        self._take_snapshot()
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(self._filters)
+
+    def begin_frame(self) -> None:
+        sampled = self.frames % self.interval == 0
+        self.frames += 1
+        if not sampled:
+            self._snapshot = None
+            return
+
+        self.samples += 1
+        self._snapshot = self._take_snapshot()
+        self._current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def lap(self, stage: str) -> None:
+        if self._snapshot is None:
+            return
+
+        peak = tracemalloc.get_traced_memory()[1]
+        self.peak[stage] = max(self.peak[stage], peak - self._current)
+        snapshot = self._take_snapshot()
+        sites = self.sites[stage]
+        for stat in snapshot.compare_to(self._snapshot, "lineno"):
+            if stat.count_diff <= 0:
+                continue
+            self.blocks[stage] += stat.count_diff
+            self.bytes[stage] += stat.size_diff
+            frame = stat.traceback[0]
+            site = sites.setdefault((frame.filename, frame.lineno), [0, 0])
+            site[0] += stat.count_diff
+            site[1] += stat.size_diff
+
+        self._snapshot = snapshot
+        self._current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def report(self) -> str:
+        """Blocks and bytes kept per sampled frame, peaks and top sites of each stage."""
+
+        samples = max(1, self.samples)
+        lines = [f"Allocations over {self.samples} sampled frames (1 in {self.interval}):"]
+        for stage in FrameProfiler.STAGES:
+            if not self.blocks[stage] and not self.peak[stage]:
+                continue
+            lines.append(
+                f"  {stage:<10} {self.blocks[stage] / samples:8.1f} blocks "
+                f"{self.bytes[stage] / samples / 1024:8.1f} KiB per frame, "
+                f"peak {self.peak[stage] / 1024:.1f} KiB"
+            )
+            top = sorted(self.sites[stage].items(), key=lambda site: site[1][0], reverse=True)[:self.top]
+            for (filename, lineno), (blocks, size) in top:
+                lines.append(f"    {blocks / samples:8.1f} blocks {size / samples:8.0f} B  {filename}:{lineno}")
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        tracemalloc.stop()
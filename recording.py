@@ -0,0 +1,218 @@
+"""Compact input recordings of a game, and their replay.
+
+A recording holds everything needed to play a game again bit for bit: the
+seed of the world's random generator, how time was stepped, and the input
+bitmask of every simulation step. Replays run as fast as possible without a
+display, or in real time with rendering:
+
+    python recording.py recordings/1700000000.astrec
+    python recording.py recordings/1700000000.astrec --realtime
+"""
+import os
+import sys
+import json
+import time
+import struct
+import argparse
+
+# stdout is for results only
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from constants import *
+from renderer import Renderer
+
+MAGIC = b"ASTREC"
+VERSION = 1
+# magic, version, flags, seed, fixed step in seconds (0 for variable)
+HEADER = struct.Struct("<6sBBqd")
+# input bitmask and either a run length (fixed step) or milliseconds (variable)
+RECORD = struct.Struct("<BH")
+
+FIXED_STEP = 1
+ENTITY_STORE = 2
+
+
+class InputRecorder:
+    """Streams the input of every simulation step to a recording file.
+
+    With a fixed timestep consecutive steps with the same input are stored as
+    one run, so a held key costs nothing per step. With a variable timestep
+    every step stores its input and its duration in whole milliseconds, which
+    is exactly how pygame's clock measures it. Records are collected in
+    memory and written in blocks of `buffer_size` bytes.
+    """
+
+    def __init__(self, path: str, seed: int, fixed_step: float = 0.0, use_store: bool = False,
+                 buffer_size: int = RECORDING_BUFFER_SIZE) -> None:
+        self.file = open(path, "wb")
+        self.path = path
+        self.fixed_step = fixed_step
+        self.buffer = bytearray()
+        self.buffer_size = buffer_size
+        self.mask = None
+        self.run = 0
+        self.ticks = 0
+
+        flags = (FIXED_STEP if fixed_step else 0) | (ENTITY_STORE if use_store else 0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, flags, seed, fixed_step))
+
+    def record(self, mask: int, dt: float) -> None:
+        self.ticks += 1
+
+        if not self.fixed_step:
+            self.buffer += RECORD.pack(mask, min(round(dt * 1000), 0xFFFF))
+        elif mask == self.mask and self.run < 0xFFFF:
+            self.run += 1
+            return
+        else:
+            self._end_run()
+            self.mask = mask
+            self.run = 1
+
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def _end_run(self) -> None:
+        if self.run:
+            self.buffer += RECORD.pack(self.mask, self.run)
+            self.run = 0
+
+    def flush(self) -> None:
+        self.file.write(self.buffer)
+        self.buffer.clear()
+
+    def close(self) -> None:
+        if self.file.closed:
+            return
+        self._end_run()
+        self.flush()
+        self.file.close()
+
+
+class Recording:
+    """A recording read back from disk."""
+
+    def __init__(self, seed: int, fixed_step: float, use_store: bool, masks: list[int], steps: list[float]) -> None:
+        self.seed = seed
+        self.fixed_step = fixed_step
+        self.use_store = use_store
+        self.masks = masks
+        self.steps = steps
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+
+def read_recording(path: str) -> Recording:
+    """Reads a recording, expanding it to one input and dt per step.
+
+    Raises:
+        ValueError: If the file is not a recording this version understands
+    """
+
+    with open(path, "rb") as file:
+        data = file.read()
+
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is too short to be a recording")
+
+    magic, version, flags, seed, fixed_step = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} recording")
+
+    masks = []
+    steps = []
+    for mask, value in RECORD.iter_unpack(data[HEADER.size:]):
+        if flags & FIXED_STEP:
+            masks.extend([mask] * value)
+            steps.extend([fixed_step] * value)
+        else:
+            masks.append(mask)
+            steps.append(value / 1000)
+
+    return Recording(seed, fixed_step, bool(flags & ENTITY_STORE), masks, steps)
+
+
+def replay(recording: Recording, realtime: bool = False) -> dict:
+    """Feeds a recording through the simulation.
+
+    Args:
+        recording: What to replay
+        realtime: Whether to open a window and play at the recorded speed,
+            instead of simulating as fast as possible without a display
+
+    Returns:
+        dict: Final score, lives, step count, wall time and state digest
+    """
+
+    from world import World
+    from controls import ScriptedInput
+    from gamestates import GameState
+
+    screen = renderer = None
+    if realtime:
+        pygame.display.init()
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        renderer = Renderer(screen)
+
+    world = World(recording.seed, ScriptedInput(recording.masks), recording.use_store)
+    game_over = False
+    start = time.perf_counter()
+    deadline = start
+
+    for dt in recording.steps:
+        if world.step(dt) == GameState.END_GAME:
+            game_over = True
+            break
+
+        if realtime:
+            if any(event.type == pygame.QUIT for event in pygame.event.get()):
+                break
+            renderer.clear()
+            renderer.draw(world.drawable)
+            renderer.present()
+
+            deadline += dt
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    elapsed = time.perf_counter() - start
+    if realtime:
+        pygame.quit()
+
+    return {
+        "seed": recording.seed,
+        "steps": world.frame,
+        "recorded_steps": len(recording),
+        "score": world.player.score,
+        "lives": world.player.lives,
+        "game_over": game_over,
+        "wall_time": elapsed,
+        "steps_per_second": world.frame / elapsed if elapsed else 0.0,
+        "digest": world.digest(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded game.")
+    parser.add_argument("recording")
+    parser.add_argument("--realtime", action="store_true", help="render at the recorded speed")
+    args = parser.parse_args()
+
+    if not args.realtime:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    try:
+        recording = read_recording(args.recording)
+    except (OSError, ValueError) as e:
+        print(f"Failed to read recording: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(json.dumps(replay(recording, args.realtime)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import pygame
+
+from constants import *
+
+
+class Renderer:
+    """Full-screen renderer: clears everything and flips every frame.
+
+    game_loop drives any renderer the same way: clear(), draw() for the
+    sprites, add() for the rects of anything drawn directly such as the HUD,
+    then present(). With a SpriteAtlas the sprites are blitted from
+    pre-rendered surfaces in one batch instead of drawn one by one.
+
+    draw() takes an optional alpha: with a fixed timestep every sprite is
+    drawn that far between its previous and its current simulated position.
+    With a Camera only the sprites it finds visible are drawn, shifted by
+    its offset.
+    """
+
+    def __init__(self, screen: pygame.Surface, background="#000000", atlas=None, camera=None) -> None:
+        self.screen = screen
+        self.background = background
+        self.atlas = atlas
+        self.camera = camera
+
+    def clear(self) -> None:
+        self.screen.fill(self.background)
+
+    def draw(self, group, alpha: float = None) -> None:
+        camera = self.camera
+        if camera is not None:
+            sprites = camera.visible()
+            offset = camera.offset
+            if alpha is None:
+                alpha = 1.0
+        elif alpha is None:
+            self.draw_sprites(group)
+            return
+        else:
+            sprites = group.sprites()
+            offset = None
+
+        for spr in sprites:
+            spr.begin_interpolation(alpha, offset)
+        try:
+            self.draw_sprites(sprites)
+        finally:
+            for spr in sprites:
+                spr.end_interpolation()
+
+    def draw_sprites(self, sprites) -> None:
+        screen = self.screen
+        if self.atlas is not None:
+            self.atlas.draw(sprites, screen)
+            return
+        
+        for spr in sprites:
+            spr.draw(screen)
+
+    def draw_snapshot(self, snapshot) -> None:
+        # a Snapshot is drawn as captured, already interpolated and culled
+        self.add(snapshot.draw(self.screen, self.atlas))
+
+    def add(self, rects) -> None:
+        pass
+
+    def present(self) -> None:
+        pygame.display.flip()
+
+
+class DirtyRectRenderer(Renderer):
+    """Renderer that only erases and pushes the regions that changed.
+
+    Each sprite's draw() returns the bounding rect(s) of what it drew. Every
+    frame the rects of the previous frame are filled with the background, the
+    sprites are drawn again, and only the old and new rects are sent to the
+    display with pygame.display.update. When the dirty area gets larger than
+    `max_fraction` of the screen a single full flip is cheaper and used instead.
+    """
+
+    def __init__(self, screen: pygame.Surface, background="#000000", atlas=None, max_fraction: float = DIRTY_RECT_MAX_FRACTION,
+                 camera=None) -> None:
+        super().__init__(screen, background, atlas, camera)
+        self.max_area = max_fraction * screen.get_width() * screen.get_height()
+        self.previous = []
+        self.current = []
+        # the screen may hold anything (a menu) until the first full redraw
+        self.full_redraw = True
+        self.full_flips = 0
+        self.partial_updates = 0
+
+    def invalidate(self) -> None:
+        """Forces the next frame to clear and flip the whole screen."""
+
+        self.full_redraw = True
+
+    def clear(self) -> None:
+        if self.full_redraw:
+            self.screen.fill(self.background)
+            return
+
+        fill = self.screen.fill
+        background = self.background
+        for rect in self.previous:
+            fill(background, rect)
+
+    def add(self, rects) -> None:
+        if rects is None:
+            return
+        if isinstance(rects, pygame.Rect):
+            if rects.width and rects.height:
+                self.current.append(rects)
+            return
+        self.current.extend(rect for rect in rects if rect.width and rect.height)
+
+    def draw_sprites(self, sprites) -> None:
+        screen = self.screen
+        if self.atlas is not None:
+            self.add(self.atlas.draw(sprites, screen))
+            return
+        
+        add = self.add
+        for spr in sprites:
+            add(spr.draw(screen))
+
+    def present(self) -> None:
+        dirty = self.previous + self.current
+        area = sum(rect.width * rect.height for rect in dirty)
+
+        if self.full_redraw or area > self.max_area:
+            pygame.display.flip()
+            self.full_flips += 1
+        else:
+            pygame.display.update(dirty)
+            self.partial_updates += 1
+
+        self.full_redraw = False
+        self.previous = self.current
+        self.current = []
@@ -0,0 +1,285 @@
+"""Binary snapshots of a game's complete simulation state.
+
+A snapshot holds everything the next step depends on: the player, every
+asteroid and shot with the position it started its last step from, the
+asteroid field's spawn timer and the state of the random generator shared by
+spawns and splits. Restoring one and stepping on gives exactly the frames
+the original game would have produced, with sprites or an EntityStore
+either way. Snapshots back the rewind buffer, the pause menu's saved game and
+warm starts of headless runs (see headless.py --resume).
+"""
+import os
+import struct
+from collections import deque
+
+import pygame
+
+from shot import Shot
+from constants import *
+from asteroids import Asteroid
+
+MAGIC = b"ASTSAV"
+VERSION = 2
+# magic, version, asteroid count, shot count, frame, simulated seconds
+HEADER = struct.Struct("<6sBxIIqd")
+# position, previous position, rotation, previous rotation, shot timer, score, lives
+PLAYER = struct.Struct("<7dqi")
+# spawn timer, gaussian value the generator holds back (NaN for none), Mersenne Twister words
+FIELD = struct.Struct("<dd625I")
+# position, previous position, velocity, radius, age, and the time and steps
+# a far away asteroid has gone without moving (see FAR_UPDATE_INTERVAL)
+ASTEROID = struct.Struct("<10d")
+# position, previous position, velocity, age
+SHOT = struct.Struct("<7d")
+
+# held during a game to run it backwards through the rewind buffer
+REWIND_KEY = pygame.K_r
+
+
+def capture(player, field, asteroids, shots, frame: int = 0, seconds: float = 0.0) -> bytes:
+    """Serializes the state of a game.
+
+    The random generator is the one shared by Asteroid and AsteroidField.
+
+    Args:
+        player: The player's ship object
+        field: The AsteroidField spawning asteroids
+        asteroids: Group of asteroid sprites (ignored with an EntityStore)
+        shots: Group of shot sprites (ignored with an EntityStore)
+        frame: Frame counter to store along, see World.frame
+        seconds: Simulated or played time to store along
+
+    Returns:
+        bytes: The snapshot
+    """
+
+    store = Asteroid.store
+    if store is not None:
+        asteroid_count, shot_count = store.counts()
+        entities = _capture_store(store)
+    else:
+        asteroid_count, shot_count = len(asteroids), len(shots)
+        entities = b"".join([
+            *(ASTEROID.pack(*a.position, *a.previous_position, *a.velocity, a.radius, a.age, a.pending_dt, a.skipped)
+              for a in asteroids),
+            *(SHOT.pack(*s.position, *s.previous_position, *s.velocity, s.age) for s in shots),
+        ])
+
+    _, words, gauss = Asteroid.rng.getstate()
+    return b"".join((
+        HEADER.pack(MAGIC, VERSION, asteroid_count, shot_count, frame, seconds),
+        PLAYER.pack(
+            *player.position, *player.previous_position, player.rotation, player.previous_rotation,
+            player.timer, player.score, player.lives,
+        ),
+        FIELD.pack(field.spawn_timer, float("nan") if gauss is None else gauss, *words),
+        entities,
+    ))
+
+
+def _capture_store(store) -> bytes:
+    # numpy is only needed when the store is enabled
+    import numpy as np
+
+    rows = []
+    for kind in (store.ASTEROID, store.SHOT):
+        slots = store.indices(kind)
+        columns = [store.position[slots], store.previous[slots], store.velocity[slots]]
+        if kind == store.ASTEROID:
+            columns.append(store.radius[slots, None])
+        columns.append(store.age[slots, None])
+        if kind == store.ASTEROID:
+            # the store moves every entity every step
+            columns.append(np.zeros((len(slots), 2)))
+        rows.append(np.hstack(columns).astype("<f8").tobytes())
+    return b"".join(rows)
+
+
+def restore(data: bytes, player, field, asteroids, shots) -> tuple[int, float]:
+    """Puts a game back in the state a snapshot was captured in.
+
+    Asteroids and shots alive are moved to the snapshot's, in their original
+    order; the ones left over are killed and missing ones created.
+
+    Args:
+        data: Snapshot made by capture()
+        player: The player's ship object
+        field: The AsteroidField spawning asteroids
+        asteroids: Group of asteroid sprites (ignored with an EntityStore)
+        shots: Group of shot sprites (ignored with an EntityStore)
+
+    Returns:
+        tuple: The frame counter and time stored in the snapshot
+
+    Raises:
+        ValueError: If the data is not a snapshot this version can read
+    """
+
+    if len(data) < HEADER.size + PLAYER.size + FIELD.size:
+        raise ValueError("truncated snapshot")
+    magic, version, asteroid_count, shot_count, frame, seconds = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a snapshot of this game version")
+    offset = HEADER.size + PLAYER.size + FIELD.size
+    if len(data) != offset + asteroid_count * ASTEROID.size + shot_count * SHOT.size:
+        raise ValueError("truncated snapshot")
+
+    x, y, px, py, rotation, previous_rotation, timer, score, lives = PLAYER.unpack_from(data, HEADER.size)
+    player.position.update(x, y)
+    player.previous_position.update(px, py)
+    player.rotation = rotation
+    player.previous_rotation = previous_rotation
+    player.timer = timer
+    player.score = score
+    player.lives = lives
+
+    spawn_timer, gauss, *words = FIELD.unpack_from(data, HEADER.size + PLAYER.size)
+    field.spawn_timer = spawn_timer
+    Asteroid.rng.setstate((3, tuple(words), None if gauss != gauss else gauss))
+
+    store = Asteroid.store
+    if store is not None:
+        _restore_store(store, data, offset, asteroid_count, shot_count)
+        return frame, seconds
+
+    shot_offset = offset + asteroid_count * ASTEROID.size
+    asteroid_rows = list(ASTEROID.iter_unpack(data[offset:shot_offset]))
+    restored = _restore_sprites(asteroids, (row[:8] for row in asteroid_rows), Asteroid.create)
+    for asteroid, row in zip(restored, asteroid_rows):
+        asteroid.pending_dt = row[8]
+        asteroid.skipped = int(row[9])
+    shot_rows = ((*row[:6], SHOT_RADIUS, row[6]) for row in SHOT.iter_unpack(data[shot_offset:]))
+    _restore_sprites(shots, shot_rows, lambda x, y, radius: Shot.create(x, y))
+
+    return frame, seconds
+
+
+def _restore_sprites(group, rows, create) -> list:
+    # sprites already alive are moved in place, in group order, which is
+    # much cheaper than killing them all and creating them again
+    existing = group.sprites()
+    restored = []
+
+    for x, y, px, py, vx, vy, radius, age in rows:
+        # sprite radii are whole multiples of ASTEROID_MIN_RADIUS
+        if radius % 1 == 0:
+            radius = int(radius)
+        if len(restored) < len(existing):
+            spr = existing[len(restored)]
+            spr.position.update(x, y)
+            spr.radius = radius
+        else:
+            spr = create(x, y, radius)
+        spr.previous_position.update(px, py)
+        spr.velocity.update(vx, vy)
+        spr.age = age
+        spr.track()
+        restored.append(spr)
+
+    for spr in existing[len(restored):]:
+        spr.kill()
+    return restored
+
+
+def _restore_store(store, data: bytes, offset: int, asteroid_count: int, shot_count: int) -> None:
+    import numpy as np
+
+    store.alive[:store.size] = False
+    store.size = 0
+    while store.capacity < asteroid_count + shot_count:
+        store._grow()
+
+    start = 0
+    for kind, count, width in ((store.ASTEROID, asteroid_count, 10), (store.SHOT, shot_count, 7)):
+        rows = np.frombuffer(data, "<f8", count * width, offset).reshape(count, width)
+        offset += rows.nbytes
+        end = start + count
+        store.position[start:end] = rows[:, 0:2]
+        store.previous[start:end] = rows[:, 2:4]
+        store.velocity[start:end] = rows[:, 4:6]
+        if kind == store.ASTEROID:
+            store.radius[start:end] = rows[:, 6]
+            store.age[start:end] = rows[:, 7]
+        else:
+            store.radius[start:end] = SHOT_RADIUS
+            store.age[start:end] = rows[:, 6]
+        store.kind[start:end] = kind
+        store.alive[start:end] = True
+        start = end
+    store.size = start
+
+
+def save(path: str, data: bytes) -> None:
+    """Writes a snapshot to a file, replacing any earlier one atomically."""
+
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+def load(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+
+class RewindBuffer:
+    """Ring buffer of a game's recent snapshots, within a memory budget.
+
+    record() is called after every simulation step and captures the game
+    every `interval` steps; once the snapshots held take more than `budget`
+    bytes the oldest are dropped. step_back() restores the newest snapshot
+    and forgets it, so calling it once per frame runs the game backwards
+    `interval` steps at a time.
+
+    Args:
+        player: The player's ship object
+        field: The AsteroidField spawning asteroids
+        asteroids: Group of asteroid sprites
+        shots: Group of shot sprites
+        budget: Most bytes of snapshots kept
+        interval: Simulation steps between two snapshots
+    """
+
+    def __init__(self, player, field, asteroids, shots, budget: int = REWIND_BUFFER_BYTES,
+                 interval: int = REWIND_INTERVAL) -> None:
+        self.objects = (player, field, asteroids, shots)
+        self.budget = budget
+        self.interval = interval
+        self.snapshots = deque()
+        self.bytes = 0
+        self.steps = 0
+
+    def __len__(self) -> int:
+        return len(self.snapshots)
+
+    def record(self) -> None:
+        self.steps += 1
+        if self.steps < self.interval:
+            return
+        self.steps = 0
+
+        data = capture(*self.objects)
+        self.snapshots.append(data)
+        self.bytes += len(data)
+        while self.bytes > self.budget and len(self.snapshots) > 1:
+            self.bytes -= len(self.snapshots.popleft())
+
+    def step_back(self) -> bool:
+        """Restores the newest snapshot, False once there is none left."""
+
+        if not self.snapshots:
+            return False
+
+        data = self.snapshots.pop()
+        self.bytes -= len(data)
+        self.steps = 0
+        restore(data, *self.objects)
+        return True
+
+    def clear(self) -> None:
+        self.snapshots.clear()
+        self.bytes = 0
+        self.steps = 0
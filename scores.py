@@ -0,0 +1,198 @@
+import os
+import time
+import zlib
+import heapq
+import struct
+from collections import namedtuple
+
+from constants import *
+
+
+# score, unix time the game ended, seconds played, crc32 of the first three
+RECORD = struct.Struct("<qdfI")
+# magic, log records covered, number of entries, crc32 of the entries
+INDEX_HEADER = struct.Struct("<8sQII")
+INDEX_MAGIC = b"ASTTOP01"
+# records read at once when scanning the log
+SCAN_CHUNK = 4096
+
+Score = namedtuple("Score", "score time duration")
+
+
+def _pack(entry: Score) -> bytes:
+    body = RECORD.pack(entry.score, entry.time, entry.duration, 0)[:-4]
+    return body + struct.pack("<I", zlib.crc32(body))
+
+
+def _unpack(data: bytes, offset: int = 0) -> Score:
+    """Decodes one record, None if its checksum does not match."""
+
+    score, when, duration, crc = RECORD.unpack_from(data, offset)
+    if zlib.crc32(data[offset:offset + RECORD.size - 4]) != crc:
+        return None
+    return Score(score, when, duration)
+
+
+def _rank_key(entry: Score) -> tuple:
+    # higher scores first, ties go to whoever got there first
+    return (-entry.score, entry.time)
+
+
+class ScoreStore:
+    """Every finished game, in an append-only log with a top-K index beside it.
+
+    The log holds fixed-size checksummed records and is only ever appended
+    to, with one write and an fsync per game. A crash can at worst leave a
+    torn last record, which is cut off the next time the store is opened.
+    The index file keeps the best `top_k` scores and how many log records
+    they cover; it is replaced atomically after every game, and on opening
+    only log records written after it are scanned. Nothing reads the whole
+    history except rebuilding a lost index, which streams the log in chunks.
+
+    Args:
+        path: Log file; the index is stored next to it with a .top suffix
+        top_k: Number of best scores kept in the index
+    """
+
+    def __init__(self, path: str = SCORE_LOG_PATH, top_k: int = SCORE_TOP_K) -> None:
+        self.path = path
+        self.index_path = path + ".top"
+        self.top_k = top_k
+        self.best = []
+        self.covered = 0
+
+        self._truncate_torn_record()
+        self._load_index()
+
+        if self.covered < len(self):
+            self._scan(self.covered)
+            self._write_index()
+
+    def _write_index(self) -> None:
+        try:
+            self._replace_index()
+        except OSError:
+            # the index only saves a scan, the log is what matters; it is
+            # written again after the next game or rebuilt on opening
+            pass
+
+    def __len__(self) -> int:
+        try:
+            return os.path.getsize(self.path) // RECORD.size
+        except FileNotFoundError:
+            return 0
+
+    def _truncate_torn_record(self) -> None:
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return
+        if size % RECORD.size:
+            os.truncate(self.path, size - size % RECORD.size)
+
+    def _load_index(self) -> None:
+        try:
+            with open(self.index_path, "rb") as file:
+                data = file.read()
+            magic, covered, count, crc = INDEX_HEADER.unpack_from(data)
+            entries = data[INDEX_HEADER.size:INDEX_HEADER.size + count * RECORD.size]
+            if magic != INDEX_MAGIC or len(entries) != count * RECORD.size or zlib.crc32(entries) != crc:
+                raise ValueError("corrupt index")
+        except (OSError, ValueError, struct.error):
+            # rebuilt from the whole log
+            self.best = []
+            self.covered = 0
+            return
+
+        best = (_unpack(entries, offset) for offset in range(0, len(entries), RECORD.size))
+        self.best = sorted((entry for entry in best if entry is not None), key=_rank_key)[:self.top_k]
+        self.covered = min(covered, len(self))
+
+    def _scan(self, start: int) -> None:
+        """Merges log records from `start` on into the top-K list."""
+
+        candidates = list(self.best)
+        with open(self.path, "rb") as file:
+            file.seek(start * RECORD.size)
+            while True:
+                data = file.read(SCAN_CHUNK * RECORD.size)
+                if not data:
+                    break
+                for offset in range(0, len(data) - RECORD.size + 1, RECORD.size):
+                    entry = _unpack(data, offset)
+                    if entry is not None:
+                        candidates.append(entry)
+                # keep memory bounded by the index size, not the history
+                candidates = heapq.nsmallest(self.top_k, candidates, key=_rank_key)
+
+        self.best = sorted(candidates, key=_rank_key)[:self.top_k]
+        self.covered = len(self)
+
+    def _replace_index(self) -> None:
+        entries = b"".join(_pack(entry) for entry in self.best)
+        header = INDEX_HEADER.pack(INDEX_MAGIC, self.covered, len(self.best), zlib.crc32(entries))
+        temporary = self.index_path + ".tmp"
+
+        with open(temporary, "wb") as file:
+            file.write(header + entries)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.index_path)
+
+    def add(self, score: int, duration: float = 0.0, when: float = None) -> int:
+        """Records a finished game.
+
+        Args:
+            score: Final score
+            duration: Seconds the game lasted
+            when: Unix time the game ended, now by default
+
+        Returns:
+            int: Rank of the game among the best scores (0 is the best), or
+            None if it did not make the top-K
+
+        Raises:
+            OSError: If the game could not be appended to the log
+        """
+
+        entry = Score(int(score), time.time() if when is None else when, float(duration))
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, _pack(entry))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        best = self.best
+        best.append(entry)
+        best.sort(key=_rank_key)
+        del best[self.top_k:]
+        self.covered = len(self)
+        self._write_index()
+
+        return best.index(entry) if entry in best else None
+
+    def top(self, offset: int = 0, count: int = SCOREBOARD_PAGE_SIZE) -> list[Score]:
+        """A page of the best scores, best first."""
+
+        return self.best[offset:offset + count]
+
+    def recent(self, offset: int = 0, count: int = SCOREBOARD_PAGE_SIZE) -> list[Score]:
+        """A page of games, newest first, read straight from the log."""
+
+        total = len(self)
+        end = max(total - offset, 0)
+        start = max(end - count, 0)
+        if start == end:
+            return []
+
+        with open(self.path, "rb") as file:
+            file.seek(start * RECORD.size)
+            data = file.read((end - start) * RECORD.size)
+
+        entries = (_unpack(data, offset) for offset in range(0, len(data) - RECORD.size + 1, RECORD.size))
+        return [entry for entry in entries if entry is not None][::-1]
@@ -0,0 +1,356 @@
+"""Authoritative server of games shared by several players.
+
+One process simulates a single asteroid field with the game's own update
+and collision code, with a ship for every connected client. Clients only
+send their input bitmasks; the server applies one per client per step and
+sends each client a delta-compressed snapshot NET_SNAPSHOT_RATE times a
+second (see netcode.py for the wire format). Players who run out of lives
+watch until they leave; new ones can join any time:
+
+    python server.py
+    python server.py --port 7777 --latency 0.05 --jitter 0.02 --loss 0.05
+
+The last three options make the server's outgoing packets late and lossy,
+for trying clients (client.py) on one machine under network conditions.
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+
+# the server never opens a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+# stdout is for results only
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import netcode
+from constants import *
+from controls import PAUSE
+from player import Player
+from circleshape import CircleShape
+from pipeline import LatchedInput
+from spatialhash import SpatialHash
+from asteroidfield import AsteroidField
+from lifetime import LifetimeManager
+from main import GameContext, grouping, updating_group
+
+
+class SharedWorld:
+    """An asteroid field simulated for any number of players.
+
+    Built like World, with sprites only: the EntityStore's vectorized
+    collisions know a single player. Every player steers through a
+    LatchedInput the server sets before each step.
+    """
+
+    def __init__(self, seed: int = None) -> None:
+        self.rng = random.Random(seed)
+        self.updatable, self.drawable, self.asteroids, self.shots = grouping(False, self.rng)
+        self.field = AsteroidField(self.asteroids)
+        self.lifetimes = LifetimeManager(self.asteroids, self.shots)
+        self.players = {}
+        self.grid = SpatialHash(ASTEROID_MAX_RADIUS * 2)
+        self.tick = 0
+        # sprites are looked up through class attributes, see GameContext
+        self.context = GameContext()
+
+    def join(self) -> int:
+        """Adds a ship to the game, returning its player id (None when full)."""
+
+        free = [pid for pid in range(NET_MAX_PLAYERS) if pid not in self.players]
+        if not free:
+            return None
+
+        self.context.enter()
+        player = Player(WORLD_WIDTH / 2, WORLD_HEIGHT / 2)
+        player.controls = LatchedInput()
+        self.players[free[0]] = player
+        return free[0]
+
+    def leave(self, player_id: int) -> None:
+        self.players.pop(player_id).kill()
+
+    def step(self, dt: float) -> None:
+        self.context.enter()
+        self.tick += 1
+        updating_group("updatable", self.updatable, dt)
+        shared_collisions(self.asteroids, self.shots, self.players.values(), self.grid)
+
+    def table(self) -> dict:
+        """Quantized asteroids and shots by id, see netcode.py."""
+
+        table = {
+            a.serial: netcode.quantize(a, round(a.radius / ASTEROID_MIN_RADIUS)) for a in self.asteroids
+        }
+        table.update((s.serial, netcode.quantize(s, 0)) for s in self.shots)
+        return table
+
+
+def shared_collisions(asteroid_group, shots_group, players, grid: SpatialHash) -> None:
+    """main.asteroid_collisions for several players.
+
+    A ship hitting an asteroid loses a life and starts over from the middle,
+    or leaves the field with its last one; shots score for the player who
+    fired them. The game itself never ends.
+    """
+
+    if SWEPT_COLLISIONS:
+        collide = CircleShape.swept_collision
+    else:
+        collide = CircleShape.collision
+
+    grid.rebuild(shots_group, SWEPT_COLLISIONS)
+    for player in players:
+        if player.alive():
+            grid.insert(player, SWEPT_COLLISIONS)
+
+    hit = set()
+    for asteroid in asteroid_group:
+        if SWEPT_COLLISIONS:
+            candidates = grid.query(asteroid.position, asteroid.radius, asteroid.previous_position)
+        else:
+            candidates = grid.query(asteroid.position, asteroid.radius)
+
+        for other in candidates:
+            if isinstance(other, Player):
+                # a ship sent back to the middle is out of harm's way this step
+                if other in hit or not collide(asteroid, other):
+                    continue
+                hit.add(other)
+                other.lives -= 1
+                if other.lives <= 0:
+                    other.kill()
+                else:
+                    other.reset_position()
+
+            elif other in shots_group and collide(asteroid, other):
+                other.kill()
+                asteroid.split()
+                if other.owner is not None:
+                    other.owner.score += 100
+
+
+class RemoteClient:
+    """What the server knows about one connected client."""
+
+    def __init__(self, player_id: int) -> None:
+        self.player_id = player_id
+        # input number to mask, for inputs not applied yet
+        self.inputs = {}
+        self.applied = None
+        self.newest = 0
+        self.mask = 0
+        # tick of the newest snapshot acked, and the tables sent since
+        self.acked = 0
+        self.sent = {}
+        self.last_heard = time.perf_counter()
+        self.bytes_sent = 0
+        self.bytes_full = 0
+
+
+class GameServer:
+    """Runs a SharedWorld for the clients talking to its UDP socket.
+
+    Args:
+        address: (host, port) to bind, port 0 for any free one
+        seed: Seed of the world, and of the simulated link's losses
+        latency: Seconds added to every packet sent, see SimulatedLink
+        jitter: Random extra seconds added to every packet sent
+        loss: Fraction of the packets sent that are dropped
+    """
+
+    def __init__(self, address=("", NET_PORT), seed: int = None, latency: float = 0.0,
+                 jitter: float = 0.0, loss: float = 0.0) -> None:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind(address)
+        self.address = sock.getsockname()
+        self.link = netcode.SimulatedLink(sock, latency, jitter, loss, seed)
+        self.world = SharedWorld(seed)
+        self.clients = {}
+        self.dt = 1 / SIMULATION_RATE
+        self.snapshot_interval = max(1, SIMULATION_RATE // NET_SNAPSHOT_RATE)
+        self.running = True
+        self.joined = 0
+        self.snapshots = 0
+
+    def serve(self, duration: float = None) -> None:
+        """Steps the world SIMULATION_RATE times a second until stop() (or `duration`)."""
+
+        start = next_tick = time.perf_counter()
+        try:
+            while self.running:
+                now = time.perf_counter()
+                if duration is not None and now - start >= duration:
+                    break
+                if now < next_tick:
+                    # woken early for delayed packets falling due
+                    wake = next_tick
+                    if self.link.queue:
+                        wake = min(wake, self.link.queue[0][0])
+                    time.sleep(max(0.0, wake - now))
+                    self.link.flush()
+                    continue
+
+                next_tick += self.dt
+                if now - next_tick > MAX_CATCHUP_STEPS * self.dt:
+                    # a stall is not caught up on, like FixedTimestep
+                    next_tick = now
+                self.poll()
+                self.step()
+                self.link.flush()
+        finally:
+            self.link.close()
+
+    def stop(self) -> None:
+        self.running = False
+
+    def poll(self) -> None:
+        """Handles every packet received since the last call."""
+
+        now = time.perf_counter()
+        for data, address in self.link.receive():
+            if not data:
+                continue
+            kind = data[0]
+            client = self.clients.get(address)
+
+            if kind == netcode.HELLO:
+                if client is None:
+                    player_id = self.world.join()
+                    if player_id is None:
+                        continue
+                    client = self.clients[address] = RemoteClient(player_id)
+                    self.joined += 1
+                client.last_heard = now
+                self.link.sendto(netcode.WELCOME_PACKET.pack(netcode.WELCOME, client.player_id, self.world.tick), address)
+
+            elif client is None:
+                continue
+
+            elif kind == netcode.INPUT:
+                try:
+                    acked, sequence, masks = netcode.decode_input(data)
+                except ValueError:
+                    continue
+                client.last_heard = now
+                self._receive_inputs(client, sequence, masks)
+                if acked > client.acked and acked in client.sent:
+                    client.acked = acked
+
+            elif kind == netcode.BYE:
+                self._drop(address)
+
+        for address, client in list(self.clients.items()):
+            if now - client.last_heard > NET_TIMEOUT:
+                self._drop(address)
+
+    def _receive_inputs(self, client: RemoteClient, sequence: int, masks: bytes) -> None:
+        first = sequence - len(masks) + 1
+        if client.applied is None:
+            client.applied = first - 1
+        for number, mask in enumerate(masks, first):
+            if number > client.applied:
+                client.inputs[number] = mask
+        client.newest = max(client.newest, sequence)
+
+    def _drop(self, address) -> None:
+        client = self.clients.pop(address)
+        self.world.leave(client.player_id)
+
+    def step(self) -> None:
+        """Applies every client's next input, simulates one step and sends snapshots."""
+
+        players = self.world.players
+        for client in self.clients.values():
+            if client.applied is not None:
+                # a client whose inputs bunched up (a stall, a burst after
+                # losses) is caught up instead of staying behind for good
+                if client.newest - client.applied > NET_INPUT_REDUNDANCY:
+                    stale = client.newest - NET_INPUT_REDUNDANCY
+                    for number in [n for n in client.inputs if n <= stale]:
+                        del client.inputs[number]
+                    client.applied = stale
+                mask = client.inputs.pop(client.applied + 1, None)
+                if mask is not None:
+                    # a missing input repeats the one before
+                    client.applied += 1
+                    client.mask = mask
+            # the pause menu is a single player thing
+            players[client.player_id].controls.mask = client.mask & ~PAUSE
+
+        self.world.step(self.dt)
+        if self.world.tick % self.snapshot_interval == 0:
+            self.broadcast()
+
+    def broadcast(self) -> None:
+        world = self.world
+        tick = world.tick
+        table = world.table()
+        players = sorted(world.players.items())
+        full_size = (
+            netcode.SNAPSHOT_PACKET.size + len(players) * netcode.PLAYER_RECORD.size
+            + len(table) * netcode.ENTITY_RECORD.size
+        )
+
+        for address, client in self.clients.items():
+            baseline = client.sent.get(client.acked)
+            packet, decoded = netcode.encode_snapshot(
+                tick, client.applied or 0, client.player_id, players, table, client.acked, baseline
+            )
+            self.link.sendto(packet, address)
+            client.bytes_sent += len(packet)
+            client.bytes_full += full_size
+
+            # tables older than the ack can no longer be a baseline
+            client.sent[tick] = decoded
+            for old in [t for t in client.sent if t < client.acked or t <= tick - 64 * self.snapshot_interval]:
+                del client.sent[old]
+        self.snapshots += 1
+
+    def stats(self) -> dict:
+        seconds = self.world.tick * self.dt
+        return {
+            "ticks": self.world.tick,
+            "snapshots": self.snapshots,
+            "clients": len(self.clients),
+            "joined": self.joined,
+            "asteroids": len(self.world.asteroids),
+            "shots": len(self.world.shots),
+            "packets_sent": self.link.sent,
+            "packets_dropped": self.link.dropped,
+            "bytes_per_client_per_second": {
+                client.player_id: client.bytes_sent / seconds if seconds else 0.0
+                for client in self.clients.values()
+            },
+            "delta_ratio": {
+                client.player_id: client.bytes_sent / client.bytes_full if client.bytes_full else 1.0
+                for client in self.clients.values()
+            },
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host a game shared by several players.")
+    parser.add_argument("--host", default="")
+    parser.add_argument("--port", type=int, default=NET_PORT)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--seconds", type=float, help="stop after this long")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every packet sent")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra seconds per packet")
+    parser.add_argument("--loss", type=float, default=0.0, help="fraction of packets dropped")
+    args = parser.parse_args()
+
+    server = GameServer((args.host, args.port), args.seed, args.latency, args.jitter, args.loss)
+    print(f"Serving on port {server.address[1]}", file=sys.stderr, flush=True)
+    try:
+        server.serve(args.seconds)
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(server.stats()))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,39 @@ import pygame
 from circleshape import CircleShape
 from constants import SHOT_RADIUS
 
+
+def draw_shot(screen, position):
+    """Draws a shot at a position, as a small filled square without Shot.outlines."""
+    
+    if Shot.outlines:
+        return pygame.draw.circle(screen, "white", position, SHOT_RADIUS, 2)
+    # a few times cheaper than the outlined circle, and hardly different at this size
+    return screen.fill((255, 255, 255), (position[0] - SHOT_RADIUS / 2, position[1] - SHOT_RADIUS / 2, SHOT_RADIUS, SHOT_RADIUS))
+
+
 class Shot(CircleShape):
     
+    # EntityStore holding shots as arrays instead of sprites, if enabled
+    store = None
+    # outlined circles, or filled squares when a FrameGovernor lowers quality
+    outlines = True
+    # Player that fired the shot, scored for what it hits in a shared game
+    owner = None
+    
     def __init__(self, x, y):
         super().__init__(x, y, SHOT_RADIUS)
+        self.track()
+    
+    def reset(self, x, y):
+        super().reset(x, y, SHOT_RADIUS)
+        self.track()
         
     def draw(self, screen):
-        pygame.draw.circle(screen, "white", self.position, SHOT_RADIUS, 2)
+        return draw_shot(screen, self.position)
     
     def update(self, dt):
+        self.previous_position.update(self.position)
         self.position += self.velocity * dt
+        self.track()
 
         
\ No newline at end of file
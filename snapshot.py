@@ -0,0 +1,142 @@
+import pygame
+
+from shot import Shot, draw_shot
+from constants import *
+from asteroids import Asteroid
+from player import ship_triangle
+
+
+class Snapshot:
+    """Immutable copy of what the renderer needs from one simulated frame.
+
+    Entities are stored as tuples of plain numbers: (x, y, radius) per
+    asteroid, (x, y) per shot, and (x, y, rotation) for the player. Score and
+    lives are copied too, so the snapshot can stand in for the player in
+    draw_hud. Nothing in it refers back to the simulation, which can go on
+    changing while the snapshot is drawn on another thread. `particles` are
+    the emissions queued by a ParticleSystem since the snapshot before, for
+    the drawing thread to replay, and `offset` the camera's offset the
+    entities were shifted by (None without a camera).
+    """
+
+    __slots__ = ("asteroids", "shots", "player", "score", "lives", "particles", "offset")
+
+    def __init__(self, asteroids: tuple, shots: tuple, player: tuple, score: int, lives: int,
+                 particles: tuple = (), offset: tuple = None) -> None:
+        self.asteroids = asteroids
+        self.shots = shots
+        self.player = player
+        self.score = score
+        self.lives = lives
+        self.particles = particles
+        self.offset = offset
+
+    @classmethod
+    def capture(cls, asteroids, shots, player, alpha: float = None, camera=None,
+                particles: tuple = ()) -> "Snapshot":
+        """Copies the current state, `alpha` of the way from the previous step.
+
+        Args:
+            asteroids: Group of asteroid sprites (ignored with an EntityStore)
+            shots: Group of shot sprites (ignored with an EntityStore)
+            player: The player's ship object
+            alpha: Interpolation between the previous and current step, None
+                for the current positions
+            camera: Camera of a large world; only what it sees is copied, in
+                screen coordinates
+            particles: Queued particle emissions, see ParticleSystem.queue
+        """
+
+        store = Asteroid.store
+        if store is not None:
+            return cls._capture_store(store, player, alpha, camera, particles)
+        offset = None
+
+        if camera is not None:
+            visible = camera.visible()
+            asteroids = [spr for spr in visible if isinstance(spr, Asteroid)]
+            shots = [spr for spr in visible if isinstance(spr, Shot)]
+
+        if alpha is None:
+            asteroid_rows = tuple((a.position.x, a.position.y, a.radius) for a in asteroids)
+            shot_rows = tuple((s.position.x, s.position.y) for s in shots)
+            ship = (player.position.x, player.position.y, player.rotation)
+        else:
+            asteroid_rows = tuple((*a.previous_position.lerp(a.position, alpha), a.radius) for a in asteroids)
+            shot_rows = tuple(tuple(s.previous_position.lerp(s.position, alpha)) for s in shots)
+            rotation = player.previous_rotation + (player.rotation - player.previous_rotation) * alpha
+            ship = (*player.previous_position.lerp(player.position, alpha), rotation)
+
+        if camera is not None:
+            offset = ox, oy = tuple(camera.offset)
+            asteroid_rows = tuple((x - ox, y - oy, radius) for x, y, radius in asteroid_rows)
+            shot_rows = tuple((x - ox, y - oy) for x, y in shot_rows)
+            ship = (ship[0] - ox, ship[1] - oy, ship[2])
+
+        return cls(asteroid_rows, shot_rows, ship, player.score, player.lives, particles, offset)
+
+    @classmethod
+    def _capture_store(cls, store, player, alpha: float, camera, particles: tuple) -> "Snapshot":
+        n = store.size
+        live = store.alive[:n]
+        position = store.position[:n]
+        if alpha is not None:
+            previous = store.previous[:n]
+            position = previous + (position - previous) * alpha
+
+        if camera is not None:
+            position = position - (camera.offset.x, camera.offset.y)
+            reach = store.radius[:n]
+            x = position[:, 0]
+            y = position[:, 1]
+            live = live & (x > -reach) & (x < camera.width + reach) & (y > -reach) & (y < camera.height + reach)
+
+        asteroids = live & (store.kind[:n] == store.ASTEROID)
+        shots = live & (store.kind[:n] == store.SHOT)
+        asteroid_rows = tuple(zip(*position[asteroids].T.tolist(), store.radius[:n][asteroids].tolist()))
+        shot_rows = tuple(map(tuple, position[shots].tolist()))
+
+        if alpha is None:
+            ship = (player.position.x, player.position.y, player.rotation)
+        else:
+            rotation = player.previous_rotation + (player.rotation - player.previous_rotation) * alpha
+            ship = (*player.previous_position.lerp(player.position, alpha), rotation)
+        offset = None
+        if camera is not None:
+            offset = tuple(camera.offset)
+            ship = (ship[0] - offset[0], ship[1] - offset[1], ship[2])
+
+        return cls(asteroid_rows, shot_rows, ship, player.score, player.lives, particles, offset)
+
+    def counts(self) -> tuple[int, int]:
+        return len(self.asteroids), len(self.shots)
+
+    def draw(self, screen: pygame.Surface, atlas=None) -> list[pygame.Rect]:
+        """Draws every entity, from a SpriteAtlas when one is given.
+
+        Returns:
+            list: Rects covered by everything that was drawn
+        """
+
+        x, y, rotation = self.player
+
+        if atlas is not None:
+            sequence = []
+            for ax, ay, radius in self.asteroids:
+                sequence.append((atlas.asteroids[radius], (ax - radius, ay - radius)))
+            shot = atlas.shot
+            ox, oy = atlas.shot_offset
+            for sx, sy in self.shots:
+                sequence.append((shot, (sx - ox, sy - oy)))
+
+            step = round(rotation * atlas.rotation_steps / 360) % atlas.rotation_steps
+            half = atlas.ship_offset.x
+            sequence.append((atlas.ships[step], (x - half, y - half)))
+            return screen.blits(sequence)
+
+        circle = pygame.draw.circle
+        rects = [circle(screen, (255, 165, 0), (ax, ay), radius, 2) for ax, ay, radius in self.asteroids]
+        rects.extend(draw_shot(screen, position) for position in self.shots)
+        triangle = ship_triangle(pygame.Vector2(x, y), rotation, PLAYER_RADIUS)
+        rects.append(pygame.draw.polygon(screen, "white", triangle, 2))
+        return rects
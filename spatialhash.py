@@ -0,0 +1,97 @@
+from constants import ASTEROID_MAX_RADIUS
+
+
+class SpatialHash:
+    """Uniform grid broadphase for circle shapes.
+
+    Every inserted object is stored in each cell its bounding box touches, so
+    two overlapping circles always share at least one cell. Queries return the
+    candidates in insertion order, which keeps narrow-phase results identical
+    to iterating the original sprite group.
+    """
+
+    def __init__(self, cell_size: float = ASTEROID_MAX_RADIUS * 2) -> None:
+        self.cell_size = cell_size
+        self.cells = {}
+        self.order = {}
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def clear(self) -> None:
+        self.cells.clear()
+        self.order.clear()
+
+    def _cell_span(self, position, radius: float, previous=None) -> tuple[int, int, int, int]:
+        size = self.cell_size
+        x, y = position
+        if previous is None:
+            return (
+                int((x - radius) // size),
+                int((y - radius) // size),
+                int((x + radius) // size),
+                int((y + radius) // size),
+            )
+
+        px, py = previous
+        return (
+            int((min(x, px) - radius) // size),
+            int((min(y, py) - radius) // size),
+            int((max(x, px) + radius) // size),
+            int((max(y, py) + radius) // size),
+        )
+
+    def insert(self, obj, swept: bool = False) -> None:
+        """Adds an object exposing `position` and `radius` to the grid.
+
+        With `swept` it is stored along its whole path since previous_position,
+        for swept collision tests.
+        """
+
+        self.order[obj] = len(self.order)
+        previous = obj.previous_position if swept else None
+        min_x, min_y, max_x, max_y = self._cell_span(obj.position, obj.radius, previous)
+        cells = self.cells
+        for cx in range(min_x, max_x + 1):
+            for cy in range(min_y, max_y + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    cells[(cx, cy)] = [obj]
+                else:
+                    bucket.append(obj)
+
+    def rebuild(self, objects, swept: bool = False) -> None:
+        """Clears the grid and inserts every object again (once per frame)."""
+
+        self.clear()
+        for obj in objects:
+            self.insert(obj, swept)
+
+    def query(self, position, radius: float, previous=None) -> list:
+        """Returns every object sharing a cell with the given circle.
+
+        Args:
+            position: Center of the query circle
+            radius: Radius of the query circle
+            previous: Where the circle started its last step, to query along
+                the whole path
+
+        Returns:
+            list: Candidate objects, ordered as they were inserted
+        """
+
+        min_x, min_y, max_x, max_y = self._cell_span(position, radius, previous)
+        cells = self.cells
+
+        # common case: the circle fits in a single cell, already in order
+        if min_x == max_x and min_y == max_y:
+            return list(cells.get((min_x, min_y), ()))
+
+        found = set()
+        for cx in range(min_x, max_x + 1):
+            for cy in range(min_y, max_y + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+
+        return sorted(found, key=self.order.__getitem__)
@@ -0,0 +1,125 @@
+import math
+
+import pygame
+
+from shot import Shot
+from constants import *
+from asteroids import Asteroid
+from player import Player, ship_triangle
+
+
+class SpriteAtlas:
+    """Pre-rendered surfaces for every sprite the game draws.
+
+    Built once at startup: one surface per asteroid size (there are only
+    ASTEROID_KINDS of them), one for shots and one ship per quantized heading.
+    draw() then renders a whole group with a single Surface.blits call
+    instead of rasterizing circles and polygons for every sprite. Shots come
+    in two frames, the outlined circle and the plain square drawn without
+    Shot.outlines; `shot` and `shot_offset` are those of the current one.
+    """
+
+    def __init__(self, rotation_steps: int = PLAYER_ROTATION_STEPS) -> None:
+        self.rotation_steps = rotation_steps
+        self.asteroids = {
+            ASTEROID_MIN_RADIUS * kind: self._circle(ASTEROID_MIN_RADIUS * kind, (255, 165, 0))
+            for kind in range(1, ASTEROID_KINDS + 1)
+        }
+        self.outlined_shot = self._circle(SHOT_RADIUS, "white")
+        self.plain_shot = self._square(SHOT_RADIUS, "white")
+        self.ships = [self._ship(step * 360 / rotation_steps) for step in range(rotation_steps)]
+
+        # from a sprite's center to the top-left corner of its surface
+        self.asteroid_offsets = {radius: pygame.Vector2(radius, radius) for radius in self.asteroids}
+        self.outlined_shot_offset = pygame.Vector2(SHOT_RADIUS, SHOT_RADIUS)
+        self.plain_shot_offset = pygame.Vector2(SHOT_RADIUS / 2, SHOT_RADIUS / 2)
+        half = self.ships[0].get_width() // 2
+        self.ship_offset = pygame.Vector2(half, half)
+
+        # how to find the surface and top-left corner of each sprite class
+        self.sources = {
+            Asteroid: self.asteroid_source,
+            Shot: self.shot_source,
+            Player: self.ship_source,
+        }
+
+    @staticmethod
+    def _finish(surface: pygame.Surface) -> pygame.Surface:
+        # black is the background, so it can be the transparent color
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        surface.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+        return surface
+
+    def _circle(self, radius: int, color) -> pygame.Surface:
+        surface = pygame.Surface((radius * 2 + 1, radius * 2 + 1))
+        pygame.draw.circle(surface, color, (radius, radius), radius, 2)
+        return self._finish(surface)
+
+    @staticmethod
+    def _square(size: int, color) -> pygame.Surface:
+        # filled edge to edge, so it is copied without a colorkey
+        surface = pygame.Surface((size, size))
+        surface.fill(color)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        return surface
+
+    def _ship(self, rotation: float) -> pygame.Surface:
+        # farthest corner of the triangle from its center, plus the outline
+        half = math.ceil(PLAYER_RADIUS * math.hypot(1, 1 / 1.5)) + 2
+        surface = pygame.Surface((half * 2 + 1, half * 2 + 1))
+        pygame.draw.polygon(surface, "white", ship_triangle(pygame.Vector2(half, half), rotation, PLAYER_RADIUS), 2)
+        return self._finish(surface)
+
+    @property
+    def shot(self) -> pygame.Surface:
+        return self.outlined_shot if Shot.outlines else self.plain_shot
+
+    @property
+    def shot_offset(self) -> pygame.Vector2:
+        return self.outlined_shot_offset if Shot.outlines else self.plain_shot_offset
+
+    def asteroid_source(self, asteroid) -> tuple[pygame.Surface, pygame.Vector2]:
+        radius = asteroid.radius
+        return self.asteroids[radius], asteroid.position - self.asteroid_offsets[radius]
+
+    def shot_source(self, shot) -> tuple[pygame.Surface, pygame.Vector2]:
+        return self.shot, shot.position - self.shot_offset
+
+    def ship_source(self, player) -> tuple[pygame.Surface, pygame.Vector2]:
+        step = round(player.rotation * self.rotation_steps / 360) % self.rotation_steps
+        return self.ships[step], player.position - self.ship_offset
+
+    def draw(self, group, screen: pygame.Surface) -> list[pygame.Rect]:
+        """Draws every sprite of a group with one batched blit.
+
+        Objects providing blit_sources(atlas) (the EntityStore) contribute
+        all of their entities at once; sprites of unknown classes fall back to
+        their own draw().
+
+        Returns:
+            list: Rects covered by everything that was drawn
+        """
+
+        sources = self.sources
+        sequence = []
+        others = []
+
+        for spr in group:
+            source = sources.get(type(spr))
+            if source is not None:
+                sequence.append(source(spr))
+            elif hasattr(spr, "blit_sources"):
+                sequence.extend(spr.blit_sources(self))
+            else:
+                others.append(spr)
+
+        rects = screen.blits(sequence)
+        for spr in others:
+            drawn = spr.draw(screen)
+            if isinstance(drawn, pygame.Rect):
+                rects.append(drawn)
+            elif drawn:
+                rects.extend(drawn)
+        return rects
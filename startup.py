@@ -0,0 +1,50 @@
+import sys
+import time
+
+from constants import STARTUP_REPORT
+
+
+class StartupTimer:
+    """Where launch time goes, from the first import to the first frame.
+
+    mark() closes a phase and starts the next one; finish() closes the last
+    one and, with STARTUP_REPORT set, prints every phase plus the assets
+    loaded on the way to stderr. Only the first finish() counts.
+    """
+
+    def __init__(self, start: float = None) -> None:
+        self.start = time.perf_counter() if start is None else start
+        self.last = self.start
+        self.phases = []
+        self.finished = False
+
+    def mark(self, name: str) -> None:
+        if self.finished:
+            return
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def finish(self, name: str) -> None:
+        if self.finished:
+            return
+        self.mark(name)
+        self.finished = True
+        if STARTUP_REPORT:
+            print(self.report(), file=sys.stderr)
+
+    def report(self) -> str:
+        # not imported at the top, the imports phase would miss pygame
+        from assets import assets
+
+        lines = ["startup:"]
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<24}{1000 * seconds:8.1f} ms")
+        lines.append(f"  {'total':<24}{1000 * (self.last - self.start):8.1f} ms")
+        for path, milliseconds, cached in assets.loads:
+            source = "raw cache" if cached else "decoded"
+            lines.append(f"  {'  ' + path:<24}{milliseconds:8.1f} ms  {source}")
+        return "\n".join(lines)
+
+
+startup_timer = StartupTimer()
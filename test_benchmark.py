@@ -0,0 +1,9 @@
+from constants import ASTEROID_KINDS
+from benchmark import run_benchmark
+
+
+def test_player_is_never_hit():
+    for use_store in (False, True):
+        result = run_benchmark([80] * ASTEROID_KINDS, 200, frames=60, warmup=10, use_store=use_store)
+        assert result["player_hits"] == 0
+        assert result["population"]["asteroids"]["min"] >= 80 * ASTEROID_KINDS
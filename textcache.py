@@ -0,0 +1,67 @@
+from collections import OrderedDict
+
+import pygame
+
+from constants import TEXT_CACHE_SIZE
+
+
+class CachedFont:
+    """Drop-in for pygame.font.Font whose render() goes through a TextCache.
+
+    Rendered surfaces are shared between callers and must not be modified.
+    """
+
+    def __init__(self, cache: "TextCache", name: str, size: int) -> None:
+        self.cache = cache
+        self.name = name
+        self.size = size
+        self.font = pygame.font.Font(name, size)
+
+    def render(self, text: str, antialias: bool, color, background=None) -> pygame.Surface:
+        return self.cache.render(self, text, antialias, color, background)
+
+
+class TextCache:
+    """Shared fonts and rendered text surfaces with bounded LRU eviction.
+
+    Fonts are loaded once per (name, size). Text surfaces are keyed by font,
+    size, text, antialiasing and colors, so a label is only rasterized again
+    after it changed or was evicted as least recently used.
+    """
+
+    def __init__(self, max_entries: int = TEXT_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, name: str = None, size: int = 32) -> CachedFont:
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = CachedFont(self, name, size)
+        return font
+
+    def render(self, font: CachedFont, text: str, antialias: bool, color, background=None) -> pygame.Surface:
+        key = (font.name, font.size, text, antialias, color, background)
+        surfaces = self.surfaces
+        surface = surfaces.get(key)
+
+        if surface is not None:
+            self.hits += 1
+            surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = surfaces[key] = font.font.render(text, antialias, color, background)
+        if len(surfaces) > self.max_entries:
+            surfaces.popitem(last=False)
+        return surface
+
+    def clear(self) -> None:
+        self.surfaces.clear()
+
+
+# cache shared by the HUD and every menu screen
+text_cache = TextCache()
@@ -0,0 +1,53 @@
+from constants import *
+
+
+class VariableTimestep:
+    """One simulation step per rendered frame, as long as the frame took.
+
+    This is the classic loop: the clock caps rendering at `frame_rate` and
+    the measured frame time is the step.
+    """
+
+    def __init__(self, frame_rate: int = 60) -> None:
+        self.frame_rate = frame_rate
+        self.dt = 0.0
+        # positions are drawn as simulated, without interpolation
+        self.alpha = None
+
+    def advance(self, frame_time: float) -> int:
+        self.dt = frame_time
+        return 1
+
+
+class FixedTimestep:
+    """Accumulator running the simulation at a fixed rate.
+
+    Rendering runs at `frame_rate` (0 is uncapped). Every rendered frame adds
+    its duration to the accumulator and advance() says how many steps of
+    `dt` to simulate; alpha is how far the leftover time is into the next
+    step, for interpolating positions between the last two steps. At most
+    `max_steps` are run per frame; the rest of the backlog is dropped so that
+    one stall cannot snowball into ever longer frames.
+    """
+
+    def __init__(self, rate: int = SIMULATION_RATE, frame_rate: int = RENDER_RATE, max_steps: int = MAX_CATCHUP_STEPS) -> None:
+        self.dt = 1 / rate
+        self.frame_rate = frame_rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.dropped = 0
+
+    def advance(self, frame_time: float) -> int:
+        self.accumulator += frame_time
+        steps = int(self.accumulator // self.dt)
+
+        if steps > self.max_steps:
+            self.dropped += steps - self.max_steps
+            steps = self.max_steps
+            self.accumulator %= self.dt
+        else:
+            self.accumulator = max(0.0, self.accumulator - steps * self.dt)
+
+        self.alpha = self.accumulator / self.dt
+        return steps
@@ -0,0 +1,398 @@
+import numpy as np
+import pygame
+
+from constants import *
+from player import ship_triangle
+from controls import LEFT, RIGHT, FORWARD, BACKWARD, SHOOT
+
+
+class VectorEnv:
+    """N independent games advanced together, for training agents.
+
+    Each game has a player, an asteroid field, asteroids and shots following
+    the rules of the Player, AsteroidField, Asteroid, Shot, LifetimeManager
+    and asteroid_collisions, but their state is stacked across games in
+    NumPy arrays: player arrays have one row per game, asteroid and shot
+    arrays one row per game with a fixed number of slots each. step() then
+    advances every game with a few dozen array operations in total, instead
+    of a Python call per sprite per game.
+
+    Games that run out of lives are reset automatically; the observations
+    returned for them are already those of the next game, and their final
+    score is kept in episode_scores.
+
+    Differences from the sprite game: randomness comes from one NumPy
+    generator, so a seed gives other asteroids than in World; when every slot
+    is taken new asteroids and shots replace the oldest; and an asteroid hit
+    by several shots in one step splits once. With SWEPT_COLLISIONS, hits
+    are tested over the whole step from each entity's previous position,
+    like CircleShape.swept_collision.
+
+    Args:
+        num_envs: Number of games
+        seed: Seed for the generator shared by all games
+        dt: Simulated seconds per step
+        max_asteroids: Asteroid slots per game
+        max_shots: Shot slots per game
+        observed_asteroids: Nearest asteroids described in each observation
+    """
+
+    def __init__(self, num_envs: int, seed: int = None, dt: float = 1 / 60, max_asteroids: int = 64,
+                 max_shots: int = 16, observed_asteroids: int = 8) -> None:
+        self.num_envs = num_envs
+        self.dt = dt
+        self.max_asteroids = max_asteroids
+        self.max_shots = max_shots
+        self.observed_asteroids = observed_asteroids
+        self.rng = np.random.default_rng(seed)
+
+        n = num_envs
+        self.player_position = np.zeros((n, 2))
+        self.player_previous = np.zeros((n, 2))
+        self.player_rotation = np.zeros(n)
+        self.shoot_timer = np.zeros(n)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.lives = np.zeros(n, dtype=np.int64)
+        self.spawn_timer = np.zeros(n)
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.episode_scores = np.zeros(n, dtype=np.int64)
+
+        self.asteroid_position = np.zeros((n, max_asteroids, 2))
+        self.asteroid_previous = np.zeros((n, max_asteroids, 2))
+        self.asteroid_velocity = np.zeros((n, max_asteroids, 2))
+        self.asteroid_radius = np.zeros((n, max_asteroids))
+        self.asteroid_age = np.zeros((n, max_asteroids))
+        self.asteroid_alive = np.zeros((n, max_asteroids), dtype=bool)
+
+        self.shot_position = np.zeros((n, max_shots, 2))
+        self.shot_previous = np.zeros((n, max_shots, 2))
+        self.shot_velocity = np.zeros((n, max_shots, 2))
+        self.shot_age = np.zeros((n, max_shots))
+        self.shot_alive = np.zeros((n, max_shots), dtype=bool)
+
+        # direction and starting point of spawns from each screen edge, as in AsteroidField.edges
+        self.edge_direction = np.array([(1, 0), (-1, 0), (0, 1), (0, -1)], dtype=float)
+        self.edge_origin = np.array([
+            (-ASTEROID_MAX_RADIUS, 0),
+            (SCREEN_WIDTH + ASTEROID_MAX_RADIUS, 0),
+            (0, -ASTEROID_MAX_RADIUS),
+            (0, SCREEN_HEIGHT + ASTEROID_MAX_RADIUS),
+        ], dtype=float)
+        self.edge_extent = np.array([(0, SCREEN_HEIGHT), (0, SCREEN_HEIGHT), (SCREEN_WIDTH, 0), (SCREEN_WIDTH, 0)], dtype=float)
+
+        self.reset()
+
+    @property
+    def observation_size(self) -> int:
+        return 6 + 6 * self.observed_asteroids
+
+    def reset(self, mask: np.ndarray = None) -> np.ndarray:
+        """Starts new games, in every env or where mask is set.
+
+        Returns:
+            np.ndarray: Observations of all games
+        """
+
+        if mask is None:
+            mask = np.ones(self.num_envs, dtype=bool)
+
+        self.player_position[mask] = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+        self.player_previous[mask] = self.player_position[mask]
+        self.player_rotation[mask] = 0
+        self.shoot_timer[mask] = 0
+        self.score[mask] = 0
+        self.lives[mask] = PLAYER_NUM_LIVES
+        self.spawn_timer[mask] = 0
+        self.steps[mask] = 0
+        self.asteroid_alive[mask] = False
+        self.shot_alive[mask] = False
+        return self.observe()
+
+    @staticmethod
+    def _forward(rotation: np.ndarray) -> np.ndarray:
+        # pygame.Vector2(0, 1).rotate(rotation)
+        radians = np.radians(rotation)
+        return np.stack((-np.sin(radians), np.cos(radians)), axis=-1)
+
+    @staticmethod
+    def _allocate(alive: np.ndarray, age: np.ndarray, envs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Finds a slot for each request in envs (sorted, repeats allowed).
+
+        Free slots are handed out first, in index order; when a game has more
+        requests than free slots the oldest live entities are replaced.
+
+        Returns:
+            tuple: Game and slot index of every request
+        """
+
+        # free slots first, then live ones from oldest to newest
+        order = np.argsort(np.where(alive, -age, -np.inf), axis=1, kind="stable")
+        rank = np.arange(len(envs)) - np.searchsorted(envs, envs)
+        rank = np.minimum(rank, alive.shape[1] - 1)
+        return envs, order[envs, rank]
+
+    def _spawn_asteroids(self, envs: np.ndarray, position: np.ndarray, velocity: np.ndarray, radius: np.ndarray) -> None:
+        envs, slots = self._allocate(self.asteroid_alive, self.asteroid_age, envs)
+        self.asteroid_position[envs, slots] = position
+        self.asteroid_previous[envs, slots] = position
+        self.asteroid_velocity[envs, slots] = velocity
+        self.asteroid_radius[envs, slots] = radius
+        self.asteroid_age[envs, slots] = 0
+        self.asteroid_alive[envs, slots] = True
+
+    def step(self, actions) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Advances every game by dt with one input bitmask per game.
+
+        Args:
+            actions: Input bitmasks (see controls.py), one per game
+
+        Returns:
+            tuple: Observations (num_envs, observation_size), rewards (the
+            score gained this step) and done flags (the game ran out of lives)
+        """
+
+        dt = self.dt
+        actions = np.asarray(actions)
+        score_before = self.score.copy()
+
+        # asteroids and shots move; shots fired this step start moving next step
+        np.copyto(self.asteroid_previous, self.asteroid_position)
+        np.copyto(self.shot_previous, self.shot_position)
+        np.copyto(self.player_previous, self.player_position)
+        self.asteroid_position += self.asteroid_velocity * dt
+        self.shot_position += self.shot_velocity * dt
+
+        # Player.update
+        timer = self.shoot_timer
+        np.subtract(timer, dt, out=timer, where=timer > 0)
+        turn = ((actions & RIGHT) > 0).astype(float) - ((actions & LEFT) > 0)
+        self.player_rotation += PLAYER_ROTATION_SPEED * dt * turn
+        forward = self._forward(self.player_rotation)
+        thrust = ((actions & FORWARD) > 0).astype(float) - ((actions & BACKWARD) > 0)
+        self.player_position += forward * (PLAYER_SPEED * dt * thrust)[:, None]
+
+        shooting = np.flatnonzero(((actions & SHOOT) > 0) & (timer <= 0))
+        if len(shooting):
+            timer[shooting] = PLAYER_SHOOT_COOLDOWN
+            envs, slots = self._allocate(self.shot_alive, self.shot_age, shooting)
+            self.shot_position[envs, slots] = self.player_position[envs]
+            self.shot_previous[envs, slots] = self.player_position[envs]
+            self.shot_velocity[envs, slots] = forward[envs] * PLAYER_SHOOT_SPEED
+            self.shot_age[envs, slots] = 0
+            self.shot_alive[envs, slots] = True
+
+        # Player.wrap_position, a jump rather than a path across the screen
+        position = self.player_position
+        for axis, size in ((0, SCREEN_WIDTH), (1, SCREEN_HEIGHT)):
+            column = position[:, axis]
+            wrapped = (column > size) | (column < 0)
+            column[column > size] = 0
+            column[column < 0] = size
+            self.player_previous[wrapped] = position[wrapped]
+
+        # AsteroidField.update
+        self.spawn_timer += dt
+        spawning = np.flatnonzero(self.spawn_timer > ASTEROID_SPAWN_RATE)
+        if len(spawning):
+            self.spawn_timer[spawning] = 0
+            count = len(spawning)
+            rng = self.rng
+            edge = rng.integers(0, 4, count)
+            speed = rng.integers(40, 101, count)
+            angle = np.radians(rng.integers(-30, 31, count))
+            direction = self.edge_direction[edge]
+            cos, sin = np.cos(angle), np.sin(angle)
+            velocity = np.stack((direction[:, 0] * cos - direction[:, 1] * sin,
+                                 direction[:, 0] * sin + direction[:, 1] * cos), axis=-1) * speed[:, None]
+            start = self.edge_origin[edge] + self.edge_extent[edge] * rng.uniform(0, 1, count)[:, None]
+            radius = ASTEROID_MIN_RADIUS * rng.integers(1, ASTEROID_KINDS + 1, count)
+            self._spawn_asteroids(spawning, start, velocity, radius)
+
+        # LifetimeManager.update
+        self.asteroid_age += dt
+        self.shot_age += dt
+        self._cull(self.asteroid_position, self.asteroid_radius, self.asteroid_alive)
+        self._cull(self.shot_position, SHOT_RADIUS, self.shot_alive)
+        if SHOT_MAX_AGE is not None:
+            self.shot_alive &= self.shot_age <= SHOT_MAX_AGE
+        if ASTEROID_MAX_AGE is not None:
+            self.asteroid_alive &= self.asteroid_age <= ASTEROID_MAX_AGE
+
+        self._collide()
+
+        self.steps += 1
+        rewards = (self.score - score_before).astype(np.float32)
+        dones = self.lives <= 0
+        if dones.any():
+            self.episode_scores[dones] = self.score[dones]
+            self.reset(dones)
+        return self.observe(), rewards, dones
+
+    @staticmethod
+    def _cull(position: np.ndarray, radius, alive: np.ndarray) -> None:
+        reach = radius + LIFETIME_MARGIN
+        x = position[..., 0]
+        y = position[..., 1]
+        alive &= (x >= -reach) & (x <= SCREEN_WIDTH + reach) & (y >= -reach) & (y <= SCREEN_HEIGHT + reach)
+
+    @staticmethod
+    def _used(alive: np.ndarray) -> int:
+        """Number of leading slots holding anything in at least one game."""
+
+        used = np.flatnonzero(alive.any(axis=0))
+        return int(used[-1]) + 1 if len(used) else 0
+
+    @staticmethod
+    def _closest_approach(dx: np.ndarray, dy: np.ndarray, mx: np.ndarray, my: np.ndarray) -> np.ndarray:
+        """Smallest squared distance of offsets (dx, dy) changing by (mx, my) over a step.
+
+        The same closest approach as CircleShape.swept_collision, for arrays
+        of offsets between two moving points and of their changes.
+        """
+
+        length = mx * mx + my * my
+        along = -(dx * mx + dy * my)
+        t = np.clip(np.divide(along, length, out=np.zeros_like(length), where=length > 0), 0.0, 1.0)
+        dx = dx + mx * t
+        dy = dy + my * t
+        return dx * dx + dy * dy
+
+    def _collide(self) -> None:
+        """asteroid_collisions for every game at once."""
+
+        # slots are filled lowest first, so the tails are usually empty everywhere
+        a = self._used(self.asteroid_alive)
+        s = self._used(self.shot_alive)
+        alive = self.asteroid_alive[:, :a]
+        radius = self.asteroid_radius[:, :a]
+        x = self.asteroid_position[:, :a, 0]
+        y = self.asteroid_position[:, :a, 1]
+        if SWEPT_COLLISIONS:
+            x0 = self.asteroid_previous[:, :a, 0]
+            y0 = self.asteroid_previous[:, :a, 1]
+            px0 = self.player_previous[:, 0, None]
+            py0 = self.player_previous[:, 1, None]
+            distance = self._closest_approach(
+                x0 - px0, y0 - py0,
+                (x - x0) - (self.player_position[:, 0, None] - px0),
+                (y - y0) - (self.player_position[:, 1, None] - py0),
+            )
+        else:
+            dx = x - self.player_position[:, 0, None]
+            dy = y - self.player_position[:, 1, None]
+            distance = dx * dx + dy * dy
+        touching = alive & (distance <= (radius + PLAYER_RADIUS) ** 2)
+        player_hit = touching.any(axis=1)
+
+        if a and s:
+            # asteroids after the first one touching the player are never checked
+            stop = np.where(player_hit, np.argmax(touching, axis=1), a)
+            checked = alive & (np.arange(a)[None, :] < stop[:, None])
+
+            if SWEPT_COLLISIONS:
+                sx0 = self.shot_previous[:, None, :s, 0]
+                sy0 = self.shot_previous[:, None, :s, 1]
+                distance = self._closest_approach(
+                    x0[:, :, None] - sx0, y0[:, :, None] - sy0,
+                    (x - x0)[:, :, None] - (self.shot_position[:, None, :s, 0] - sx0),
+                    (y - y0)[:, :, None] - (self.shot_position[:, None, :s, 1] - sy0),
+                )
+            else:
+                dx = x[:, :, None] - self.shot_position[:, None, :s, 0]
+                dy = y[:, :, None] - self.shot_position[:, None, :s, 1]
+                distance = dx * dx + dy * dy
+            hits = distance <= (radius[:, :, None] + SHOT_RADIUS) ** 2
+            hits &= checked[:, :, None]
+            hits &= self.shot_alive[:, None, :s]
+
+            # every shot destroys the first asteroid it touches
+            shot_hit = hits.any(axis=1)
+            if shot_hit.any():
+                target = np.argmax(hits, axis=1)
+                envs, shots = np.nonzero(shot_hit)
+                asteroid_hit = np.zeros_like(self.asteroid_alive)
+                asteroid_hit[envs, target[envs, shots]] = True
+
+                self.shot_alive[:, :s] &= ~shot_hit
+                self.score += 100 * shot_hit.sum(axis=1)
+                self._split(asteroid_hit)
+
+        # Player lives and reset_position
+        if player_hit.any():
+            self.lives[player_hit] -= 1
+            self.player_position[player_hit] = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+            self.player_previous[player_hit] = self.player_position[player_hit]
+            self.player_rotation[player_hit] = 0
+
+    def _split(self, asteroid_hit: np.ndarray) -> None:
+        """Asteroid.split for every hit asteroid."""
+
+        self.asteroid_alive &= ~asteroid_hit
+        envs, slots = np.nonzero(asteroid_hit & (self.asteroid_radius > ASTEROID_MIN_RADIUS))
+        if not len(envs):
+            return
+
+        angle = np.radians(self.rng.uniform(20, 50, len(envs)))
+        velocity = self.asteroid_velocity[envs, slots]
+        position = self.asteroid_position[envs, slots]
+        radius = self.asteroid_radius[envs, slots] - ASTEROID_MIN_RADIUS
+        cos, sin = np.cos(angle), np.sin(angle)
+
+        for sign in (1, -1):
+            rotated = np.stack((velocity[:, 0] * cos - velocity[:, 1] * sin * sign,
+                                velocity[:, 0] * sin * sign + velocity[:, 1] * cos), axis=-1)
+            self._spawn_asteroids(envs, position, rotated * 1.2, radius)
+
+    def observe(self) -> np.ndarray:
+        """Describes every game as a row of floats, roughly within [-1, 1].
+
+        The row holds the player's position, heading (sine and cosine), shot
+        cooldown and remaining lives, then for each of the nearest
+        observed_asteroids asteroids its offset from the player, velocity,
+        radius and a flag saying whether the slot holds an asteroid at all.
+        """
+
+        n = self.num_envs
+        k = min(self.observed_asteroids, self.max_asteroids)
+        scale = np.array((SCREEN_WIDTH, SCREEN_HEIGHT))
+        radians = np.radians(self.player_rotation)
+
+        player = np.column_stack((
+            self.player_position / scale,
+            np.sin(radians),
+            np.cos(radians),
+            self.shoot_timer / PLAYER_SHOOT_COOLDOWN,
+            self.lives / PLAYER_NUM_LIVES,
+        ))
+
+        offset = self.asteroid_position - self.player_position[:, None, :]
+        distance = np.where(self.asteroid_alive, np.einsum("nak,nak->na", offset, offset), np.inf)
+        nearest = np.argpartition(distance, k - 1, axis=1)[:, :k] if k < self.max_asteroids else np.tile(np.arange(k), (n, 1))
+        nearest = np.take_along_axis(nearest, np.argsort(np.take_along_axis(distance, nearest, axis=1), axis=1), axis=1)
+
+        rows = np.arange(n)[:, None]
+        present = self.asteroid_alive[rows, nearest]
+        asteroids = np.concatenate((
+            offset[rows, nearest] / scale,
+            self.asteroid_velocity[rows, nearest] / 100,
+            self.asteroid_radius[rows, nearest, None] / ASTEROID_MAX_RADIUS,
+            present[..., None],
+        ), axis=2) * present[..., None]
+
+        observations = np.empty((n, self.observation_size), dtype=np.float32)
+        observations[:, :6] = player
+        observations[:, 6:6 + 6 * k] = asteroids.reshape(n, -1)
+        observations[:, 6 + 6 * k:] = 0
+        return observations
+
+    def draw(self, screen: pygame.Surface, index: int = 0) -> None:
+        """Draws one of the games, for watching an agent play."""
+
+        for position, radius in zip(self.asteroid_position[index][self.asteroid_alive[index]],
+                                    self.asteroid_radius[index][self.asteroid_alive[index]]):
+            pygame.draw.circle(screen, (255, 165, 0), position, radius, 2)
+        for position in self.shot_position[index][self.shot_alive[index]]:
+            pygame.draw.circle(screen, "white", position, SHOT_RADIUS, 2)
+
+        ship = ship_triangle(pygame.Vector2(*self.player_position[index]), self.player_rotation[index], PLAYER_RADIUS)
+        pygame.draw.polygon(screen, "white", ship, 2)
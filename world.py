@@ -0,0 +1,136 @@
+import random
+import hashlib
+
+import savestate
+from constants import *
+from player import Player
+from controls import idle
+from asteroids import Asteroid
+from asteroidfield import AsteroidField
+from lifetime import Lifetime, LifetimeManager
+from gamestates import GameState
+from main import GameContext, grouping, updating_group, asteroid_collisions
+
+
+class World:
+    """A single game's simulation state, independent of any display.
+
+    Bundles the sprite groups, the player, the asteroid field and the
+    lifetime manager created the same way main.main does, plus a private
+    random.Random so that a seed and a sequence of inputs always lead to the
+    same state.
+
+    The sprite classes hold a game's groups, pools and generator as class
+    attributes (see grouping). Each World keeps its own in a GameContext
+    and its methods enter it first, so several worlds can be stepped in
+    turn. Code creating sprites for a world by itself calls enter() first.
+
+    Args:
+        seed: Seed of the world's random generator
+        controls: Input source of the player, idle when None
+        use_store: Keep asteroids and shots in an EntityStore
+        asteroid_lifetime: Limits on asteroids, the game's when None
+        shot_lifetime: Limits on shots, the game's when None
+    """
+
+    def __init__(self, seed: int = None, controls=None, use_store: bool = False,
+                 asteroid_lifetime: Lifetime = None, shot_lifetime: Lifetime = None) -> None:
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.use_store = use_store
+        self.updatable, self.drawable, self.asteroids, self.shots = grouping(use_store, self.rng)
+
+        self.player = Player(WORLD_WIDTH / 2, WORLD_HEIGHT / 2)
+        # there is no keyboard without a display, nobody steers unless told
+        self.player.controls = controls if controls is not None else idle
+        if FAR_UPDATE_INTERVAL > 1:
+            Asteroid.focus = self.player
+
+        self.field = AsteroidField()
+        self.lifetimes = LifetimeManager(self.asteroids, self.shots, asteroid_lifetime, shot_lifetime)
+        self.frame = 0
+        self.time = 0.0
+        self.context = GameContext()
+
+    def enter(self) -> None:
+        """Makes the sprite classes work on this world, see GameContext."""
+
+        self.context.enter()
+
+    def step(self, dt: float) -> GameState:
+        """Advances the world by one frame of dt seconds.
+
+        Returns:
+            GameState: PAUSED if the input asked for the pause menu, END_GAME
+            when the player ran out of lives, PLAYING otherwise
+        """
+
+        self.enter()
+        self.frame += 1
+        self.time += dt
+
+        if updating_group("updatable", self.updatable, dt) == GameState.PAUSED:
+            return GameState.PAUSED
+
+        return asteroid_collisions(self.asteroids, self.shots, self.player)
+
+    def entity_count(self) -> int:
+        return sum(self.entity_counts())
+
+    def entity_counts(self) -> tuple[int, int]:
+        """Number of live asteroids and shots."""
+
+        self.enter()
+        if Asteroid.store is not None:
+            return Asteroid.store.counts()
+        return len(self.asteroids), len(self.shots)
+
+    def save(self) -> bytes:
+        """Returns a binary snapshot of the world, see savestate.py."""
+
+        self.enter()
+        return savestate.capture(self.player, self.field, self.asteroids, self.shots, self.frame, self.time)
+
+    def load(self, data: bytes) -> None:
+        """Puts the world back in the state of a save() snapshot.
+
+        Raises:
+            ValueError: If the data is not a snapshot
+        """
+
+        self.enter()
+        self.frame, self.time = savestate.restore(data, self.player, self.field, self.asteroids, self.shots)
+
+    def state(self) -> tuple:
+        """Returns a hashable description of everything that can change.
+
+        Quantities are floats whatever type they were kept as (the sprites
+        keep some as ints, an EntityStore as floats), so the same game gives
+        the same state either way.
+        """
+
+        self.enter()
+        player = self.player
+        if Asteroid.store is not None:
+            asteroids = Asteroid.store.asteroids()
+            shots = Asteroid.store.shots()
+        else:
+            asteroids = self.asteroids
+            shots = self.shots
+
+        return (
+            self.frame,
+            player.score,
+            player.lives,
+            tuple(player.position),
+            float(player.rotation),
+            float(player.timer),
+            float(self.field.spawn_timer),
+            tuple((tuple(a.position), tuple(a.velocity), float(a.radius)) for a in asteroids),
+            tuple((tuple(s.position), tuple(s.velocity)) for s in shots),
+        )
+
+    def digest(self) -> str:
+        """Returns a short fingerprint of state(), for comparing runs."""
+
+        return hashlib.sha256(repr(self.state()).encode()).hexdigest()[:16]